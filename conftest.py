@@ -28,6 +28,34 @@ def scan_manager(mocker):
         yield _manager
 
 
+@pytest.fixture(autouse=True)
+def report_cache_dir(tmp_path):
+    """Keep rendered report caches in a per test directory."""
+    with override_settings(QPC_REPORT_CACHE_DIR=tmp_path / "report_cache"):
+        yield tmp_path / "report_cache"
+
+
+@pytest.fixture(autouse=True)
+def ssh_control_path_dir(tmp_path):
+    """Keep ssh ControlMaster sockets in a per test directory."""
+    with override_settings(QPC_SSH_CONTROL_PATH_DIR=tmp_path / "ssh"):
+        yield tmp_path / "ssh"
+
+
+@pytest.fixture(autouse=True)
+def disable_connect_probe():
+    """Don't open connections to the fake hosts of network scan tests."""
+    with override_settings(QPC_CONNECT_PROBE_ENABLED=False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def scan_stats_flush_interval():
+    """Don't save scan task stats from another thread's database connection."""
+    with override_settings(QPC_SCAN_STATS_FLUSH_INTERVAL=3600):
+        yield
+
+
 @pytest.fixture
 def qpc_user_pass(faker):
     """Create password for qpc test user."""
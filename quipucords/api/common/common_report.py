@@ -1,11 +1,16 @@
 """Util for common report operations."""
 
+import csv
+import hashlib
 import io
 import json
 import logging
 import os
 import tarfile
+import tempfile
 import time
+import zlib
+from collections.abc import Iterator
 
 from rest_framework.renderers import JSONRenderer
 
@@ -94,6 +99,37 @@ def encode_content(content, file_format):
     return renderer[file_format](content)
 
 
+def iter_json(content):
+    """Encode content as encode_content(content, "json") does, in chunks.
+
+    Iterators are encoded as arrays one item at a time, and so are dicts
+    holding iterators, one member at a time; any other value is encoded at
+    once. Wrap large collections in iter() to stream them.
+    :returns: generator of bytes
+    """
+    if isinstance(content, Iterator):
+        yield b"["
+        for index, item in enumerate(content):
+            if index:
+                yield b","
+            yield from iter_json(item)
+        yield b"]"
+    elif isinstance(content, dict) and any(
+        isinstance(value, Iterator) for value in content.values()
+    ):
+        yield b"{"
+        for index, (key, value) in enumerate(content.items()):
+            separator = b"," if index else b""
+            yield separator + encode_content(str(key), "json") + b":"
+            yield from iter_json(value)
+        yield b"}"
+    elif content is None:
+        # JSONRenderer renders None as an empty document
+        yield b"null"
+    else:
+        yield encode_content(content, "json")
+
+
 def create_tar_buffer(files_data):
     """Generate a file buffer based off a dictionary.
 
@@ -116,6 +152,64 @@ def create_tar_buffer(files_data):
     return tar_buffer
 
 
+def iter_tar_gz(files, sha256sum_name=None, spool_size=2**20, chunk_size=2**16):
+    """Stream a tar.gz archive, the streaming counterpart of create_tar_buffer.
+
+    Tar headers hold the size of each member, so the content of each file is
+    spooled (in memory up to spool_size bytes, then on disk) and hashed while
+    it is generated, and then compressed into the archive.
+    :param files: iterable of (file_name, chunks) where file_name is a path
+        with the file name included and chunks an iterable of str or bytes
+    :param sha256sum_name: if set, a SHA256SUM file with this path is appended
+        with the sha256 of every other file
+    :returns: generator of bytes
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip container
+    for data in _iter_tar(files, sha256sum_name, spool_size, chunk_size):
+        if compressed := compressor.compress(data):
+            yield compressed
+    yield compressor.flush()
+
+
+def _iter_tar(files, sha256sum_name, spool_size, chunk_size):
+    sha256sum_lines = []
+
+    def _members():
+        yield from files
+        if sha256sum_name is not None:
+            # only built once every other file was written
+            yield sha256sum_name, sha256sum_lines
+
+    offset = 0
+    for file_name, chunks in _members():
+        with tempfile.SpooledTemporaryFile(max_size=spool_size) as spool:
+            sha256 = hashlib.sha256()
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = encode_content(chunk, "plaintext")
+                sha256.update(chunk)
+                spool.write(chunk)
+            if file_name != sha256sum_name:
+                base_name = file_name.rsplit("/", 1)[-1]
+                sha256sum_lines.append(f"{sha256.hexdigest()}  {base_name}\n")
+
+            info = tarfile.TarInfo(name=file_name)
+            info.size = spool.tell()
+            header = info.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING)
+            yield header
+            spool.seek(0)
+            while data := spool.read(chunk_size):
+                yield data
+            # members are padded to a whole number of blocks
+            padding = -info.size % tarfile.BLOCKSIZE
+            yield tarfile.NUL * padding
+            offset += len(header) + info.size + padding
+
+    # end of archive marker, padded to a whole record like TarFile.close does
+    end = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+    yield end + tarfile.NUL * (-(offset + len(end)) % tarfile.RECORDSIZE)
+
+
 class CSVHelper:
     """Helper for CSV serialization of list/dict values."""
 
@@ -172,26 +266,73 @@ class CSVHelper:
         return result
 
     @staticmethod
-    def generate_headers(fact_list, exclude=None):
-        """Generate column headers from fact list."""
-        # pylint: disable=too-many-nested-blocks
+    def product_presence(fact):
+        """Return the presence of each product of a fact by lower case name."""
+        presence = {}
+        for prod in fact.get("products") or []:
+            prod_name = prod.get("name")
+            if prod_name:
+                presence[prod_name.lower()] = prod.get("presence", "unknown")
+        return presence
+
+    @classmethod
+    def generate_headers(cls, fact_list, exclude=None):
+        """Generate column headers from fact list.
+
+        Products are expanded to one column per product name; use
+        get_fact_value to read them. fact_list is only read once, so it can
+        be any iterable.
+        """
         headers = set()
         for fact in fact_list:
-            fact_addon = {}
             for fact_key in fact.keys():
                 if fact_key == "products":
-                    prods = fact.get(fact_key, [])
-                    if prods:
-                        for prod in prods:
-                            prod_name = prod.get("name")
-                            if prod_name:
-                                prod_name = prod_name.lower()
-                                headers.add(prod_name)
-                                fact_addon[prod_name] = prod.get("presence", "unknown")
+                    headers.update(cls.product_presence(fact))
                 else:
                     headers.add(fact_key)
-            fact.update(fact_addon)
 
         if exclude and isinstance(exclude, set):
             headers = headers - exclude
         return sorted(list(headers))
+
+    @classmethod
+    def get_fact_value(cls, fact, header, presence=None):
+        """Return the value of a column generated by generate_headers.
+
+        :param presence: product_presence(fact), to avoid computing it for
+            every column of the same fact
+        """
+        if presence is None:
+            presence = cls.product_presence(fact)
+        if header in presence:
+            return presence[header]
+        return fact.get(header)
+
+
+class _CSVEcho:
+    """File-like object returning what is written to it."""
+
+    def write(self, value):
+        """Return value instead of storing it."""
+        return value
+
+
+def iter_csv(rows, chunk_size=2**16):
+    """Encode rows as CSV text in chunks of about chunk_size characters.
+
+    :param rows: iterable of lists of values
+    :returns: generator of str
+    """
+    csv_writer = csv.writer(_CSVEcho(), delimiter=",")
+    chunk = []
+    length = 0
+    for row in rows:
+        line = csv_writer.writerow(row)
+        chunk.append(line)
+        length += len(line)
+        if length >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield "".join(chunk)
@@ -0,0 +1,143 @@
+"""Incremental JSON reader for large request bodies."""
+
+import codecs
+import json
+
+from rest_framework.exceptions import ParseError
+
+WHITESPACE = " \t\n\r"
+# a value ending with one of these can't continue in the next chunk
+VALUE_TERMINATORS = '"]}'
+NUMBER_CHARACTERS = "0123456789+-.eE"
+# decode errors this close to the end of the buffer might come from a value
+# cut by the chunk boundary, e.g. "tru" or "\\u00"
+TRUNCATION_MARGIN = 16
+UNTERMINATED_STRING = "Unterminated string starting at"
+
+
+class JSONStreamReader:
+    """Read a JSON document from a binary stream one value at a time.
+
+    Only the value being decoded is kept in memory, so containers can be
+    walked with iter_object/iter_array and their members processed (or
+    discarded) as they arrive instead of loading the whole document at once.
+    """
+
+    def __init__(self, stream, chunk_size=2**16):
+        """Create a reader for a file-like object returning bytes."""
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._eof = stream is None
+
+    def _read(self):
+        """Append the next chunk of the stream to the buffer."""
+        # read at least as much as is pending so a value spanning many chunks
+        # isn't decoded over and over again
+        size = max(self._chunk_size, len(self._buffer) - self._position)
+        chunk = self._stream.read(size)
+        self._eof = not chunk
+        try:
+            text = self._text_decoder.decode(chunk, final=self._eof)
+        except UnicodeDecodeError as error:
+            raise ParseError(f"JSON parse error - {error}") from error
+        self._buffer = self._buffer[self._position :] + text
+        self._position = 0
+
+    def peek(self):
+        """Return the next non whitespace character or "" at the end."""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in WHITESPACE
+            ):
+                self._position += 1
+            if self._position < len(self._buffer) or self._eof:
+                break
+            self._read()
+        return self._buffer[self._position : self._position + 1]
+
+    def at_end(self):
+        """Return True if only whitespace is left in the stream."""
+        return self.peek() == ""
+
+    def _expect(self, characters):
+        """Consume the next character, which must be one of characters."""
+        character = self.peek()
+        if not character or character not in characters:
+            found = repr(character) if character else "end of data"
+            raise ParseError(
+                f"JSON parse error - expected {' or '.join(characters)},"
+                f" found {found}"
+            )
+        self._position += 1
+        return character
+
+    def read_value(self):
+        """Decode and return the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as error:
+                if self._eof or not self._may_be_truncated(error):
+                    # fail right away instead of buffering the rest of the stream
+                    raise ParseError(f"JSON parse error - {error}") from error
+                self._read()
+                continue
+            if (
+                not self._eof
+                and self._buffer[end - 1] not in VALUE_TERMINATORS
+                and not self._buffer[end:].strip(NUMBER_CHARACTERS)
+            ):
+                # numbers and literals might continue in the next chunk, e.g.
+                # "-1." is decoded as -1 until the fraction is read
+                self._read()
+                continue
+            self._position = end
+            return value
+
+    def _may_be_truncated(self, error):
+        """Return True if the decode error might go away reading more data."""
+        return (
+            error.msg == UNTERMINATED_STRING
+            or len(self._buffer) - error.pos <= TRUNCATION_MARGIN
+        )
+
+    def iter_object(self):
+        """Iterate over the keys of the next JSON object.
+
+        The value of each key must be consumed (with read_value, iter_object
+        or iter_array) before asking for the next key.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._position += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ParseError("JSON parse error - object keys must be strings")
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def iter_array(self):
+        """Iterate over the items of the next JSON array."""
+        self._expect("[")
+        if self.peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield self.read_value()
+            if self._expect(",]") == "]":
+                return
+
+    def close(self):
+        """Check nothing but whitespace follows the parsed document."""
+        if not self.at_end():
+            raise ParseError("JSON parse error - extra data after document")
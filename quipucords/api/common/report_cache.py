@@ -0,0 +1,67 @@
+"""Gzip compressed on disk cache for rendered reports.
+
+Entries are named after the report_platform_id of the cached report, which is
+unique to each DetailsReport/DeploymentsReport, so a cache directory can't
+serve results of a report that reused the id of a deleted one.
+"""
+
+import gzip
+import logging
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 2**16
+
+
+def _cache_path(report, name):
+    return (
+        Path(settings.QPC_REPORT_CACHE_DIR) / f"{report.report_platform_id}-{name}.gz"
+    )
+
+
+def _read(path):
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as cache_file:
+        while chunk := cache_file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+def _write_through(path, chunks):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file so readers never see a partial entry; it is
+    # discarded if generation fails or the consumer stops early
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    try:
+        with gzip.open(temp_path, "wt", encoding="utf-8", newline="") as cache_file:
+            for chunk in chunks:
+                cache_file.write(chunk)
+                yield chunk
+        temp_path.replace(path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def iter_cached(report, name, generate):
+    """Return the cached content of report, generating and caching it if needed.
+
+    :param report: DetailsReport or DeploymentsReport the content belongs to
+    :param name: name of the content, e.g. "details.csv"
+    :param generate: callable returning an iterable of str chunks
+    :returns: generator of str chunks
+    """
+    path = _cache_path(report, name)
+    if path.exists():
+        logger.info("Using cached %s for report %s", name, report.id)
+        return _read(path)
+    logger.info("No cached %s for report %s", name, report.id)
+    return _write_through(path, generate())
+
+
+def clear(report):
+    """Remove every cached content of report."""
+    cache_dir = Path(settings.QPC_REPORT_CACHE_DIR)
+    for path in cache_dir.glob(f"{report.report_platform_id}-*"):
+        path.unlink(missing_ok=True)
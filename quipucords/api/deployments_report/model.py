@@ -3,7 +3,10 @@
 import uuid
 
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 
+from api.common import report_cache
 from api.common.common_report import REPORT_TYPE_CHOICES, REPORT_TYPE_DEPLOYMENT
 from fingerprinter.constants import (
     ENTITLEMENTS_KEY,
@@ -37,8 +40,6 @@ class DeploymentsReport(models.Model):
     report_id = models.IntegerField(null=True)
     cached_fingerprints = models.JSONField(null=True)
     cached_masked_fingerprints = models.JSONField(null=True)
-    cached_csv = models.TextField(null=True)
-    cached_masked_csv = models.TextField(null=True)
 
     def __str__(self):
         """Convert to string."""
@@ -51,6 +52,13 @@ class DeploymentsReport(models.Model):
         )
 
 
+# pylint: disable=unused-argument
+@receiver(post_delete, sender=DeploymentsReport)
+def clear_deployments_report_cache(sender, instance, **kwargs):
+    """Remove the rendered reports of a deleted deployments report."""
+    report_cache.clear(instance)
+
+
 class SystemFingerprint(models.Model):
     """Represents system fingerprint."""
 
@@ -1,5 +1,6 @@
 """Serializer for system fingerprint models."""
 
+from django.conf import settings
 from rest_framework.serializers import (
     BooleanField,
     CharField,
@@ -8,6 +9,7 @@ from rest_framework.serializers import (
     FloatField,
     IntegerField,
     JSONField,
+    ListSerializer,
     ModelSerializer,
     PrimaryKeyRelatedField,
     UUIDField,
@@ -51,9 +53,54 @@ class EntitlementSerializer(NotEmptySerializer):
 default_args = {"required": False, "allow_null": True}
 
 
+class SystemFingerprintListSerializer(ListSerializer):
+    """Serializer for creating many fingerprints at once."""
+
+    def create(self, validated_data):
+        """Bulk create system fingerprints with their products and entitlements."""
+        batch_size = settings.QPC_FINGERPRINT_BATCH_SIZE
+        fingerprints = []
+        related_data = []
+        for fingerprint_data in validated_data:
+            fingerprint_data = dict(fingerprint_data)
+            related_data.append(
+                (
+                    fingerprint_data.pop("products", []),
+                    fingerprint_data.pop("entitlements", []),
+                )
+            )
+            fingerprints.append(SystemFingerprint(**fingerprint_data))
+        fingerprints = SystemFingerprint.objects.bulk_create(
+            fingerprints, batch_size=batch_size
+        )
+
+        products = []
+        entitlements = []
+        for fingerprint, (products_data, entitlements_data) in zip(
+            fingerprints, related_data
+        ):
+            products.extend(
+                Product(fingerprint=fingerprint, **product_data)
+                for product_data in products_data
+            )
+            entitlements.extend(
+                Entitlement(fingerprint=fingerprint, **entitlement_data)
+                for entitlement_data in entitlements_data
+            )
+        Product.objects.bulk_create(products, batch_size=batch_size)
+        Entitlement.objects.bulk_create(entitlements, batch_size=batch_size)
+        return fingerprints
+
+
 class SystemFingerprintSerializer(ModelSerializer):
     """Serializer for the Fingerprint model."""
 
+    # not required so a report shared by many fingerprints can be passed to
+    # save() instead of being looked up for each of them
+    deployment_report = PrimaryKeyRelatedField(
+        queryset=DeploymentsReport.objects.all(), required=False
+    )
+
     # Common facts
     name = CharField(max_length=256, **default_args)
 
@@ -128,6 +175,7 @@ class SystemFingerprintSerializer(ModelSerializer):
 
         model = SystemFingerprint
         fields = "__all__"
+        list_serializer_class = SystemFingerprintListSerializer
 
     def create(self, validated_data):
         """Create a system fingerprint."""
@@ -161,8 +209,6 @@ class DeploymentReportSerializer(NotEmptySerializer):
     report_id = IntegerField(read_only=True)
     cached_fingerprints = JSONField(read_only=True)
     cached_masked_fingerprints = JSONField(read_only=True)
-    cached_csv = CharField(read_only=True)
-    cached_masked_csv = CharField(read_only=True)
 
     status = ChoiceField(read_only=True, choices=DeploymentsReport.STATUS_CHOICES)
     system_fingerprints = FingerprintField(many=True, read_only=True)
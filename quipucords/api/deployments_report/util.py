@@ -1,11 +1,10 @@
 """Util for deployments report."""
 
-import csv
 import logging
-from copy import deepcopy
-from io import StringIO
+from itertools import chain, islice
 
-from api.common.common_report import CSVHelper, sanitize_row
+from api.common import report_cache
+from api.common.common_report import CSVHelper, iter_csv, sanitize_row
 from api.common.util import validate_query_param_bool
 from api.models import DeploymentsReport, SystemFingerprint
 from constants import DataSources
@@ -42,10 +41,6 @@ def compute_source_info(sources):
 
 def create_deployments_csv(deployments_report_dict, request):
     """Create deployments report csv."""
-    # pylint: disable=too-many-branches, too-many-locals, too-many-statements
-    deployments_report_dict = deepcopy(deployments_report_dict)
-    mask_report = request.query_params.get("mask", False)
-    source_headers = {SOURCES_KEY, *_get_detection_keys()}
     report_id = deployments_report_dict.get("report_id")
     if report_id is None:
         return None
@@ -54,51 +49,65 @@ def create_deployments_csv(deployments_report_dict, request):
     if deployment_report is None:
         return None
 
-    # Check for a cached copy of csv
-    cached_csv = deployment_report.cached_csv
-    if validate_query_param_bool(mask_report):
-        cached_csv = deployment_report.cached_masked_csv
-    if cached_csv:
-        logger.info("Using cached csv results for deployment report %d", report_id)
-        return cached_csv
-    logger.info("No cached csv results for deployment report %d", report_id)
+    systems_list = deployments_report_dict.get("system_fingerprints")
+    if not systems_list:
+        return None
 
-    csv_helper = CSVHelper()
-    deployment_report_buffer = StringIO()
-    csv_writer = csv.writer(deployment_report_buffer, delimiter=",")
+    mask_report = validate_query_param_bool(request.query_params.get("mask", False))
+    return "".join(stream_deployments_csv(deployment_report, mask_report, systems_list))
 
-    csv_writer.writerow(
-        ["Report ID", "Report Type", "Report Version", "Report Platform ID"]
-    )
-    csv_writer.writerow(
-        [
-            report_id,
-            deployment_report.report_type,
-            deployment_report.report_version,
-            deployment_report.report_platform_id,
-        ]
+
+def stream_deployments_csv(deployment_report, mask_report, systems_list=None):
+    """Stream the deployments csv of a deployments report.
+
+    :param deployment_report: the DeploymentsReport
+    :param mask_report: bool indicating if the masked fingerprints are used
+    :param systems_list: fingerprints to render instead of the ones cached
+        in deployment_report
+    :returns: generator of str
+    """
+    if systems_list is None:
+        if mask_report:
+            systems_list = deployment_report.cached_masked_fingerprints
+        else:
+            systems_list = deployment_report.cached_fingerprints
+    cache_name = "deployments-masked.csv" if mask_report else "deployments.csv"
+    return report_cache.iter_cached(
+        deployment_report,
+        cache_name,
+        lambda: iter_csv(_iter_deployments_csv_rows(deployment_report, systems_list)),
     )
-    csv_writer.writerow([])
-    csv_writer.writerow([])
 
-    systems_list = deployments_report_dict.get("system_fingerprints")
-    if not systems_list:
-        return None
 
-    csv_writer.writerow(["System Fingerprints:"])
+def _iter_deployments_csv_rows(deployment_report, systems_list):
+    """Generate the csv rows of a deployments report."""
+    csv_helper = CSVHelper()
+    source_headers = {SOURCES_KEY, *_get_detection_keys()}
+
+    yield ["Report ID", "Report Type", "Report Version", "Report Platform ID"]
+    yield [
+        deployment_report.report_id,
+        deployment_report.report_type,
+        deployment_report.report_version,
+        deployment_report.report_platform_id,
+    ]
+    yield []
+    yield []
 
+    yield ["System Fingerprints:"]
+
+    # Add fields to just one fingerprint, a shallow copy so the report isn't
+    # modified
     valid_fact_attributes = {
         field.name for field in SystemFingerprint._meta.get_fields()
     }
-
-    # Add fields to just one fingerprint
-    system = systems_list[0]
+    first_system = dict(systems_list[0])
     for attr in valid_fact_attributes:
-        if not system.get(attr, None):
-            system[attr] = None
+        if not first_system.get(attr, None):
+            first_system[attr] = None
 
     headers = csv_helper.generate_headers(
-        systems_list,
+        chain([first_system], islice(systems_list, 1, None)),
         exclude={
             "id",
             "report_id",
@@ -113,9 +122,10 @@ def create_deployments_csv(deployments_report_dict, request):
         headers = sorted(list(set(headers)))
 
     # Add source headers
-    csv_writer.writerow(headers)
-    for system in systems_list:
+    yield headers
+    for system in chain([first_system], islice(systems_list, 1, None)):
         row = []
+        presence = csv_helper.product_presence(system)
         system_sources = system.get(SOURCES_KEY)
         if system_sources is not None:
             sources_info = compute_source_info(system_sources)
@@ -129,19 +139,17 @@ def create_deployments_csv(deployments_report_dict, request):
             elif header == "entitlements":
                 fact_value = system.get(header)
                 if fact_value:
-                    for entitlement in fact_value:
-                        entitlement.pop("metadata")
+                    fact_value = [
+                        {
+                            key: value
+                            for key, value in entitlement.items()
+                            if key != "metadata"
+                        }
+                        for entitlement in fact_value
+                    ]
             else:
-                fact_value = system.get(header)
+                fact_value = csv_helper.get_fact_value(system, header, presence)
             row.append(csv_helper.serialize_value(header, fact_value))
-        csv_writer.writerow(sanitize_row(row))
-
-    csv_writer.writerow([])
-    logger.info("Caching csv results for deployment report %d", report_id)
-    cached_csv = deployment_report_buffer.getvalue()
-    if validate_query_param_bool(mask_report):
-        deployment_report.cached_masked_csv = cached_csv
-    else:
-        deployment_report.cached_csv = cached_csv
-    deployment_report.save()
-    return cached_csv
+        yield sanitize_row(row)
+
+    yield []
@@ -1,6 +1,7 @@
 """View for system reports."""
 import logging
 
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as _
 from rest_framework import status
@@ -20,6 +21,7 @@ from api import messages
 from api.common.report_json_gzip_renderer import ReportJsonGzipRenderer
 from api.common.util import is_int, validate_query_param_bool
 from api.deployments_report.csv_renderer import DeploymentCSVRenderer
+from api.deployments_report.util import stream_deployments_csv
 from api.models import DeploymentsReport
 from api.user.authentication import QuipucordsExpiringTokenAuthentication
 
@@ -53,6 +55,19 @@ def deployments(request, report_id=None):
         )
     deployments_report = build_cached_json_report(report, mask_report)
     if deployments_report:
+        system_fingerprints = deployments_report["system_fingerprints"]
+        if (
+            request.accepted_renderer.format == DeploymentCSVRenderer.format
+            and system_fingerprints
+        ):
+            return StreamingHttpResponse(
+                stream_deployments_csv(
+                    report,
+                    validate_query_param_bool(mask_report),
+                    system_fingerprints,
+                ),
+                content_type=DeploymentCSVRenderer.media_type,
+            )
         return Response(deployments_report)
     error = {
         "detail": f"Deployments report {report.id} could not be masked."
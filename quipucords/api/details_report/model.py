@@ -1,27 +1,38 @@
 """Models to capture system facts."""
 
 import uuid
+from itertools import islice
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 
+from api.common import report_cache
 from api.common.common_report import REPORT_TYPE_CHOICES, REPORT_TYPE_DETAILS
+from constants import DataSources
 
 
 class DetailsReport(models.Model):
-    """A reported set of facts."""
+    """A reported set of facts.
+
+    Facts are stored per source in DetailsReportSource, and each source keeps
+    the facts of its systems in chunks (DetailsReportFacts) so reports can be
+    walked with iter_sources without loading every fact at once.
+    """
 
     report_type = models.CharField(
         max_length=11, choices=REPORT_TYPE_CHOICES, default=REPORT_TYPE_DETAILS
     )
     report_version = models.CharField(max_length=64, null=False)
     report_platform_id = models.UUIDField(default=uuid.uuid4, editable=False)
-    sources = models.JSONField(null=False, default=list)
     report_id = models.IntegerField(null=True)
     deployment_report = models.OneToOneField(
         "DeploymentsReport", models.CASCADE, related_name="details_report", null=True
     )
-    cached_csv = models.TextField(null=True)
-    cached_masked_csv = models.TextField(null=True)
+
+    # sources assigned to the report, stored on the next save
+    _pending_sources = None
 
     def __str__(self):
         """Convert to string."""
@@ -29,6 +40,173 @@ class DetailsReport(models.Model):
             "{"
             f'"id":{self.id},'
             ' "report_type":"details", '
-            f' "sources":{self.sources}'
+            f' "source_count":{self.source_count}'
+            "}"
+        )
+
+    @property
+    def sources(self):
+        """Return every source of the report as a list of dicts with their facts.
+
+        This loads the whole report in memory; prefer iter_sources for large
+        reports.
+        """
+        if self._pending_sources is not None:
+            return self._pending_sources
+        if self.pk is None:
+            return []
+        return [source.as_dict() for source in self.report_sources.all()]
+
+    @sources.setter
+    def sources(self, sources):
+        """Replace the sources of the report when it is saved."""
+        self._pending_sources = list(sources)
+
+    @property
+    def source_count(self):
+        """Return the number of sources in the report."""
+        if self._pending_sources is not None:
+            return len(self._pending_sources)
+        if self.pk is None:
+            return 0
+        return self.report_sources.count()
+
+    def save(self, *args, **kwargs):
+        """Save the report and the sources assigned to it."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self._pending_sources is not None:
+                self.report_sources.all().delete()
+                report_cache.clear(self)
+                for source in self._pending_sources:
+                    self.add_source(source)
+                self._pending_sources = None
+
+    def add_source(self, source):
+        """Append a source to the saved report.
+
+        :param source: dict with the source attributes and its facts, which
+            can be any iterable of per system fact dicts.
+        :returns: the new DetailsReportSource
+        """
+        sequence_number = (
+            self.report_sources.aggregate(models.Max("sequence_number"))[
+                "sequence_number__max"
+            ]
+            or 0
+        ) + 1
+        report_source = DetailsReportSource.objects.create(
+            details_report=self,
+            sequence_number=sequence_number,
+            server_id=source.get("server_id"),
+            report_version=source.get("report_version"),
+            source_name=source.get("source_name"),
+            source_type=source.get("source_type"),
+        )
+        report_source.add_facts(source.get("facts") or [])
+        return report_source
+
+    def iter_sources(self):
+        """Iterate over the sources of the report.
+
+        Each source is a dict like the ones in sources, except "facts" is an
+        iterator fetching the facts of its systems one chunk at a time.
+        """
+        if self._pending_sources is not None:
+            yield from self._pending_sources
+            return
+        for report_source in self.report_sources.iterator():
+            yield {**report_source.attributes(), "facts": report_source.iter_facts()}
+
+
+# pylint: disable=unused-argument
+@receiver(post_delete, sender=DetailsReport)
+def clear_details_report_cache(sender, instance, **kwargs):
+    """Remove the rendered reports of a deleted details report."""
+    report_cache.clear(instance)
+
+
+class DetailsReportSource(models.Model):
+    """The facts a source collected for a DetailsReport."""
+
+    details_report = models.ForeignKey(
+        DetailsReport, models.CASCADE, related_name="report_sources"
+    )
+    sequence_number = models.PositiveIntegerField()
+    server_id = models.TextField(null=True)
+    report_version = models.TextField(null=True)
+    source_name = models.TextField(null=True)
+    source_type = models.CharField(
+        max_length=12, choices=DataSources.choices, null=True
+    )
+
+    class Meta:
+        """Metadata for model."""
+
+        ordering = ["sequence_number"]
+
+    def __str__(self):
+        """Convert to string."""
+        return (
+            "{"
+            f'"id":{self.id},'
+            f' "source_name":"{self.source_name}",'
+            f' "source_type":"{self.source_type}"'
             "}"
         )
+
+    def attributes(self):
+        """Return the source attributes, without facts."""
+        return {
+            "server_id": self.server_id,
+            "report_version": self.report_version,
+            "source_name": self.source_name,
+            "source_type": self.source_type,
+        }
+
+    def as_dict(self):
+        """Return the source attributes with the list of its facts."""
+        return {**self.attributes(), "facts": list(self.iter_facts())}
+
+    def add_facts(self, facts):
+        """Store facts in chunks of QPC_DETAILS_REPORT_CHUNK_SIZE systems.
+
+        :param facts: iterable of per system fact dicts
+        """
+        sequence_number = (
+            self.fact_chunks.aggregate(models.Max("sequence_number"))[
+                "sequence_number__max"
+            ]
+            or 0
+        )
+        facts = iter(facts)
+        while chunk := list(islice(facts, settings.QPC_DETAILS_REPORT_CHUNK_SIZE)):
+            sequence_number += 1
+            DetailsReportFacts.objects.create(
+                report_source=self, sequence_number=sequence_number, facts=chunk
+            )
+
+    def iter_facts(self):
+        """Iterate over the facts of each system, one chunk at a time."""
+        chunks = (
+            self.fact_chunks.order_by("sequence_number")
+            .values_list("facts", flat=True)
+            .iterator(chunk_size=1)
+        )
+        for chunk in chunks:
+            yield from chunk
+
+
+class DetailsReportFacts(models.Model):
+    """A chunk of the per system facts of a DetailsReportSource."""
+
+    report_source = models.ForeignKey(
+        DetailsReportSource, models.CASCADE, related_name="fact_chunks"
+    )
+    sequence_number = models.PositiveIntegerField()
+    facts = models.JSONField(default=list)
+
+    class Meta:
+        """Metadata for model."""
+
+        ordering = ["sequence_number"]
@@ -15,8 +15,6 @@ class DetailsReportSerializer(NotEmptySerializer):
     sources = JSONField(required=True)
     report_id = IntegerField(read_only=True)
     report_platform_id = UUIDField(format="hex_verbose", read_only=True)
-    cached_csv = CharField(required=False, read_only=True)
-    cached_masked_csv = CharField(required=False, read_only=True)
 
     class Meta:
         """Meta class for DetailsReportSerializer."""
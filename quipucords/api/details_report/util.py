@@ -1,13 +1,20 @@
 """Util for validating and persisting source facts."""
 
-import csv
 import logging
-from io import StringIO
 
+from django.db import transaction
 from django.utils.translation import gettext as _
 
 from api import messages
-from api.common.common_report import CSVHelper, create_report_version, sanitize_row
+from api.common import report_cache
+from api.common.common_report import (
+    CSVHelper,
+    create_report_version,
+    iter_csv,
+    iter_json,
+    sanitize_row,
+)
+from api.common.json_stream import JSONStreamReader
 from api.common.util import mask_data_general, validate_query_param_bool
 from api.models import DetailsReport, ScanTask, ServerInformation
 from api.serializers import DetailsReportSerializer
@@ -27,17 +34,33 @@ SOURCE_TYPE_KEY = "source_type"
 SOURCE_NAME_KEY = "source_name"
 FACTS_KEY = "facts"
 
+# facts masked in masked reports
+MAC_AND_IP_FACTS = [
+    "ifconfig_ip_addresses",
+    "ip_addresses",
+    "vm.ip_addresses",
+    "ifconfig_mac_addresses",
+    "mac_addresses",
+    "vm.mac_addresses",
+]
+NAME_RELATED_FACTS = [
+    "vm.host_name",
+    "vm.dns_name",
+    "vm.cluster",
+    "vm.name",
+    "uname_hostname",
+]
+
 logger = logging.getLogger(__name__)
 
 
-def build_sources_from_tasks(tasks):
-    """Build sources for a set of tasks.
+def iter_sources_from_tasks(tasks):
+    """Build sources for a set of tasks, one task at a time.
 
     :param tasks: ScanTask objects used to build results
-    :returns: dict containing sources structure for facts endpoint
+    :returns: generator of dicts with the sources structure for facts endpoint
     """
     server_id = ServerInformation.create_or_retrieve_server_id()
-    sources = []
     for inspect_task in tasks:
         if inspect_task.scan_type != ScanTask.SCAN_TYPE_INSPECT:
             continue
@@ -52,8 +75,7 @@ def build_sources_from_tasks(tasks):
                     SOURCE_TYPE_KEY: source.source_type,
                     FACTS_KEY: task_facts,
                 }
-                sources.append(source_dict)
-    return sources
+                yield source_dict
 
 
 def validate_details_report_json(details_report_json, external_json):
@@ -76,6 +98,116 @@ def validate_details_report_json(details_report_json, external_json):
     return _validate_sources_json(details_report_json.get(SOURCES_KEY))
 
 
+def read_details_report_request(request, details_report=None):
+    """Parse and validate the details report sent in a REST request.
+
+    JSON bodies are streamed with read_details_report_json, other media types
+    go through the regular DRF parsers.
+    :param request: the DRF request
+    :param details_report: unsaved DetailsReport to store the sources in. If
+        given, the report is saved with its sources when the request is valid
+        and nothing is saved otherwise. A report without a version takes the
+        one of its first source.
+    :returns: bool indicating if there are errors and dict with the
+    validation result if so, or the details report otherwise. Sources saved
+    in details_report are left out of it.
+    """
+    media_type = request.content_type.split(";")[0].strip()
+    if media_type == "application/json":
+        if details_report is None:
+            return read_details_report_json(request.stream)
+        with transaction.atomic():
+            has_errors, result = read_details_report_json(
+                request.stream, details_report
+            )
+            if has_errors:
+                transaction.set_rollback(True)
+        return has_errors, result
+    has_errors, validation_result = validate_details_report_json(request.data, True)
+    if has_errors:
+        return has_errors, validation_result
+    if details_report is None:
+        return False, request.data
+    details_report.sources = request.data[SOURCES_KEY]
+    _reconcile_report_version(details_report, request.data[SOURCES_KEY][0])
+    details_report.save()
+    return False, {
+        key: value for key, value in request.data.items() if key != SOURCES_KEY
+    }
+
+
+def _reconcile_report_version(details_report, source_json):
+    """Give a details report without a version the one of its first source.
+
+    Merged reports take their version from their sources. Currently, there
+    is only one source version, so sources are stored as they are.
+    """
+    if not details_report.report_version:
+        details_report.report_version = source_json[REPORT_VERSION_KEY]
+
+
+def read_details_report_json(stream, details_report=None):
+    """Parse and validate a details report from a JSON byte stream.
+
+    Sources are validated one by one while the stream is parsed. If
+    details_report is given, each valid source is saved in it as soon as it is
+    validated, so only one source is held in memory at a time; otherwise the
+    valid sources are returned in the details report.
+    :param stream: file-like object with the JSON encoded details report
+    :param details_report: DetailsReport to save the valid sources in. The
+        caller must roll back the saved sources if there are errors.
+    :returns: bool indicating if there are errors and dict with the
+    validation result if so, or the details report otherwise.
+    """
+    reader = JSONStreamReader(stream)
+    details_report_json = {}
+    valid_sources = None
+    valid_source_count = 0
+    invalid_sources = []
+    if not reader.at_end():
+        for key in reader.iter_object():
+            if key != SOURCES_KEY or reader.peek() != "[":
+                details_report_json[key] = reader.read_value()
+                continue
+            valid_sources = []
+            for source_json in reader.iter_array():
+                source_error, result = _validate_source_json(source_json)
+                if source_error:
+                    invalid_sources.append(result)
+                elif details_report is not None:
+                    if details_report.pk is None:
+                        _reconcile_report_version(details_report, source_json)
+                        details_report.save()
+                    details_report.add_source(source_json)
+                    valid_source_count += 1
+                else:
+                    valid_sources.append(source_json)
+                    valid_source_count += 1
+            if details_report is None:
+                details_report_json[key] = valid_sources
+        reader.close()
+
+    if valid_sources is None or not details_report_json.get(REPORT_TYPE_KEY):
+        has_errors, validation_result = validate_details_report_json(
+            details_report_json, True
+        )
+        if has_errors:
+            return has_errors, validation_result
+        return False, details_report_json
+
+    if not valid_source_count and not invalid_sources:
+        return True, {SOURCES_KEY: _(messages.FC_REQUIRED_ATTRIBUTE)}
+    if invalid_sources:
+        if details_report is not None:
+            # only error responses list the valid sources, read them back
+            valid_sources = details_report.sources
+        return True, {
+            VALID_SOURCES_KEY: valid_sources,
+            INVALID_SOURCES_KEY: invalid_sources,
+        }
+    return False, details_report_json
+
+
 def _validate_sources_json(sources_json):
     """Validate sources field.
 
@@ -181,8 +313,7 @@ def create_details_report(report_version, json_details_report):
 
 
 def create_details_csv(details_report_dict, request):
-    """Create details csv."""
-    # pylint: disable=too-many-locals
+    """Create details csv from the details report as returned by the API."""
     report_id = details_report_dict.get("report_id")
     if report_id is None:
         return None
@@ -190,94 +321,144 @@ def create_details_csv(details_report_dict, request):
     details_report = DetailsReport.objects.filter(report_id=report_id).first()
     if details_report is None:
         return None
-    mask_report = request.query_params.get("mask", False)
-    # Check for a cached copy of csv
-    cached_csv = details_report.cached_csv
-    if validate_query_param_bool(mask_report):
-        cached_csv = details_report.cached_masked_csv
-    if cached_csv:
-        logger.info("Using cached csv results for details report %d", report_id)
-        return cached_csv
-    logger.info("No cached csv results for details report %d", report_id)
+    mask_report = validate_query_param_bool(request.query_params.get("mask", False))
+    sources = details_report_dict.get("sources")
+    chunks = report_cache.iter_cached(
+        details_report,
+        _csv_cache_name(mask_report),
+        lambda: iter_csv(_iter_details_csv_rows(details_report, sources)),
+    )
+    return "".join(chunks)
 
-    csv_helper = CSVHelper()
-    details_report_csv_buffer = StringIO()
-    csv_writer = csv.writer(details_report_csv_buffer, delimiter=",")
 
-    sources = details_report_dict.get("sources")
+def stream_details_csv(details_report, mask_report):
+    """Stream the details csv of a details report.
 
-    csv_writer.writerow(
-        [
-            "Report ID",
-            "Report Type",
-            "Report Version",
-            "Report Platform ID",
-            "Number Sources",
-        ]
+    Facts are read from the database one chunk at a time, twice per source:
+    once to find the csv headers and once to write the rows.
+    :param details_report: the DetailsReport
+    :param mask_report: bool indicating if sensitive facts must be masked
+    :returns: generator of str
+    """
+    sources = [
+        {
+            **report_source.attributes(),
+            FACTS_KEY: _SourceFacts(report_source, mask_report),
+        }
+        for report_source in details_report.report_sources.all()
+    ]
+    return report_cache.iter_cached(
+        details_report,
+        _csv_cache_name(mask_report),
+        lambda: iter_csv(_iter_details_csv_rows(details_report, sources)),
     )
-    if sources is None:
-        csv_writer.writerow(
-            [
-                report_id,
-                details_report.report_type,
-                details_report.report_version,
-                details_report.report_platform_id,
-                0,
-            ]
+
+
+def stream_details_json(details_report, mask_report):
+    """Stream the details report as serialized by DetailsReportSerializer.
+
+    Facts are read from the database one chunk at a time.
+    :param details_report: the DetailsReport
+    :param mask_report: bool indicating if sensitive facts must be masked
+    :returns: generator of bytes
+    """
+    serializer = DetailsReportSerializer(details_report)
+    field_names = list(serializer.fields)
+    # sources are streamed instead of serialized
+    del serializer.fields[SOURCES_KEY]
+    data = serializer.data
+    if details_report.source_count:
+        data[SOURCES_KEY] = (
+            {
+                **report_source.attributes(),
+                FACTS_KEY: iter(_SourceFacts(report_source, mask_report)),
+            }
+            for report_source in details_report.report_sources.iterator()
         )
-        return details_report_csv_buffer.getvalue()
-
-    csv_writer.writerow(
-        [
-            report_id,
-            details_report.report_type,
-            details_report.report_version,
-            details_report.report_platform_id,
-            len(sources),
-        ]
-    )
-    csv_writer.writerow([])
-    csv_writer.writerow([])
+    return iter_json({name: data[name] for name in field_names if name in data})
+
+
+def _csv_cache_name(mask_report):
+    if mask_report:
+        return "details-masked.csv"
+    return "details.csv"
+
+
+class _SourceFacts:
+    """Iterable over the facts of a DetailsReportSource, masked if requested.
+
+    Every iteration fetches the facts again, chunk by chunk.
+    """
+
+    def __init__(self, report_source, mask_report):
+        self.report_source = report_source
+        self.mask_report = mask_report
+
+    def __iter__(self):
+        for fact in self.report_source.iter_facts():
+            if self.mask_report:
+                mask_data_general([fact], MAC_AND_IP_FACTS, NAME_RELATED_FACTS)
+            yield fact
+
+
+def _iter_details_csv_rows(details_report, sources):
+    """Generate the csv rows of a details report.
+
+    :param details_report: the DetailsReport
+    :param sources: list of source dicts or None; the facts of each source
+        are iterated twice
+    """
+    csv_helper = CSVHelper()
+    yield [
+        "Report ID",
+        "Report Type",
+        "Report Version",
+        "Report Platform ID",
+        "Number Sources",
+    ]
+    report_row = [
+        details_report.report_id,
+        details_report.report_type,
+        details_report.report_version,
+        details_report.report_platform_id,
+    ]
+    if sources is None:
+        yield report_row + [0]
+        return
+
+    yield report_row + [len(sources)]
+    yield []
+    yield []
 
     for source in sources:
-        csv_writer.writerow(["Source"])
-        csv_writer.writerow(["Server Identifier", "Source Name", "Source Type"])
-        csv_writer.writerow(
-            [
-                source.get("server_id"),
-                source.get("source_name"),
-                source.get("source_type"),
-            ]
-        )
-        csv_writer.writerow(["Facts"])
+        yield ["Source"]
+        yield ["Server Identifier", "Source Name", "Source Type"]
+        yield [
+            source.get("server_id"),
+            source.get("source_name"),
+            source.get("source_type"),
+        ]
+        yield ["Facts"]
         fact_list = source.get("facts")
-        if not fact_list:
+        headers = csv_helper.generate_headers(fact_list or [])
+        if not headers:
             # write a space line and move to next
-            csv_writer.writerow([])
+            yield []
             continue
-        headers = csv_helper.generate_headers(fact_list)
-        csv_writer.writerow(headers)
+        yield headers
 
         for fact in fact_list:
-            row = []
-            for header in headers:
-                fact_value = fact.get(header)
-                row.append(csv_helper.serialize_value(header, fact_value))
-
-            csv_writer.writerow(sanitize_row(row))
-
-        csv_writer.writerow([])
-        csv_writer.writerow([])
-
-    logger.info("Caching csv results for details report %d", report_id)
-    cached_csv = details_report_csv_buffer.getvalue()
-    if validate_query_param_bool(mask_report):
-        details_report.cached_masked_csv = cached_csv
-    else:
-        details_report.cached_csv = cached_csv
-    details_report.save()
+            presence = csv_helper.product_presence(fact)
+            row = [
+                csv_helper.serialize_value(
+                    header, csv_helper.get_fact_value(fact, header, presence)
+                )
+                for header in headers
+            ]
+            yield sanitize_row(row)
 
-    return cached_csv
+        yield []
+        yield []
 
 
 def mask_details_facts(report):
@@ -287,23 +468,8 @@ def mask_details_facts(report):
 
     :returns: report <dict> The masked details report.
     """
-    mac_and_ip_facts = [
-        "ifconfig_ip_addresses",
-        "ip_addresses",
-        "vm.ip_addresses",
-        "ifconfig_mac_addresses",
-        "mac_addresses",
-        "vm.mac_addresses",
-    ]
-    name_related_facts = [
-        "vm.host_name",
-        "vm.dns_name",
-        "vm.cluster",
-        "vm.name",
-        "uname_hostname",
-    ]
     sources = report.get("sources", [])
     for source in sources:
         facts = source.get("facts")
-        source["facts"] = mask_data_general(facts, mac_and_ip_facts, name_related_facts)
+        source["facts"] = mask_data_general(facts, MAC_AND_IP_FACTS, NAME_RELATED_FACTS)
     return report
@@ -2,6 +2,7 @@
 
 import logging
 
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as _
 from rest_framework import mixins, status, viewsets
@@ -23,14 +24,14 @@ from api.common.report_json_gzip_renderer import ReportJsonGzipRenderer
 from api.common.util import is_int, validate_query_param_bool
 from api.details_report.csv_renderer import DetailsCSVRenderer
 from api.details_report.util import (
-    create_details_report,
     mask_details_facts,
-    validate_details_report_json,
+    read_details_report_request,
+    stream_details_csv,
 )
 from api.models import DetailsReport, ScanJob, ScanTask
-from api.serializers import DetailsReportSerializer
+from api.serializers import DetailsReportSerializer, ScanJobSerializer
+from api.signal.scanjob_signal import start_scan
 from api.user.authentication import QuipucordsExpiringTokenAuthentication
-from scanner.job import ScanJobRunner
 
 logger = logging.getLogger(__name__)
 
@@ -51,21 +52,24 @@ def details(request, report_id=None):
             error = {"report_id": [_(messages.COMMON_ID_INV)]}
             raise ValidationError(error)
     detail_data = get_object_or_404(DetailsReport.objects.all(), report_id=report_id)
+    mask_report = validate_query_param_bool(request.query_params.get("mask", False))
+    if request.accepted_renderer.format == DetailsCSVRenderer.format:
+        return StreamingHttpResponse(
+            stream_details_csv(detail_data, mask_report),
+            content_type=DetailsCSVRenderer.media_type,
+        )
     serializer = DetailsReportSerializer(detail_data)
     json_details = serializer.data
-    mask_report = request.query_params.get("mask", False)
-    if validate_query_param_bool(mask_report):
+    if mask_report:
         json_details = mask_details_facts(json_details)
-    http_accept = request.META.get("HTTP_ACCEPT")
-    if http_accept and "text/csv" not in http_accept:
-        json_details.pop("cached_csv", None)
     return Response(json_details)
 
 
 class DetailsReportsViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     """ModelViewSet to publish system facts.
 
-    This is internal API for a sync way to create a report.
+    This is internal API to upload a report, which is fingerprinted in the
+    background. The returned job tracks the progress.
     """
 
     authentication_classes = (
@@ -78,21 +82,16 @@ class DetailsReportsViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     serializer_class = DetailsReportSerializer
 
     def create(self, request, *args, **kwargs):
-        """Create a details report."""
+        """Create a details report and start fingerprinting it."""
         # pylint: disable=unused-argument
-        # Validate incoming request body
-        has_errors, validation_result = validate_details_report_json(request.data, True)
+        # Parse, validate and save incoming sources as the body is read
+        details_report = DetailsReport(report_version=create_report_version())
+        has_errors, result = read_details_report_request(request, details_report)
         if has_errors:
-            return Response(validation_result, status=status.HTTP_400_BAD_REQUEST)
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
 
-        report_version = request.data.get("report_version", None)
-        warn_deprecated = False
-        if not report_version:
-            warn_deprecated = True
-            report_version = create_report_version()
+        warn_deprecated = not result.get("report_version")
 
-        # Create FC model and save data
-        details_report = create_details_report(create_report_version(), request.data)
         scan_job = ScanJob.objects.create(
             scan_type=ScanTask.SCAN_TYPE_FINGERPRINT, details_report=details_report
         )
@@ -100,20 +99,10 @@ class DetailsReportsViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
             scan_job.log_message(
                 _(messages.FC_MISSING_REPORT_VERSION), log_level=logging.WARNING
             )
+        scan_job.log_current_status()
+        response_data = ScanJobSerializer(scan_job).data
 
-        scan_job.queue()
-        runner = ScanJobRunner(scan_job)
-        runner.run()
-
-        if scan_job.status != ScanTask.COMPLETED:
-            # pylint: disable=no-member
-            error_json = {"error": scan_job.tasks.first().status_message}
-            return Response(error_json, status=status.HTTP_400_BAD_REQUEST)
-
-        scan_job = ScanJob.objects.get(pk=scan_job.id)
-        details_report = DetailsReport.objects.get(pk=details_report.id)
+        # fingerprint in the background instead of tying up the http worker
+        start_scan.send(sender=self.__class__, instance=scan_job)
 
-        # Prepare REST response body
-        serializer = self.get_serializer(details_report)
-        result = serializer.data
-        return Response(result, status=status.HTTP_201_CREATED)
+        return Response(response_data, status=status.HTTP_201_CREATED)
@@ -5,7 +5,8 @@ These models are used in the REST definitions
 from datetime import datetime
 from json import JSONEncoder
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.utils.translation import gettext as _
 
 from api import messages
@@ -45,6 +46,34 @@ class TaskInspectionResult(models.Model):
         verbose_name_plural = _(messages.PLURAL_TASK_INSPECT_RESULTS_MSG)
 
 
+class SystemInspectionResultQuerySet(models.QuerySet):
+    """Specialized QuerySet for SystemInspectionResult model."""
+
+    @transaction.atomic
+    def create_with_facts(self, facts: dict, **kwargs):
+        """
+        Create a SystemInspectionResult and persist its facts in bulk.
+
+        RawFacts are inserted with bulk_create in batches of
+        settings.QPC_RAW_FACT_BATCH_SIZE instead of one INSERT per fact. Both
+        writes happen in the same transaction, so a system is never stored
+        without its facts.
+
+        :param facts: dict mapping fact names to fact values
+        :param kwargs: fields for the new SystemInspectionResult
+        :returns: the created SystemInspectionResult
+        """
+        sys_result = self.create(**kwargs)
+        raw_facts = [
+            RawFact(name=name, value=value, system_inspection_result=sys_result)
+            for name, value in facts.items()
+        ]
+        RawFact.objects.bulk_create(
+            raw_facts, batch_size=settings.QPC_RAW_FACT_BATCH_SIZE
+        )
+        return sys_result
+
+
 class SystemInspectionResult(models.Model):
     """A model the of captured system data."""
 
@@ -64,6 +93,9 @@ class SystemInspectionResult(models.Model):
         TaskInspectionResult, on_delete=models.CASCADE, related_name="systems"
     )
 
+    # custom queryset / object manager
+    objects = SystemInspectionResultQuerySet.as_manager()
+
     def __str__(self):
         """Convert to string."""
         # pylint: disable=no-member
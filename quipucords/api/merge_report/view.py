@@ -16,7 +16,11 @@ from rest_framework.serializers import ValidationError
 
 from api import messages
 from api.common.util import is_int
-from api.details_report.util import create_details_report, validate_details_report_json
+from api.details_report.util import (
+    create_details_report,
+    read_details_report_request,
+    validate_details_report_json,
+)
 from api.models import DetailsReport, ScanJob, ScanTask
 from api.serializers import DetailsReportSerializer, ScanJobSerializer
 from api.signal.scanjob_signal import start_scan
@@ -88,8 +92,12 @@ def async_merge_reports(request, scan_job_id=None):
         details_report_json = _convert_ids_to_json(request.data)
         return _create_async_merge_report_job(details_report_json)
 
-    # Post is last case
-    return _create_async_merge_report_job(request.data)
+    # Post is last case, save incoming sources as the body is read
+    details_report = DetailsReport()
+    has_errors, result = read_details_report_request(request, details_report)
+    if has_errors:
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+    return _start_merge_report_job(details_report)
 
 
 def _convert_ids_to_json(report_request_json):
@@ -146,9 +154,15 @@ def _create_async_merge_report_job(details_report_data):
     # Create FC model and save data
     report_version = details_report_data.get("report_version", None)
     details_report = create_details_report(report_version, details_report_data)
+    return _start_merge_report_job(details_report)
+
 
-    # Create new job to run
+def _start_merge_report_job(details_report):
+    """Create and start the job fingerprinting a merged details report.
 
+    :param details_report: the saved DetailsReport to fingerprint
+    :returns: Response for http request
+    """
     merge_job = ScanJob.objects.create(
         scan_type=ScanTask.SCAN_TYPE_FINGERPRINT, details_report=details_report
     )
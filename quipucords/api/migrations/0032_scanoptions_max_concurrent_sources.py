@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-17 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0031_alter_scantask_systems_count_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scanoptions",
+            name="max_concurrent_sources",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
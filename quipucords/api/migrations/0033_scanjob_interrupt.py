@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-17 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0032_scanoptions_max_concurrent_sources"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scanjob",
+            name="interrupt",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
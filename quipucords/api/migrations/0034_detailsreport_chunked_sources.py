@@ -0,0 +1,148 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# systems per DetailsReportFacts row; frozen here so the migration doesn't
+# depend on the current value of QPC_DETAILS_REPORT_CHUNK_SIZE
+CHUNK_SIZE = 100
+
+
+def split_sources(apps, schema_editor):
+    """Move DetailsReport.sources into DetailsReportSource/DetailsReportFacts."""
+    DetailsReport = apps.get_model("api", "DetailsReport")
+    DetailsReportSource = apps.get_model("api", "DetailsReportSource")
+    DetailsReportFacts = apps.get_model("api", "DetailsReportFacts")
+    for details_report in DetailsReport.objects.only("id", "sources").iterator(
+        chunk_size=1
+    ):
+        for sequence_number, source in enumerate(details_report.sources or [], 1):
+            report_source = DetailsReportSource.objects.create(
+                details_report=details_report,
+                sequence_number=sequence_number,
+                server_id=source.get("server_id"),
+                report_version=source.get("report_version"),
+                source_name=source.get("source_name"),
+                source_type=source.get("source_type"),
+            )
+            facts = source.get("facts") or []
+            DetailsReportFacts.objects.bulk_create(
+                DetailsReportFacts(
+                    report_source=report_source,
+                    sequence_number=chunk_number,
+                    facts=facts[start : start + CHUNK_SIZE],
+                )
+                for chunk_number, start in enumerate(
+                    range(0, len(facts), CHUNK_SIZE), 1
+                )
+            )
+
+
+def join_sources(apps, schema_editor):
+    """Rebuild DetailsReport.sources from its sources and fact chunks."""
+    DetailsReport = apps.get_model("api", "DetailsReport")
+    DetailsReportSource = apps.get_model("api", "DetailsReportSource")
+    DetailsReportFacts = apps.get_model("api", "DetailsReportFacts")
+    for details_report in DetailsReport.objects.only("id").iterator(chunk_size=1):
+        sources = []
+        for report_source in DetailsReportSource.objects.filter(
+            details_report=details_report
+        ).order_by("sequence_number"):
+            facts = []
+            for chunk in (
+                DetailsReportFacts.objects.filter(report_source=report_source)
+                .order_by("sequence_number")
+                .values_list("facts", flat=True)
+            ):
+                facts.extend(chunk)
+            sources.append(
+                {
+                    "server_id": report_source.server_id,
+                    "report_version": report_source.report_version,
+                    "source_name": report_source.source_name,
+                    "source_type": report_source.source_type,
+                    "facts": facts,
+                }
+            )
+        DetailsReport.objects.filter(id=details_report.id).update(sources=sources)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0033_scanjob_interrupt"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DetailsReportSource",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence_number", models.PositiveIntegerField()),
+                ("server_id", models.TextField(null=True)),
+                ("report_version", models.TextField(null=True)),
+                ("source_name", models.TextField(null=True)),
+                (
+                    "source_type",
+                    models.CharField(
+                        choices=[
+                            ("network", "network"),
+                            ("vcenter", "vcenter"),
+                            ("satellite", "satellite"),
+                            ("openshift", "openshift"),
+                            ("ansible", "ansible"),
+                        ],
+                        max_length=12,
+                        null=True,
+                    ),
+                ),
+                (
+                    "details_report",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="report_sources",
+                        to="api.detailsreport",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["sequence_number"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DetailsReportFacts",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence_number", models.PositiveIntegerField()),
+                ("facts", models.JSONField(default=list)),
+                (
+                    "report_source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fact_chunks",
+                        to="api.detailsreportsource",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["sequence_number"],
+            },
+        ),
+        migrations.RunPython(split_sources, join_sources),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # separate from 0034 so postgres doesn't refuse to alter api_detailsreport
+    # while the rows created there still have pending foreign key checks
+
+    dependencies = [
+        ("api", "0034_detailsreport_chunked_sources"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="detailsreport",
+            name="sources",
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-17 02:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0035_remove_detailsreport_sources"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="deploymentsreport",
+            name="cached_csv",
+        ),
+        migrations.RemoveField(
+            model_name="deploymentsreport",
+            name="cached_masked_csv",
+        ),
+        migrations.RemoveField(
+            model_name="detailsreport",
+            name="cached_csv",
+        ),
+        migrations.RemoveField(
+            model_name="detailsreport",
+            name="cached_masked_csv",
+        ),
+    ]
@@ -14,7 +14,11 @@ from api.deployments_report.model import (
     Product,
     SystemFingerprint,
 )
-from api.details_report.model import DetailsReport
+from api.details_report.model import (
+    DetailsReport,
+    DetailsReportFacts,
+    DetailsReportSource,
+)
 from api.inspectresult.model import (
     JobInspectionResult,
     RawFact,
@@ -2,6 +2,7 @@
 
 import logging
 
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as _
 from rest_framework import status
@@ -17,12 +18,13 @@ from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 
 from api import messages
+from api.common.common_report import iter_json
 from api.common.util import is_int, validate_query_param_bool
+from api.deployments_report.util import stream_deployments_csv
 from api.deployments_report.view import build_cached_json_report
-from api.details_report.util import mask_details_facts
+from api.details_report.util import stream_details_csv, stream_details_json
 from api.models import DeploymentsReport, DetailsReport
-from api.reports.reports_gzip_renderer import ReportsGzipRenderer
-from api.serializers import DetailsReportSerializer
+from api.reports.reports_gzip_renderer import ReportsGzipRenderer, stream_reports_tar_gz
 from api.user.authentication import QuipucordsExpiringTokenAuthentication
 
 logger = logging.getLogger(__name__)
@@ -37,21 +39,14 @@ perm_classes = (IsAuthenticated,)
 @renderer_classes((ReportsGzipRenderer,))
 def reports(request, report_id=None):
     """Lookup and return reports."""
-    reports_dict = {}
     mask_report = request.query_params.get("mask", False)
     if report_id is not None:
         if not is_int(report_id):
             error = {"report_id": [_(messages.COMMON_ID_INV)]}
             raise ValidationError(error)
-    reports_dict["report_id"] = report_id
     # details
     details_data = get_object_or_404(DetailsReport.objects.all(), report_id=report_id)
-    serializer = DetailsReportSerializer(details_data)
-    json_details = serializer.data
-    if validate_query_param_bool(mask_report):
-        json_details = mask_details_facts(json_details)
-    json_details.pop("cached_csv", None)
-    reports_dict["details_json"] = json_details
+    mask = validate_query_param_bool(mask_report)
     # deployments
     deployments_data = get_object_or_404(
         DeploymentsReport.objects.all(), report_id=report_id
@@ -67,8 +62,23 @@ def reports(request, report_id=None):
         )
     deployments_report = build_cached_json_report(deployments_data, mask_report)
     if deployments_report:
-        reports_dict["deployments_json"] = deployments_report
-        return Response(reports_dict)
+        system_fingerprints = deployments_report["system_fingerprints"]
+        if not system_fingerprints:
+            # nothing to bundle, like ReportsGzipRenderer
+            return Response(None)
+        deployments_report["system_fingerprints"] = iter(system_fingerprints)
+        return StreamingHttpResponse(
+            stream_reports_tar_gz(
+                report_id,
+                details_json=stream_details_json(details_data, mask),
+                deployments_json=iter_json(deployments_report),
+                details_csv=stream_details_csv(details_data, mask),
+                deployments_csv=stream_deployments_csv(
+                    deployments_data, mask, system_fingerprints
+                ),
+            ),
+            content_type=ReportsGzipRenderer.media_type,
+        )
     error = {
         "detail": f"Deployments report {report_id} could not be masked."
         " Rerun the scan to generate a masked deployments report."
@@ -13,6 +13,7 @@ from api.source.model import Source
 
 logger = logging.getLogger(__name__)
 DEFAULT_MAX_CONCURRENCY = 25
+DEFAULT_MAX_CONCURRENT_SOURCES = 1
 
 
 class ExtendedProductSearchOptions(models.Model):
@@ -94,6 +95,9 @@ class ScanOptions(models.Model):
     JBOSS_WS_EXT = "jboss_ws_ext"
 
     max_concurrency = models.PositiveIntegerField(default=DEFAULT_MAX_CONCURRENCY)
+    max_concurrent_sources = models.PositiveIntegerField(
+        default=DEFAULT_MAX_CONCURRENT_SOURCES
+    )
     disabled_optional_products = models.OneToOneField(
         DisabledOptionalProductsOptions, on_delete=models.CASCADE, null=True
     )
@@ -107,6 +111,7 @@ class ScanOptions(models.Model):
             "{"
             f"id:{self.id},"
             f" max_concurrency: {self.max_concurrency},"
+            f" max_concurrent_sources: {self.max_concurrent_sources},"
             f" disabled_optional_products: {self.disabled_optional_products},"
             f" enabled_extended_product_search: {self.enabled_extended_product_search}"
             "}"
@@ -117,6 +122,11 @@ class ScanOptions(models.Model):
         """Create the default number of forks."""
         return DEFAULT_MAX_CONCURRENCY
 
+    @staticmethod
+    def get_default_concurrent_sources():
+        """Create the default number of sources scanned at the same time."""
+        return DEFAULT_MAX_CONCURRENT_SOURCES
+
     @staticmethod
     def get_default_extra_vars():
         """Create the default set of extra_vars.
@@ -102,6 +102,12 @@ class ScanOptionsSerializer(NotEmptySerializer):
         max_value=200,
         default=ScanOptions.get_default_forks(),
     )
+    max_concurrent_sources = IntegerField(
+        required=False,
+        min_value=1,
+        max_value=20,
+        default=ScanOptions.get_default_concurrent_sources(),
+    )
     disabled_optional_products = DisableOptionalProductsOptionsSerializer(
         required=False
     )
@@ -115,6 +121,7 @@ class ScanOptionsSerializer(NotEmptySerializer):
         model = ScanOptions
         fields = [
             "max_concurrency",
+            "max_concurrent_sources",
             "disabled_optional_products",
             "enabled_extended_product_search",
         ]
@@ -277,8 +284,12 @@ class ScanSerializer(NotEmptySerializer):
                 instance.save()
             else:
                 max_concurrency = options.pop("max_concurrency", None)
+                max_concurrent_sources = options.pop("max_concurrent_sources", None)
                 if max_concurrency is not None:
                     options_instance.max_concurrency = max_concurrency
+                if max_concurrent_sources is not None:
+                    options_instance.max_concurrent_sources = max_concurrent_sources
+                if max_concurrency is not None or max_concurrent_sources is not None:
                     options_instance.save()
 
             if not optional_products and not extended_search:
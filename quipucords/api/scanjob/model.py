@@ -71,6 +71,10 @@ class ScanJob(models.Model):
         DetailsReport, null=True, on_delete=models.CASCADE
     )
 
+    # pause/cancel requests for jobs running on celery workers, which can't
+    # share a multiprocessing.Value with the scan manager
+    interrupt = models.PositiveSmallIntegerField(default=JOB_RUN)
+
     def __str__(self):
         """Convert to string."""
         return (
@@ -94,6 +98,25 @@ class ScanJob(models.Model):
         verbose_name_plural = _(messages.PLURAL_SCAN_JOBS_MSG)
         ordering = ["-id"]
 
+    def save(self, *args, **kwargs):
+        """Save the job without overwriting interrupts sent in the meantime.
+
+        interrupt is written by the scan manager and the celery workers with
+        queryset updates, so the in-memory value of a running job is usually
+        stale and must not be saved back.
+        """
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "interrupt"
+            ]
+        super().save(*args, **kwargs)
+
     def copy_scan_disabled_product_options(self):
         """Copy scan disabled products options."""
         new_disabled_optional_products = None
@@ -149,6 +172,7 @@ class ScanJob(models.Model):
                 extended_search = self.copy_scan_extended_product_options()
                 scan_job_options = ScanOptions.objects.create(
                     max_concurrency=scan.options.max_concurrency,
+                    max_concurrent_sources=scan.options.max_concurrent_sources,
                     disabled_optional_products=disable_options,
                     enabled_extended_product_search=extended_search,
                 )
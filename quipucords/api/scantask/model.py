@@ -3,9 +3,11 @@
 These models are used in the REST definitions.
 """
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from functools import cached_property
 
+from django.conf import settings
 from django.db import models, transaction
 from django.db.models import F
 from django.utils.translation import gettext as _
@@ -15,6 +17,7 @@ from api.connresult.model import TaskConnectionResult
 from api.details_report.model import DetailsReport
 from api.inspectresult.model import TaskInspectionResult
 from api.scantask.queryset import ScanTaskQuerySet
+from api.scantask.stats import ScanTaskStatsBuffer
 from api.source.model import Source
 
 logger = logging.getLogger(__name__)
@@ -253,6 +256,21 @@ class ScanTask(models.Model):
         :param sys_unreachable: Systems unreachable during scan.
         """
         # pylint: disable=too-many-arguments
+        stats_buffer = getattr(self, "_stats_buffer", None)
+        if stats_buffer is not None:
+            # the stats in memory are up to date, only write the new values
+            stats = {
+                field: value
+                for field, value in (
+                    ("systems_count", sys_count),
+                    ("systems_scanned", sys_scanned),
+                    ("systems_failed", sys_failed),
+                    ("systems_unreachable", sys_unreachable),
+                )
+                if value is not None
+            }
+            stats_buffer.set(description, stats)
+            return
         self.refresh_from_db()
         stats_changed = False
         if sys_count is not None and sys_count != self.systems_count:
@@ -302,28 +320,76 @@ class ScanTask(models.Model):
         Helper method to increment and save values.  Log will be
         produced after stats are updated.
         :param description: Name of entity (host, ip, etc)
-        :param increment_sys_count: True if should be incremented.
-        :param increment_sys_scanned: True if should be incremented.
-        :param increment_sys_failed: True if should be incremented.
-        :param increment_sys_unreachable: True if should be incremented.
+        :param increment_sys_count: True or number to add.
+        :param increment_sys_scanned: True or number to add.
+        :param increment_sys_failed: True or number to add.
+        :param increment_sys_unreachable: True or number to add.
         """
         # pylint: disable=too-many-arguments
-        update_kwargs = {}
-        if increment_sys_count:
-            update_kwargs["systems_count"] = F("systems_count") + 1
-        if increment_sys_scanned:
-            update_kwargs["systems_scanned"] = F("systems_scanned") + 1
-        if increment_sys_failed:
-            update_kwargs["systems_failed"] = F("systems_failed") + 1
-        if increment_sys_unreachable:
-            update_kwargs["systems_unreachable"] = F("systems_unreachable") + 1
-
-        if update_kwargs:
-            ScanTask.objects.filter(id=self.id).update(**update_kwargs)
-            self.refresh_from_db()
-            description = f"{prefix} {name}."
+        increments = {
+            field: int(increment)
+            for field, increment in (
+                ("systems_count", increment_sys_count),
+                ("systems_scanned", increment_sys_scanned),
+                ("systems_failed", increment_sys_failed),
+                ("systems_unreachable", increment_sys_unreachable),
+            )
+            if increment
+        }
+        if not increments:
+            return
+        description = f"{prefix} {name}"
+        stats_buffer = getattr(self, "_stats_buffer", None)
+        if stats_buffer is not None:
+            stats_buffer.add(description, increments)
+        else:
+            self.apply_stats_increments(increments, f"{description}.")
+
+    def apply_stats_increments(self, increments, description):
+        """Add increments to the stats saved in the database and log them.
+
+        :param increments: dict mapping stats fields to the numbers to add
+        :param description: Description to be logged with stats.
+        """
+        ScanTask.objects.filter(id=self.id).update(
+            **{field: F(field) + increment for field, increment in increments.items()}
+        )
+        self.refresh_from_db(fields=list(increments))
+        self._log_stats(description)
+
+    def save_stats(self, stats, description=None):
+        """Save stats counted in memory and log them.
+
+        :param stats: dict mapping stats fields to their values
+        :param description: Description to be logged with stats, None to
+            save them without logging.
+        """
+        ScanTask.objects.filter(id=self.id).update(**stats)
+        if description is not None:
             self._log_stats(description)
 
+    @contextmanager
+    def buffered_stats(self):
+        """Buffer the stats updates made in this context.
+
+        Stats are updated in memory right away and written every
+        settings.QPC_SCAN_STATS_FLUSH_COUNT updates or
+        settings.QPC_SCAN_STATS_FLUSH_INTERVAL seconds, and when the context
+        exits.
+        """
+        stats_buffer = ScanTaskStatsBuffer(
+            self,
+            settings.QPC_SCAN_STATS_FLUSH_COUNT,
+            settings.QPC_SCAN_STATS_FLUSH_INTERVAL,
+        )
+        self._stats_buffer = stats_buffer
+        stats_buffer.start()
+        try:
+            yield
+        finally:
+            self._stats_buffer = None
+            stats_buffer.stop()
+
     # All task types
     def status_start(self):
         """Change status to RUNNING."""
@@ -0,0 +1,154 @@
+"""Module for ScanTaskStatsBuffer."""
+
+import logging
+import threading
+import time
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class ScanTaskStatsBuffer:
+    """Coalesce the stats updates of a scan task into periodic writes.
+
+    Stats are updated in memory right away, so runners always read up to date
+    values, but they are written to the database once flush_count updates
+    were made or flush_interval seconds passed since the last write, instead
+    of once per system. Stats can be updated from several threads.
+    """
+
+    def __init__(self, scan_task, flush_count, flush_interval):
+        """Create a buffer for scan_task.
+
+        :param scan_task: the ScanTask whose stats are updated
+        :param flush_count: max number of updates kept before writing
+        :param flush_interval: max number of seconds updates are kept
+        """
+        self.scan_task = scan_task
+        self.flush_count = flush_count
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # held while writing so the values are written in the order they were
+        # read; never waited on while a database transaction may be open
+        self._write_lock = threading.Lock()
+        self._dirty_fields = set()
+        self._updated_fields = set()
+        self._pending = 0
+        self._last_description = None
+        self._last_flush = time.monotonic()
+        self._stopped = threading.Event()
+        self._timer = None
+
+    def start(self):
+        """Write the pending updates every flush_interval seconds.
+
+        Otherwise updates made before a long running system would only be
+        written once the next one is counted.
+        """
+        self._timer = threading.Thread(
+            target=self._flush_periodically,
+            name=f"scan-task-{self.scan_task.id}-stats",
+            daemon=True,
+        )
+        self._timer.start()
+
+    def stop(self):
+        """Stop the periodic writes and write the updated stats.
+
+        Every updated stat is written again, in case a previous write was
+        rolled back with the transaction it was made in.
+        """
+        self._stopped.set()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        with self._lock:
+            self._dirty_fields.update(self._updated_fields)
+        self.flush(wait=True)
+
+    def _flush_periodically(self):
+        """Write the pending updates once they are flush_interval old."""
+        try:
+            while not self._stopped.wait(self.flush_interval):
+                if time.monotonic() - self._last_flush < self.flush_interval:
+                    continue
+                try:
+                    self.flush()
+                except Exception:  # pylint: disable=broad-except
+                    # the updates are still pending, the next write has them
+                    logger.exception("Failed to save scan task stats")
+        finally:
+            # each thread has its own database connection
+            connections.close_all()
+
+    def add(self, description, increments):
+        """Add stats increments, writing them if the buffer is due.
+
+        :param description: description of the incremented entity
+        :param increments: dict mapping ScanTask stats fields to increments
+        """
+        with self._lock:
+            for field, increment in increments.items():
+                setattr(
+                    self.scan_task, field, getattr(self.scan_task, field) + increment
+                )
+            due = self._mark_pending(description, increments)
+        if due:
+            self.flush()
+
+    def set(self, description, values):
+        """Set stats and write them.
+
+        :param description: description of the update
+        :param values: dict mapping ScanTask stats fields to their new values
+        """
+        with self._lock:
+            for field, value in values.items():
+                setattr(self.scan_task, field, value)
+            self._mark_pending(description, values)
+        self.flush()
+
+    def _mark_pending(self, description, fields):
+        """Record an update of fields and return True if it's due."""
+        self._dirty_fields.update(fields)
+        self._updated_fields.update(fields)
+        self._pending += 1
+        self._last_description = description
+        return (
+            self._pending >= self.flush_count
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self, wait=False):
+        """Write the pending updates to the database.
+
+        :param wait: wait for a write in progress in another thread instead of
+            leaving the pending updates to the next write
+        """
+        if not self._write_lock.acquire(blocking=wait):
+            return
+        try:
+            with self._lock:
+                fields, self._dirty_fields = self._dirty_fields, set()
+                pending, self._pending = self._pending, 0
+                self._last_flush = time.monotonic()
+                stats = {field: getattr(self.scan_task, field) for field in fields}
+                description = self._last_description
+            if not stats:
+                return
+            if not pending:
+                description = None
+            elif pending == 1:
+                description = f"{description}."
+            else:
+                description = f"{description} (+{pending - 1} more)."
+            try:
+                self.scan_task.save_stats(stats, description)
+            except Exception:
+                with self._lock:
+                    self._dirty_fields.update(fields)
+                    self._pending += pending
+                raise
+        finally:
+            self._write_lock.release()
@@ -1,13 +1,11 @@
 """Vault is used to read and write data securely using the Ansible vault."""
 
 import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 
 import yaml
-
-# ANSIBLE API DEPENDENCY
-from ansible.module_utils._text import to_bytes
-from ansible.parsing.vault import VaultLib, VaultSecret
-from ansible.parsing.yaml.dumper import AnsibleDumper
 from django.conf import settings
 
 
@@ -18,6 +16,41 @@ def represent_none(self, _):
 
 yaml.add_representer(type(None), represent_none)
 
+# decrypted data by encrypted data, set while decrypted_data_cache is active
+_decrypted_data = ContextVar("decrypted_data", default=None)
+
+
+@lru_cache(maxsize=1)
+def _vault(password):
+    return Vault(password)
+
+
+def _get_vault():
+    """Return the process wide Vault for SECRET_KEY."""
+    return _vault(settings.SECRET_KEY)
+
+
+@contextmanager
+def decrypted_data_cache():
+    """Reuse decrypted data until the context exits.
+
+    Every decryption derives the vault key with PBKDF2, which is slow by
+    design, while scans decrypt the same credentials for each host they
+    reach. Data is cached by its encrypted value: vault salts each
+    encryption, so an updated credential never matches the entries of its
+    previous value. Entries are cleared when the outermost context exits.
+    """
+    if _decrypted_data.get() is not None:
+        yield
+        return
+    cache = {}
+    token = _decrypted_data.set(cache)
+    try:
+        yield
+    finally:
+        cache.clear()
+        _decrypted_data.reset(token)
+
 
 def encrypt_data(data):
     """Encrypt the incoming data using SECRET_KEY.
@@ -25,8 +58,7 @@ def encrypt_data(data):
     :param data: string data to be encrypted
     :returns: vault encrypted data as binary
     """
-    vault = Vault(settings.SECRET_KEY)
-    return vault.dump(data)
+    return _get_vault().dump(data)
 
 
 def decrypt_data(data):
@@ -35,8 +67,12 @@ def decrypt_data(data):
     :param data: string data to be decrypted
     :returns: vault decrypted data as string
     """
-    vault = Vault(settings.SECRET_KEY)
-    return vault.load(data)
+    cache = _decrypted_data.get()
+    if cache is None:
+        return _get_vault().load(data)
+    if data not in cache:
+        cache[data] = _get_vault().load(data)
+    return cache[data]
 
 
 def encrypt_data_as_unicode(data):
@@ -59,15 +95,23 @@ def decrypt_data_as_unicode(data):
 
 def write_to_yaml(data):
     """Write data to temp yaml file and return the file."""
-    vault = Vault(settings.SECRET_KEY)
-    return vault.dump_as_yaml_to_tempfile(data)
+    return _get_vault().dump_as_yaml_to_tempfile(data)
 
 
 class Vault:
-    """Read and write data using the Ansible vault."""
+    """Read and write data using the Ansible vault.
+
+    Ansible is imported when the first Vault is created instead of when this
+    module is, because models importing this module load at server startup.
+    """
 
     def __init__(self, password):
         """Create a vault."""
+        # ANSIBLE API DEPENDENCY
+        # pylint: disable=import-outside-toplevel
+        from ansible.module_utils._text import to_bytes
+        from ansible.parsing.vault import VaultLib, VaultSecret
+
         self.password = password
         pass_bytes = to_bytes(password, encoding="utf-8", errors="strict")
         secrets = [("password", VaultSecret(_bytes=pass_bytes))]
@@ -103,6 +147,9 @@ class Vault:
         :param stream: If not None the location to write the encrypted data to.
         :returns: If stream is None then the encrypted bytes otherwise None.
         """
+        # pylint: disable=import-outside-toplevel
+        from ansible.parsing.yaml.dumper import AnsibleDumper
+
         data = yaml.dump(
             obj, allow_unicode=True, default_flow_style=False, Dumper=AnsibleDumper
         )
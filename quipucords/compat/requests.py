@@ -26,6 +26,8 @@ class Session(requests.Session):
         max_retries=None,
         backoff_factor=None,
         retry_on_status_code_list=None,
+        raise_on_status=True,
+        pool_maxsize=None,
     ):
         """
         Initialize the class.
@@ -37,6 +39,10 @@ class Session(requests.Session):
         :param backoff_factor: backoff factor for automatic retries
         :param retry_on_status_code_list: list of status codes eligible for automatic
             retry. Defaults to DEFAULT_STATUS_CODE_LIST_FOR_RETRY`
+        :param raise_on_status: raise RetryError when retries on status codes are
+            exhausted; if False, the last response is returned instead
+        :param pool_maxsize: max number of keep-alive connections kept per host.
+            Defaults to requests default.
 
         [1]: https://requests.readthedocs.io/en/latest/user/authentication/#authentication
         """  # noqa: E501
@@ -46,18 +52,22 @@ class Session(requests.Session):
         self.auth = auth
         if max_retries is None:
             max_retries = settings.QPC_HTTP_RETRY_MAX_NUMBER
+        adapter_kwargs = {}
         if max_retries > 0:
             backoff_factor = backoff_factor or settings.QPC_HTTP_RETRY_BACKOFF
             retry_on_status_code_list = (
                 retry_on_status_code_list or self.DEFAULT_STATUS_CODE_LIST_FOR_RETRY
             )
-            adapter = requests.adapters.HTTPAdapter(
-                max_retries=Retry(
-                    max_retries,
-                    status_forcelist=retry_on_status_code_list,
-                    backoff_factor=backoff_factor,
-                )
+            adapter_kwargs["max_retries"] = Retry(
+                max_retries,
+                status_forcelist=retry_on_status_code_list,
+                backoff_factor=backoff_factor,
+                raise_on_status=raise_on_status,
             )
+        if pool_maxsize:
+            adapter_kwargs["pool_maxsize"] = pool_maxsize
+        if adapter_kwargs:
+            adapter = requests.adapters.HTTPAdapter(**adapter_kwargs)
             self.mount("http://", adapter)
             self.mount("https://", adapter)
 
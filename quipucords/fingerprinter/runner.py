@@ -1,12 +1,13 @@
 """ScanTask used for network connection discovery."""
 import logging
-import uuid
 from copy import deepcopy
 from datetime import datetime
 
-from django.db import DataError
+from django.conf import settings
+from django.db import DataError, transaction
 from rest_framework.serializers import DateField
 
+from api.common import report_cache
 from api.common.common_report import create_report_version
 from api.common.util import (
     convert_to_boolean,
@@ -36,7 +37,6 @@ from fingerprinter.jboss_web_server import detect_jboss_ws
 from fingerprinter.utils import strip_suffix
 from scanner.openshift import formatters as ocp_formatters
 from scanner.runner import ScanTaskRunner
-from scanner.vcenter.utils import VcenterRawFacts
 from utils import deepget, default_getter
 
 # pylint: disable=too-many-lines
@@ -62,8 +62,6 @@ NETWORK_VCENTER_MERGE_KEYS = [
     ("mac_addresses", "mac_addresses"),
 ]
 
-FINGERPRINT_GLOBAL_ID_KEY = "FINGERPRINT_GLOBAL_ID"
-
 # keys are in reverse order of accuracy (last most accurate)
 # (date_key, date_pattern)
 RAW_DATE_KEYS = dict(
@@ -84,6 +82,16 @@ NAME_RELATED_FACTS = ["name", "vm_dns_name", "virtual_host_name"]
 COMBINED_KEY = "combined_fingerprints"
 
 
+def _index_values(id_key_value):
+    """Return the values a fingerprint is indexed by for a single key."""
+    if not id_key_value:
+        return []
+    if isinstance(id_key_value, list):
+        # value is list so explode
+        return id_key_value
+    return [id_key_value]
+
+
 class FingerprintTaskRunner(ScanTaskRunner):
     """ConnectTaskRunner system connection capabilities.
 
@@ -112,6 +120,10 @@ class FingerprintTaskRunner(ScanTaskRunner):
     def execute_task(self, manager_interrupt):
         """Execute fingerprint task."""
         details_report = self.scan_task.details_report
+        # reports rendered from a previous fingerprinting are stale
+        report_cache.clear(details_report)
+        if details_report.deployment_report is not None:
+            report_cache.clear(details_report.deployment_report)
 
         deployment_report = DeploymentsReport(report_version=create_report_version())
         deployment_report.save()
@@ -169,75 +181,24 @@ class FingerprintTaskRunner(ScanTaskRunner):
 
         self.scan_task.log_message("END DEDUPLICATION")
 
-        number_valid = 0
-        number_invalid = 0
         self.scan_task.log_message("START FINGERPRINT PERSISTENCE")
-        status_count = 0
-        total_count = len(fingerprints_list)
         deployment_report = details_report.deployment_report
-        date_field = DateField()
+        total_count = len(fingerprints_list)
+        batch_size = settings.QPC_FINGERPRINT_BATCH_SIZE
         final_fingerprint_list = []
-
-        valid_fact_attributes = {
-            field.name for field in SystemFingerprint._meta.get_fields()
-        }
-
-        for fingerprint_dict in fingerprints_list:
-            # Remove keys that are not part of SystemFingerprint model
-            fingerprint_attributes = set(fingerprint_dict.keys())
-            invalid_attributes = fingerprint_attributes - valid_fact_attributes
-            for invalid_attribute in invalid_attributes:
-                fingerprint_dict.pop(invalid_attribute, None)
-
-            status_count += 1
-            name = fingerprint_dict.get("name", "unknown")
-            os_release = fingerprint_dict.get("os_release", "unknown")
-            self.scan_task.log_message(
-                f"FINGERPRINT {status_count} of {total_count} SAVED - Fingerprint "
-                f"(name={name}, os_release={os_release})"
+        number_invalid = 0
+        for batch_start in range(0, total_count, batch_size):
+            self.check_for_interrupt(manager_interrupt)
+            batch = fingerprints_list[batch_start : batch_start + batch_size]
+            saved_fingerprints, batch_invalid = self._save_fingerprints(
+                deployment_report, batch
             )
-
-            if status_count % 100 == 0:
-                self.check_for_interrupt(manager_interrupt)
-            fingerprint_dict["deployment_report"] = deployment_report.id
-            serializer = SystemFingerprintSerializer(data=fingerprint_dict)
-            if serializer.is_valid():
-                try:
-                    fingerprint = serializer.save()
-
-                    # Add auto-generated fields for the insights report
-                    fingerprint_dict["id"] = fingerprint.id
-
-                    # Serialize the date
-                    for field in SystemFingerprint.DATE_FIELDS:
-                        if fingerprint_dict.get(field, None):
-                            fingerprint_dict[field] = date_field.to_representation(
-                                fingerprint_dict.get(field)
-                            )
-                    final_fingerprint_list.append(fingerprint_dict)
-                    number_valid += 1
-                except DataError as error:
-                    number_invalid += 1
-                    self.scan_task.log_message(
-                        "The fingerprint could not be saved. "
-                        f"Fingerprint: {str(error).strip()}. Error: {fingerprint_dict}",
-                        log_level=logging.ERROR,
-                        exception=error,
-                    )
-            else:
-                number_invalid += 1
-                self.scan_task.log_message(
-                    f"Invalid fingerprint: {fingerprint_dict}",
-                    log_level=logging.ERROR,
-                )
-                self.scan_task.log_message(
-                    f"Fingerprint errors: {serializer.errors}",
-                    log_level=logging.ERROR,
-                )
+            final_fingerprint_list.extend(saved_fingerprints)
+            number_invalid += batch_invalid
             self.scan_task.log_message(
-                f"Fingerprints (report id={details_report.id}): {fingerprint_dict}",
-                log_level=logging.DEBUG,
+                f"FINGERPRINTS {batch_start + len(batch)} of {total_count} PROCESSED"
             )
+        number_valid = len(final_fingerprint_list)
 
         # Mark completed because engine has processed raw facts
         status = ScanTask.COMPLETED
@@ -268,6 +229,92 @@ class FingerprintTaskRunner(ScanTaskRunner):
 
         return status_message, status
 
+    def _save_fingerprints(self, deployment_report, fingerprints):
+        """Validate and bulk create a batch of fingerprints.
+
+        :param deployment_report: DeploymentsReport the fingerprints belong to
+        :param fingerprints: list of fingerprint dicts
+        :returns: list of the saved fingerprint dicts, updated with their id and
+            serialized dates, and the number of invalid fingerprints
+        """
+        valid_fact_attributes = {
+            field.name for field in SystemFingerprint._meta.get_fields()
+        }
+        for fingerprint_dict in fingerprints:
+            # Remove keys that are not part of SystemFingerprint model
+            for invalid_attribute in set(fingerprint_dict) - valid_fact_attributes:
+                fingerprint_dict.pop(invalid_attribute, None)
+
+        number_invalid = 0
+        serializer = SystemFingerprintSerializer(data=fingerprints, many=True)
+        if not serializer.is_valid():
+            valid_fingerprints = []
+            for fingerprint_dict, errors in zip(fingerprints, serializer.errors):
+                if not errors:
+                    valid_fingerprints.append(fingerprint_dict)
+                    continue
+                number_invalid += 1
+                self.scan_task.log_message(
+                    f"Invalid fingerprint: {fingerprint_dict}",
+                    log_level=logging.ERROR,
+                )
+                self.scan_task.log_message(
+                    f"Fingerprint errors: {errors}",
+                    log_level=logging.ERROR,
+                )
+            fingerprints = valid_fingerprints
+            if not fingerprints:
+                return [], number_invalid
+            serializer = SystemFingerprintSerializer(data=fingerprints, many=True)
+            serializer.is_valid(raise_exception=True)
+
+        try:
+            with transaction.atomic():
+                saved_fingerprints = serializer.save(
+                    deployment_report=deployment_report
+                )
+        except DataError:
+            # find out which fingerprints can't be stored, one at a time
+            saved_fingerprints = []
+            saved_dicts = []
+            for fingerprint_dict, validated_data in zip(
+                fingerprints, serializer.validated_data
+            ):
+                try:
+                    with transaction.atomic():
+                        saved_fingerprints.append(
+                            serializer.child.create(
+                                {
+                                    **validated_data,
+                                    "deployment_report": deployment_report,
+                                }
+                            )
+                        )
+                    saved_dicts.append(fingerprint_dict)
+                except DataError as error:
+                    number_invalid += 1
+                    self.scan_task.log_message(
+                        "The fingerprint could not be saved. "
+                        f"Fingerprint: {str(error).strip()}. Error: {fingerprint_dict}",
+                        log_level=logging.ERROR,
+                        exception=error,
+                    )
+            fingerprints = saved_dicts
+
+        date_field = DateField()
+        for fingerprint_dict, fingerprint in zip(fingerprints, saved_fingerprints):
+            # Add auto-generated fields for the insights report
+            fingerprint_dict["deployment_report"] = deployment_report.id
+            fingerprint_dict["id"] = fingerprint.id
+
+            # Serialize the date
+            for field in SystemFingerprint.DATE_FIELDS:
+                if fingerprint_dict.get(field, None):
+                    fingerprint_dict[field] = date_field.to_representation(
+                        fingerprint_dict.get(field)
+                    )
+        return fingerprints, number_invalid
+
     @staticmethod
     def _format_count_message(fingerprint_map, total_only=False):
         if not total_only:
@@ -307,11 +354,11 @@ class FingerprintTaskRunner(ScanTaskRunner):
         # pylint: disable=too-many-statements
         # fingerprints per source type
         fingerprint_map = {datasource: [] for datasource in DataSources.values}
-        source_list = details_report.sources
-        total_source_count = len(source_list)
+        total_source_count = details_report.source_count
         self.scan_task.log_message(f"{total_source_count} sources to process")
         source_count = 0
-        for source in source_list:
+        # facts are fetched one chunk of systems at a time
+        for source in details_report.iter_sources():
             source_count += 1
             source_type = source.get("source_type")
             source_name = source.get("source_name")
@@ -568,22 +615,21 @@ class FingerprintTaskRunner(ScanTaskRunner):
         if not base_list:
             return number_merged, merge_list
 
-        # start with the base_list fingerprints
-        result = base_list[:]
-        to_merge = merge_list[:]
-        for key_tuple in merge_keys_list:
-            key_merged_count, result, to_merge = self._merge_matching_fingerprints(
-                key_tuple[0],
-                result,
-                key_tuple[1],
+        # base fingerprints are merged in place, so only the candidates left
+        # over by each key need to be carried to the next one
+        to_merge = merge_list
+        for base_key, candidate_key in merge_keys_list:
+            key_merged_count, _, to_merge = self._merge_matching_fingerprints(
+                base_key,
+                base_list,
+                candidate_key,
                 to_merge,
                 reverse_priority_keys=reverse_priority_keys,
             )
             number_merged += key_merged_count
 
         # Add remaining as they didn't match anything (no merge)
-        result = result + to_merge
-        return number_merged, result
+        return number_merged, base_list + to_merge
 
     def _merge_matching_fingerprints(
         self,
@@ -596,154 +642,119 @@ class FingerprintTaskRunner(ScanTaskRunner):
         """Given keys and two lists, merge on key equality.
 
         Given two lists of fingerprints, match on provided keys and merge
-        if keys match.  Base values have precedence.
+        if keys match.  Base values have precedence.  Matching candidates
+        are merged in place into base fingerprints, each candidate into the
+        first base fingerprint it matches.
         :param base_key: base_key used to create an index of base_list
         :param base_list: list of dict objects
         :param candidate_key: candidate_key used to create an index of
         candidate_list
         :param candidate_list: list of dict objects
-        :returns: int indicating number merged and
-        fingerprint produced from fact
+        :returns: int indicating number merged, base_list and the list of
+        candidates that didn't match any base fingerprint
         :param reverse_priority_keys: Set of keys in to_merge_fingerprint
         that should reverse the priority.  In other words, the value
         of to_merge_fingerprint should be used instead of the
         priority_fingerprint value.
         """
-        # pylint: disable=too-many-locals,consider-iterating-dictionary
-        base_dict, base_no_key = self._create_index_for_fingerprints(
-            base_key, base_list
-        )
-        candidate_dict, candidate_no_key = self._create_index_for_fingerprints(
-            candidate_key, candidate_list
-        )
+        base_dict, _ = self._create_index_for_fingerprints(base_key, base_list)
 
-        # Initialize lists with values that cannot be compared
-        base_match_list = []
         candidate_no_match_list = []
-
         number_merged = 0
-        # Match candidate to base fingerprint using index key
-        for candidate_index_key, candidate_fingerprint in candidate_dict.items():
-            # For each overlay fingerprint check for matching base fingerprint
-            # using candidate_index_key.  Remove so value is not in
-            # left-over set
-            base_value = base_dict.pop(candidate_index_key, None)
-            if base_value:
-                # candidate_index_key == base_key so merge
-                merged_value = self._merge_fingerprint(
-                    base_value,
-                    candidate_fingerprint,
-                    reverse_priority_keys=reverse_priority_keys,
-                )
-                number_merged += 1
+        for candidate_fingerprint in candidate_list:
+            base_fingerprint = None
+            # a base value is only consumed by the first candidate matching it
+            for candidate_value in _index_values(
+                candidate_fingerprint.get(candidate_key)
+            ):
+                matched_fingerprint = base_dict.pop(candidate_value, None)
+                if base_fingerprint is None:
+                    base_fingerprint = matched_fingerprint
 
-                # Add merged value to key
-                base_match_list.append(merged_value)
-            else:
-                # Could not merge, so add to not merged list
+            if base_fingerprint is None:
                 candidate_no_match_list.append(candidate_fingerprint)
+                continue
 
-        # Merge base items without key, matched, and remainder
-        # who did not match
-        base_result_list = base_no_key + base_match_list + list(base_dict.values())
-        base_result_list = self._remove_duplicate_fingerprints(
-            [FINGERPRINT_GLOBAL_ID_KEY], base_result_list, True
-        )
-
-        # Merge candidate items without key list with those that didn't match
-        candidate_no_match_list = candidate_no_key + candidate_no_match_list
-        candidate_no_match_list = self._remove_duplicate_fingerprints(
-            [FINGERPRINT_GLOBAL_ID_KEY], candidate_no_match_list, True
-        )
+            self._merge_fingerprint(
+                base_fingerprint,
+                candidate_fingerprint,
+                reverse_priority_keys=reverse_priority_keys,
+            )
+            number_merged += 1
 
-        return number_merged, base_result_list, candidate_no_match_list
+        return number_merged, base_list, candidate_no_match_list
 
-    def _remove_duplicate_fingerprints(
-        self, id_key_list, fingerprint_list, remove_key=False
-    ):
+    def _remove_duplicate_fingerprints(self, id_key_list, fingerprint_list):
         """Given a list of dict remove duplicates.
 
-        Takes fingerprint_list and retrieves dict value for
-        FINGERPRINT_GLOBAL_ID_KEY. Builds a map using this.  A
-        fingerprint that was duplicated for mac_address comparision will
-        have the samme FINGERPRINT_GLOBAL_ID_KEY.
+        Fingerprints sharing a value for any of the keys in id_key_list are
+        grouped (transitively, across all keys) and each group is merged in
+        place into its first fingerprint, which has precedence.
         :param id_key_list: keys used to evaulate uniqueness
         :param fingerprint_list: list of dict objects to be keyed by id_key
-        :param remove_key: bool that determines if the id_key and its value
-        should be removed from fingerprint
         :returns: list of fingerprints that is unique
         """
         if not fingerprint_list:
             return fingerprint_list
 
-        result_list = deepcopy(fingerprint_list)
-        for id_key in id_key_list:
-            unique_dict = {}
-            no_global_id_list = []
-            for fingerprint in result_list:
-                unique_id_value = fingerprint.get(id_key)
-                if unique_id_value:
-                    # Add or update fingerprint value
-                    existing_fingerprint = unique_dict.get(unique_id_value)
-                    if existing_fingerprint:
-                        unique_dict[unique_id_value] = self._merge_fingerprint(
-                            existing_fingerprint, fingerprint
-                        )
-                    else:
-                        unique_dict[unique_id_value] = fingerprint
-                else:
-                    no_global_id_list.append(fingerprint)
+        # union-find over list positions; the root of a group is always its
+        # lowest position, so merge priority follows the list order
+        parents = list(range(len(fingerprint_list)))
 
-            result_list = no_global_id_list + list(unique_dict.values())
+        def find_root(position):
+            while parents[position] != position:
+                parents[position] = parents[parents[position]]
+                position = parents[position]
+            return position
 
-            # Strip id key from fingerprints if requested
-            if remove_key:
-                for fingerprint in result_list:
-                    fingerprint.pop(id_key, None)
+        for id_key in id_key_list:
+            first_position_by_value = {}
+            for position, fingerprint in enumerate(fingerprint_list):
+                for id_value in _index_values(fingerprint.get(id_key)):
+                    other_position = first_position_by_value.setdefault(
+                        id_value, position
+                    )
+                    root = find_root(position)
+                    other_root = find_root(other_position)
+                    if root != other_root:
+                        parents[max(root, other_root)] = min(root, other_root)
+
+        groups = {}
+        for position, fingerprint in enumerate(fingerprint_list):
+            groups.setdefault(find_root(position), []).append(fingerprint)
+
+        result_list = []
+        for priority_fingerprint, *duplicate_fingerprints in groups.values():
+            for fingerprint in duplicate_fingerprints:
+                if fingerprint is not priority_fingerprint:
+                    self._merge_fingerprint(priority_fingerprint, fingerprint)
+            result_list.append(priority_fingerprint)
 
         return result_list
 
-    def _create_index_for_fingerprints(
-        self, id_key, fingerprint_list, create_global_id=True
-    ):
+    def _create_index_for_fingerprints(self, id_key, fingerprint_list):
         """Given a list of dict, create index by id_key.
 
         Takes fingerprint_list and retrieves dict value for id_key.
         Adds this to a result dict by id_key values.  For example,
         given a list of system fact dict, creates a dict of systems
-        by mac_address.
+        by mac_address.  The index references the fingerprints in
+        fingerprint_list, they are not copied.
         :param id_key: key to use in dict creation
         :param fingerprint_list: list of dict objects to be keyed by id_key
-        :param create_global_id: If True, a new key/value is placed in the
-        index.  The key is FINGERPRINT_GLOBAL_ID_KEY and the value is a newly
-        generated UUID.  This allows you to de-duplicate later if needed.
         :returns: dict of values keyed by id_key and list of values
         who do not have the id_key
         """
         result_by_key = {}
         key_not_found_list = []
         number_duplicates = 0
-        fingerprint_list = deepcopy(fingerprint_list)
         for value_dict in fingerprint_list:
-            # Add globally unique key for de-duplication later
-            if create_global_id:
-                value_dict[FINGERPRINT_GLOBAL_ID_KEY] = str(uuid.uuid4())
-            id_key_value = value_dict.get(id_key)
-            if id_key_value:
-                if isinstance(id_key_value, list):
-                    # value is list so explode
-                    for list_value in id_key_value:
-                        if result_by_key.get(list_value) is None:
-                            result_by_key[list_value] = value_dict
-                        else:
-                            number_duplicates += 1
-                else:
-                    if result_by_key.get(id_key_value) is None:
-                        result_by_key[id_key_value] = value_dict
-                    else:
-                        number_duplicates += 1
-            else:
+            id_key_values = _index_values(value_dict.get(id_key))
+            if not id_key_values:
                 key_not_found_list.append(value_dict)
+            for id_key_value in id_key_values:
+                if result_by_key.setdefault(id_key_value, value_dict) is not value_dict:
+                    number_duplicates += 1
         if number_duplicates:
             self.scan_task.log_message(
                 "_create_index_for_fingerprints - "
@@ -762,7 +773,8 @@ class FingerprintTaskRunner(ScanTaskRunner):
 
         The priority_fingerprint values are always used.  The
         to_merge_fingerprint values are only used when the priority_fingerprint
-        is missing the same values.
+        is missing the same values.  priority_fingerprint is updated in place
+        and may share values with to_merge_fingerprint afterwards.
         :param priority_fingerprint: Fingerprint that has precedence if
         both have the same attribute.
         :param to_merge_fingerprint: Fingerprint whose values are used
@@ -772,8 +784,6 @@ class FingerprintTaskRunner(ScanTaskRunner):
         of to_merge_fingerprint should be used instead of the
         priority_fingerprint value.
         """
-        priority_fingerprint = deepcopy(priority_fingerprint)
-        to_merge_fingerprint = deepcopy(to_merge_fingerprint)
         priority_keys = set(priority_fingerprint.keys())
         to_merge_keys = set(to_merge_fingerprint.keys())
 
@@ -851,8 +861,8 @@ class FingerprintTaskRunner(ScanTaskRunner):
         # merge products
         if to_merge_fingerprint.get(PRODUCTS_KEY):
             if PRODUCTS_KEY not in priority_fingerprint:
-                priority_fingerprint[PRODUCTS_KEY] = to_merge_fingerprint.get(
-                    PRODUCTS_KEY, []
+                priority_fingerprint[PRODUCTS_KEY] = list(
+                    to_merge_fingerprint.get(PRODUCTS_KEY, [])
                 )
             else:
                 priority_prod_dict = {}
@@ -1333,7 +1343,7 @@ class FingerprintTaskRunner(ScanTaskRunner):
         # https://github.com/quipucords/quipucords/blob/bf1f034b6596ba01c9c89f766088108dd3f421fc/quipucords/scanner/vcenter/inspect.py#L190-L191
         self._add_fact_to_fingerprint(
             source,
-            VcenterRawFacts.MEMORY_SIZE,
+            "vm.memory_size",
             fact,
             "system_memory_bytes",
             fingerprint,
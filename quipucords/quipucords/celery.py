@@ -17,3 +17,5 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+# scanner is not a Django app, but it holds the scan job tasks.
+app.autodiscover_tasks(["scanner"])
@@ -14,6 +14,7 @@ import logging
 import os
 import random
 import string
+import tempfile
 from pathlib import Path
 
 import environ
@@ -34,6 +35,10 @@ QPC_DISABLE_THREADED_SCAN_MANAGER = env.bool("QPC_DISABLE_THREADED_SCAN_MANAGER"
 QPC_DISABLE_MULTIPROCESSING_SCAN_JOB_RUNNER = env.bool(
     "QPC_DISABLE_MULTIPROCESSING_SCAN_JOB_RUNNER", False
 )
+# number of scan jobs the scan manager runs at the same time
+QPC_SCAN_MANAGER_WORKER_SLOTS = env.int("QPC_SCAN_MANAGER_WORKER_SLOTS", 1)
+# run scan jobs on celery workers instead of the in-process scan manager
+QPC_ENABLE_CELERY_SCAN_MANAGER = env.bool("QPC_ENABLE_CELERY_SCAN_MANAGER", False)
 
 # This suppresses warnings for models where an explicit primary key is not defined.
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
@@ -77,15 +82,52 @@ def app_secret_key_and_path():
 
 QPC_SSH_CONNECT_TIMEOUT = env.int("QPC_SSH_CONNECT_TIMEOUT", 60)
 QPC_SSH_INSPECT_TIMEOUT = env.int("QPC_SSH_INSPECT_TIMEOUT", 120)
+# share the ssh connections of a scan job between its connect and inspect runs
+QPC_SSH_MULTIPLEXING = env.bool("QPC_SSH_MULTIPLEXING", True)
+QPC_SSH_CONTROL_PERSIST = env.int("QPC_SSH_CONTROL_PERSIST", 600)
+QPC_SSH_CONTROL_PATH_DIR = Path(
+    env.str("QPC_SSH_CONTROL_PATH_DIR", str(Path(tempfile.gettempdir()) / "qpc-ssh"))
+)
+# "playbook" runs each raw task of the inspect roles in its own ssh session,
+# "collector" runs the commands known upfront in one session per host first
+QPC_NETWORK_INSPECT_ENGINE = env.str("QPC_NETWORK_INSPECT_ENGINE", "playbook")
+# threads processing inspect events apart from the ansible event handler
+# (0 processes them in the event handler itself)
+QPC_INSPECT_EVENT_WORKERS = env.int("QPC_INSPECT_EVENT_WORKERS", 2)
+# max number of inspect events queued per worker before the event handler waits
+QPC_INSPECT_EVENT_QUEUE_SIZE = env.int("QPC_INSPECT_EVENT_QUEUE_SIZE", 1000)
+# max number of finished hosts saved per transaction by inspect event workers
+QPC_INSPECT_RESULT_BATCH_SIZE = env.int("QPC_INSPECT_RESULT_BATCH_SIZE", 50)
 
 NETWORK_INSPECT_JOB_TIMEOUT = env.int("NETWORK_INSPECT_JOB_TIMEOUT", 10800)  # 3 hours
 NETWORK_CONNECT_JOB_TIMEOUT = env.int("NETWORK_CONNECT_JOB_TIMEOUT", 600)  # 10 minutes
 
 QPC_CONNECT_TASK_TIMEOUT = env.int("QPC_CONNECT_TASK_TIMEOUT", 30)
+# keep max_concurrency hosts in flight in several ansible runs of a few hosts
+# each, instead of running groups of max_concurrency hosts one after another
+QPC_NETWORK_SLIDING_WINDOW = env.bool("QPC_NETWORK_SLIDING_WINDOW", False)
+QPC_NETWORK_SLIDING_WINDOW_GROUP_SIZE = env.int(
+    "QPC_NETWORK_SLIDING_WINDOW_GROUP_SIZE", 1
+)
+# check the ssh port of network scan hosts before running the connect playbook
+QPC_CONNECT_PROBE_ENABLED = env.bool("QPC_CONNECT_PROBE_ENABLED", True)
+QPC_CONNECT_PROBE_TIMEOUT = env.float("QPC_CONNECT_PROBE_TIMEOUT", 5)
+QPC_CONNECT_PROBE_CONCURRENCY = env.int("QPC_CONNECT_PROBE_CONCURRENCY", 1000)
 QPC_INSPECT_TASK_TIMEOUT = env.int("QPC_INSPECT_TASK_TIMEOUT", 600)
 
 QPC_HTTP_RETRY_MAX_NUMBER = env.int("QPC_HTTP_RETRY_MAX_NUMBER", 5)
 QPC_HTTP_RETRY_BACKOFF = env.float("QPC_HTTP_RETRY_BACKOFF", 0.1)
+# max number of keep-alive connections each satellite scan worker keeps open
+QPC_SATELLITE_HTTP_POOL_SIZE = env.int("QPC_SATELLITE_HTTP_POOL_SIZE", 4)
+# number of satellite results requested per page, unless the server uses less
+QPC_SATELLITE_PAGE_SIZE = env.int("QPC_SATELLITE_PAGE_SIZE", 100)
+# inspect satellite 5 hosts with one session per worker, batching the calls
+# for each host with system.multicall, instead of logging in for every host
+QPC_SATELLITE5_WORKER_SESSIONS = env.bool("QPC_SATELLITE5_WORKER_SESSIONS", False)
+# max number of satellite host details saved at once while others are requested
+QPC_SATELLITE_RESULT_BATCH_SIZE = env.int("QPC_SATELLITE_RESULT_BATCH_SIZE", 50)
+# max number of vcenter VMs retrieved and saved at once
+QPC_VCENTER_PAGE_SIZE = env.int("QPC_VCENTER_PAGE_SIZE", 1000)
 
 ANSIBLE_LOG_LEVEL = env.int("ANSIBLE_LOG_LEVEL", 3)
 
@@ -377,6 +419,23 @@ QPC_EXCLUDE_INTERNAL_FACTS = env.bool("QPC_EXCLUDE_INTERNAL_FACTS", True)
 QPC_TOKEN_EXPIRE_HOURS = env.int("QPC_TOKEN_EXPIRE_HOURS", 24)
 QPC_INSIGHTS_REPORT_SLICE_SIZE = env.int("QPC_INSIGHTS_REPORT_SLICE_SIZE", 10000)
 QPC_INSIGHTS_DATA_COLLECTOR_LABEL = env.str("QPC_INSIGHTS_DATA_COLLECTOR_LABEL", "qpc")
+# max number of RawFacts inserted per query when persisting inspection results
+QPC_RAW_FACT_BATCH_SIZE = env.int("QPC_RAW_FACT_BATCH_SIZE", 500)
+# max number of fingerprints validated and inserted at once by the fingerprinter
+QPC_FINGERPRINT_BATCH_SIZE = env.int("QPC_FINGERPRINT_BATCH_SIZE", 500)
+# scan task stats increments are saved once this many were made...
+QPC_SCAN_STATS_FLUSH_COUNT = env.int("QPC_SCAN_STATS_FLUSH_COUNT", 100)
+# ...or once this many seconds passed since they were last saved
+QPC_SCAN_STATS_FLUSH_INTERVAL = env.float("QPC_SCAN_STATS_FLUSH_INTERVAL", 2)
+# number of systems whose facts are stored in each details report chunk
+QPC_DETAILS_REPORT_CHUNK_SIZE = env.int("QPC_DETAILS_REPORT_CHUNK_SIZE", 100)
+# directory where rendered reports (csv) are cached, gzip compressed
+QPC_REPORT_CACHE_DIR = Path(
+    env.str(
+        "QPC_REPORT_CACHE_DIR",
+        str(Path(env.str("DJANGO_DB_PATH", str(BASE_DIR))) / "report_cache"),
+    )
+)
 
 QPC_LOG_ALL_ENV_VARS_AT_STARTUP = env.bool("QPC_LOG_ALL_ENV_VARS_AT_STARTUP", True)
 
@@ -1,5 +1,10 @@
 """Ansible controller scanner."""
 
+from scanner.get_scanner import lazy_attributes
+
 # scanner.job expects runners to be importable from scanner module
-from .connect import ConnectTaskRunner
-from .inspect import InspectTaskRunner
+__getattr__ = lazy_attributes(
+    __name__,
+    ConnectTaskRunner="scanner.ansible.connect",
+    InspectTaskRunner="scanner.ansible.inspect",
+)
@@ -9,3 +9,26 @@ def get_scanner(data_source):
         return importlib.import_module(f"scanner.{data_source}")
     except ModuleNotFoundError as error:
         raise NotImplementedError(f"Unsupported source type: {data_source}") from error
+
+
+def lazy_attributes(package_name, **modules_by_attribute):
+    """Create a module __getattr__ importing attributes on first access.
+
+    Scanner packages expose their task runners this way, so importing one of
+    their modules doesn't load the libraries (ansible, pyVmomi, kubernetes...)
+    the runners need until a scan of that type runs.
+
+    :param package_name: __name__ of the package
+    :param modules_by_attribute: module to import each attribute from
+    """
+
+    def __getattr__(name):
+        try:
+            module_name = modules_by_attribute[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {package_name!r} has no attribute {name!r}"
+            ) from None
+        return getattr(importlib.import_module(module_name), name)
+
+    return __getattr__
@@ -3,19 +3,21 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from multiprocessing import Process, Value
 
 from django.conf import settings
+from django.db import connections, transaction
 
 from api.common.common_report import create_report_version
 from api.details_report.util import (
-    build_sources_from_tasks,
-    create_details_report,
+    iter_sources_from_tasks,
     validate_details_report_json,
 )
-from api.models import ScanJob, ScanTask
+from api.models import DetailsReport, ScanJob, ScanOptions, ScanTask
 from fingerprinter.runner import FingerprintTaskRunner
 from scanner.get_scanner import get_scanner
+from scanner.network.multiplexing import close_ssh_connections
 from scanner.runner import ScanTaskRunner
 
 logger = logging.getLogger(__name__)
@@ -59,6 +61,21 @@ def get_task_runners_for_job(
     return task_runners, fingerprint_task_runner
 
 
+def group_task_runners_by_source(
+    task_runners: list[ScanTaskRunner],
+) -> list[list[ScanTaskRunner]]:
+    """Group connect/inspect task runners into one ordered chain per source.
+
+    Tasks from different sources don't depend on each other, so each chain can
+    run independently. Order inside a chain follows the original task order
+    (connect before inspect).
+    """
+    chains: dict[int, list[ScanTaskRunner]] = {}
+    for runner in task_runners:
+        chains.setdefault(runner.scan_task.source_id, []).append(runner)
+    return list(chains.values())
+
+
 def create_details_report_for_scan_job(scan_job: ScanJob):
     """Create and save a DetailsReport if the ScanJob's ScanTasks have valid Sources.
 
@@ -68,29 +85,36 @@ def create_details_report_for_scan_job(scan_job: ScanJob):
     inspect_tasks = scan_job.tasks.filter(
         scan_type=ScanTask.SCAN_TYPE_INSPECT
     ).order_by("sequence_number")
-    sources = build_sources_from_tasks(inspect_tasks.filter(status=ScanTask.COMPLETED))
+    sources = iter_sources_from_tasks(inspect_tasks.filter(status=ScanTask.COMPLETED))
+
+    # sources are validated and stored one at a time, so only the facts of a
+    # single task are held in memory
+    details_report = None
+    with transaction.atomic():
+        for source in sources:
+            has_errors, validation_result = validate_details_report_json(
+                {
+                    "sources": [source],
+                    "report_type": "details",
+                    "report_version": create_report_version(),
+                },
+                False,
+            )
+            if has_errors:
+                transaction.set_rollback(True)
+                return (
+                    None,
+                    f"Scan produced invalid details report JSON: {validation_result}",
+                )
+            if details_report is None:
+                details_report = DetailsReport.objects.create(
+                    report_version=create_report_version()
+                )
+            details_report.add_source(source)
 
-    if not sources:
+    if details_report is None:
         return None, "No connection results found."
-
-    details_report_json = {
-        "sources": sources,
-        "report_type": "details",
-        "report_version": create_report_version(),
-    }
-    has_errors, validation_result = validate_details_report_json(
-        details_report_json, False
-    )
-
-    if has_errors:
-        return None, f"Scan produced invalid details report JSON: {validation_result}"
-
-    if details_report := create_details_report(
-        create_report_version(), details_report_json
-    ):
-        return details_report, None
-
-    return None, "No facts gathered from scan."
+    return details_report, None
 
 
 def run_task_runner(runner: ScanTaskRunner, *run_args):
@@ -175,11 +199,20 @@ class ProcessBasedScanJobRunner(Process):
 class SyncScanJobRunner:
     """Executes a group of tasks bound to a scan_job synchronously."""
 
+    interrupt_check_interval = 1
+
     def __init__(self, scan_job: ScanJob, manager_interrupt: Value = None):
         """Create class instance."""
         self.scan_job = scan_job
         self.manager_interrupt = manager_interrupt or Value("i", ScanJob.JOB_RUN)
 
+    @property
+    def max_concurrent_sources(self) -> int:
+        """Maximum number of sources scanned at the same time."""
+        if self.scan_job.options is None:
+            return ScanOptions.get_default_concurrent_sources()
+        return self.scan_job.options.max_concurrent_sources
+
     def start(self):
         """Execute tasks by calling "run" method."""
         # This method only exists to mimic ProcessBasedScanJobRunner API, which has
@@ -212,6 +245,9 @@ class SyncScanJobRunner:
         - get list of task runners for this job ordered by sequence created
         - run the connection tasks (typically 1 per source)
         - run the inspection tasks (typically 0 or 1 per source)
+            - when the job allows more than one concurrent source, each source's
+              connect/inspect chain runs in its own thread
+        - close the ssh connections shared by the connect and inspect tasks
         - check status for each task
             - remember any that failed to be logged later
             - early return if any are not failed or complete
@@ -223,7 +259,32 @@ class SyncScanJobRunner:
 
         :returns: str value from ScanTask.STATUS_CHOICES, usually COMPLETED or FAILED.
         """
-        # pylint: disable=too-many-return-statements,too-many-branches
+        if job_status := self.start_job():
+            return job_status
+
+        task_runners, fingerprint_task_runner = get_task_runners_for_job(self.scan_job)
+
+        chains = group_task_runners_by_source(task_runners)
+        try:
+            if self.max_concurrent_sources > 1 and len(chains) > 1:
+                failed_tasks, task_status = self.run_chains_concurrently(chains)
+            else:
+                failed_tasks, task_status = self.run_task_runners(task_runners)
+        finally:
+            # connect and inspect are over, whether completed or interrupted
+            close_ssh_connections(self.scan_job.id)
+        if task_status is not None:
+            # something went wrong or cancel/pause
+            return task_status
+
+        return self.finish_job(failed_tasks, fingerprint_task_runner)
+
+    def start_job(self) -> str | None:
+        """Move the job to running state.
+
+        :returns: the job status if it can't run (interrupted or failed to start),
+            None otherwise.
+        """
         if interrupt_status := self.check_manager_interrupt():
             return interrupt_status
 
@@ -234,22 +295,20 @@ class SyncScanJobRunner:
             )
             self.scan_job.status_fail(error_message)
             return ScanTask.FAILED
+        return None
 
-        task_runners, fingerprint_task_runner = get_task_runners_for_job(self.scan_job)
-
-        failed_tasks = []
-        for runner in task_runners:
-            if interrupt_status := self.check_manager_interrupt():
-                return interrupt_status
-            task_status = run_task_runner(runner, self.manager_interrupt)
-
-            if task_status == ScanTask.FAILED:
-                # Task did not complete successfully
-                failed_tasks.append(runner.scan_task)
-            elif task_status != ScanTask.COMPLETED:
-                # something went wrong or cancel/pause
-                return task_status
+    def finish_job(
+        self,
+        failed_tasks: list[ScanTask],
+        fingerprint_task_runner: FingerprintTaskRunner | None,
+    ) -> str:
+        """Fingerprint the job results and set the final job status.
 
+        :param failed_tasks: connect/inspect ScanTasks that failed
+        :param fingerprint_task_runner: runner for the job fingerprint task
+        :returns: str value from ScanTask.STATUS_CHOICES, usually COMPLETED or FAILED.
+        """
+        # pylint: disable=too-many-return-statements
         if self.scan_job.scan_type != ScanTask.SCAN_TYPE_CONNECT:
             if not (details_report := fingerprint_task_runner.scan_task.details_report):
                 details_report, error_message = create_details_report_for_scan_job(
@@ -314,3 +373,91 @@ class SyncScanJobRunner:
 
         self.scan_job.status_complete()
         return ScanTask.COMPLETED
+
+    def run_task_runners(
+        self, task_runners: list[ScanTaskRunner]
+    ) -> tuple[list[ScanTask], str | None]:
+        """Run connect/inspect task runners one after another.
+
+        :returns: tuple with the list of failed ScanTasks and the status that
+            interrupted execution (None if all tasks ran).
+        """
+        failed_tasks = []
+        for runner in task_runners:
+            if interrupt_status := self.check_manager_interrupt():
+                return failed_tasks, interrupt_status
+            task_status = run_task_runner(runner, self.manager_interrupt)
+
+            if task_status == ScanTask.FAILED:
+                # Task did not complete successfully
+                failed_tasks.append(runner.scan_task)
+            elif task_status != ScanTask.COMPLETED:
+                return failed_tasks, task_status
+        return failed_tasks, None
+
+    def run_chains_concurrently(
+        self, chains: list[list[ScanTaskRunner]]
+    ) -> tuple[list[ScanTask], str | None]:
+        """Run each source's connect/inspect chain in a thread pool.
+
+        Every chain gets its own interrupt Value. This thread watches the job's
+        manager_interrupt and relays pause/cancel requests to all chains, so
+        a task acknowledging the interrupt won't hide it from the others.
+
+        :returns: tuple with the list of failed ScanTasks and the status that
+            interrupted execution (None if all tasks ran).
+        """
+        self.scan_job.log_message(
+            f"Running {len(chains):d} sources with up to"
+            f" {self.max_concurrent_sources:d} at the same time"
+        )
+        chain_interrupts = [Value("i", ScanJob.JOB_RUN) for _ in chains]
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_sources) as executor:
+            pending = {
+                executor.submit(self._run_chain, chain, chain_interrupt)
+                for chain, chain_interrupt in zip(chains, chain_interrupts)
+            }
+            futures = list(pending)
+            while pending:
+                _, pending = wait(pending, timeout=self.interrupt_check_interval)
+                interrupt_value = self.manager_interrupt.value
+                if interrupt_value in (
+                    ScanJob.JOB_TERMINATE_CANCEL,
+                    ScanJob.JOB_TERMINATE_PAUSE,
+                ):
+                    for chain_interrupt in chain_interrupts:
+                        if chain_interrupt.value == ScanJob.JOB_RUN:
+                            chain_interrupt.value = interrupt_value
+
+        failed_tasks = []
+        for future in futures:
+            # re-raises unexpected errors the same way sequential runs would
+            failed_tasks.extend(future.result())
+        failed_tasks.sort(key=lambda task: task.sequence_number)
+
+        if interrupt_status := self.check_manager_interrupt():
+            return failed_tasks, interrupt_status
+        return failed_tasks, None
+
+    @staticmethod
+    def _run_chain(
+        chain: list[ScanTaskRunner], chain_interrupt: Value
+    ) -> list[ScanTask]:
+        """Run the task runners of a single source in order.
+
+        :returns: list of failed ScanTasks
+        """
+        failed_tasks = []
+        try:
+            for runner in chain:
+                if chain_interrupt.value != ScanJob.JOB_RUN:
+                    break
+                task_status = run_task_runner(runner, chain_interrupt)
+                if task_status == ScanTask.FAILED:
+                    failed_tasks.append(runner.scan_task)
+                elif task_status != ScanTask.COMPLETED:
+                    break
+        finally:
+            # each thread has its own database connection
+            connections.close_all()
+        return failed_tasks
@@ -38,21 +38,95 @@ class DisabledManager:
         )
 
 
+class CeleryManager:
+    """Scan manager that hands scan jobs over to celery workers.
+
+    Jobs are not run in this process: each queued job is sent to the broker and
+    pause/cancel requests are written to ScanJob.interrupt for the workers.
+    """
+
+    log_prefix = "CELERY SCAN JOB MANAGER"
+
+    def is_alive(self):
+        """Celery workers are managed outside this process."""
+        return True
+
+    def start(self):
+        """Log startup; incomplete jobs stay queued in the broker."""
+        logger.info("%s: Scan jobs will run on celery workers.", self.log_prefix)
+
+    def put(self, scanner: ScanJobRunner):
+        """Send the scan job to the celery workers.
+
+        :param scanner: ScanJobRunner for the job to run.
+        """
+        # pylint: disable=import-outside-toplevel
+        from scanner.tasks import DatabaseInterrupt, run_scan_job
+
+        scan_job = scanner.scan_job
+        # clear interrupts left over from a previous pause
+        DatabaseInterrupt(scan_job.id).value = ScanJob.JOB_RUN
+        run_scan_job.delay(scan_job.id)
+        logger.info(
+            "%s: Scan job %d sent to celery workers.", self.log_prefix, scan_job.id
+        )
+
+    def kill(self, job: ScanJob, command: str):
+        """Ask the celery workers to pause or cancel a ScanJob.
+
+        :param job: The ScanJob to kill.
+        :param command: string "cancel" or "pause".
+        """
+        # pylint: disable=import-outside-toplevel
+        from scanner.tasks import DatabaseInterrupt
+
+        job.log_message(
+            f"{self.log_prefix}: Send interrupt to allow job orderly shutdown"
+        )
+        if command == "cancel":
+            DatabaseInterrupt(job.id).value = ScanJob.JOB_TERMINATE_CANCEL
+        if command == "pause":
+            DatabaseInterrupt(job.id).value = ScanJob.JOB_TERMINATE_PAUSE
+
+
 class Manager(Thread):
-    """Manager of scan job queue."""
+    """Manager of scan job queue.
+
+    Jobs run in a fixed number of worker slots (QPC_SCAN_MANAGER_WORKER_SLOTS).
+    Each running ProcessBasedScanJobRunner owns its interrupt Value, so jobs can
+    be paused or canceled independently. Fingerprint-only jobs (e.g. async report
+    merges) are started before queued scans.
+    """
 
     run_queue_sleep_time = 5
     log_prefix = "SCAN JOB MANAGER"
 
-    def __init__(self):
+    def __init__(self, worker_slots: int = None):
         """Initialize the manager."""
         Thread.__init__(self)
+        self.worker_slots = worker_slots or settings.QPC_SCAN_MANAGER_WORKER_SLOTS
         self.scan_queue = []  # type: list[ScanJobRunner]
-        self.current_job_runner = None  # type: ScanJobRunner | None
-        self.terminated_job_runner = None  # type: ScanJobRunner | None
-        self.termination_elapsed_time = 0
+        self.job_slots = [None] * self.worker_slots  # type: list[ScanJobRunner | None]
+        # elapsed time since termination was requested, keyed by scan job id
+        self.termination_elapsed_time = {}  # type: dict[int, int]
         self.running = True
-        logger.info("%s: Scan manager instance created.", self.log_prefix)
+        logger.info(
+            "%s: Scan manager instance created with %d worker slot(s).",
+            self.log_prefix,
+            self.worker_slots,
+        )
+
+    @property
+    def running_job_runners(self) -> list[ScanJobRunner]:
+        """Job runners currently occupying a worker slot."""
+        return [runner for runner in self.job_slots if runner is not None]
+
+    def find_job_runner(self, job_id: int) -> ScanJobRunner | None:
+        """Return the job runner for job_id if it occupies a worker slot."""
+        for runner in self.running_job_runners:
+            if runner.identifier == job_id:
+                return runner
+        return None
 
     def start_log_timer(self):
         """Start log timer."""
@@ -63,11 +137,18 @@ class Manager(Thread):
 
     def log_info(self):
         """Log the status of the scan manager."""
-        if self.current_job_runner:
-            current_scan_job = self.current_job_runner.identifier
-            scan_job_message = f"Currently running scan job {current_scan_job}"
-        else:
-            scan_job_message = "No scan job currently running"
+        slot_messages = []
+        for slot, runner in enumerate(self.job_slots, start=1):
+            if runner is None:
+                slot_messages.append(f"slot {slot}: idle")
+            elif runner.identifier in self.termination_elapsed_time:
+                slot_messages.append(
+                    f"slot {slot}: terminating scan job {runner.identifier}"
+                )
+            else:
+                slot_messages.append(
+                    f"slot {slot}: running scan job {runner.identifier}"
+                )
 
         scan_queue_ids = [scan_runner.scan_job.id for scan_runner in self.scan_queue]
         scan_queue_ids.reverse()
@@ -75,34 +156,52 @@ class Manager(Thread):
         logger.info(
             "%s: %s.  Scan queue length is %s. Queued jobs: %s",
             self.log_prefix,
-            scan_job_message,
+            ", ".join(slot_messages),
             len(self.scan_queue),
             scan_queue_ids,
         )
 
+    def _pop_next_job_runner(self) -> ScanJobRunner:
+        """Pop the next job runner from the queue.
+
+        Fingerprint-only jobs are lightweight, so they jump ahead of scans.
+        Otherwise jobs run in the order they were queued.
+        """
+        # the queue is filled from the front, so the oldest jobs are at the end
+        for index in range(len(self.scan_queue) - 1, -1, -1):
+            if self.scan_queue[index].scan_job.scan_type == (
+                ScanTask.SCAN_TYPE_FINGERPRINT
+            ):
+                return self.scan_queue.pop(index)
+        return self.scan_queue.pop()
+
     def work(self):
-        """Start to execute scans in the queue."""
-        if len(self.scan_queue) > 0:
-            self.current_job_runner = self.scan_queue.pop()
-            if self.current_job_runner.scan_job.status in [
+        """Start to execute scans in the queue while there are free slots."""
+        for slot, runner in enumerate(self.job_slots):
+            if runner is not None:
+                continue
+            if not self.scan_queue:
+                return
+            job_runner = self._pop_next_job_runner()
+            if job_runner.scan_job.status in [
                 ScanTask.PENDING,
                 ScanTask.RUNNING,
             ]:
                 logger.info(
-                    "%s: Loading scan job %s.",
+                    "%s: Loading scan job %s in slot %d.",
                     self.log_prefix,
-                    self.current_job_runner.scan_job.id,
+                    job_runner.scan_job.id,
+                    slot + 1,
                 )
-                self.current_job_runner.start()
+                self.job_slots[slot] = job_runner
+                job_runner.start()
                 self.log_info()
             else:
                 error = (
                     f"{self.log_prefix}: Could not start job."
                     f" Job was not in {ScanTask.PENDING} state."
                 )
-                self.current_job_runner.scan_job.log_message(
-                    error, log_level=logging.ERROR
-                )
+                job_runner.scan_job.log_message(error, log_level=logging.ERROR)
 
     def put(self, scanner: ScanJobRunner):
         """Add a ScanJobRunner to scan queue.
@@ -126,28 +225,22 @@ class Manager(Thread):
         """
         killed = False
         job_id = job.id
+        job_runner = self.find_job_runner(job_id)
         if (
-            self.current_job_runner is not None
-            and self.current_job_runner.identifier == job_id
-            and self.current_job_runner.is_alive()
+            job_runner is not None
+            and job_id not in self.termination_elapsed_time
+            and job_runner.is_alive()
         ):
-
             # record which job is terminated
-            self.terminated_job_runner = self.current_job_runner
-            self.current_job_runner = None
+            self.termination_elapsed_time[job_id] = 0
 
             job.log_message(
                 f"{self.log_prefix}: Send interrupt" " to allow job orderly shutdown"
             )
             if command == "cancel":
-                self.terminated_job_runner.manager_interrupt.value = (
-                    ScanJob.JOB_TERMINATE_CANCEL
-                )
+                job_runner.manager_interrupt.value = ScanJob.JOB_TERMINATE_CANCEL
             if command == "pause":
-                self.terminated_job_runner.manager_interrupt.value = (
-                    ScanJob.JOB_TERMINATE_PAUSE
-                )
-            self.termination_elapsed_time = 0
+                job_runner.manager_interrupt.value = ScanJob.JOB_TERMINATE_PAUSE
         else:
             logger.info("%s: Checking scan queue for job to remove.", self.log_prefix)
             removed = False
@@ -199,80 +292,86 @@ class Manager(Thread):
         if restarted_scan_count == 0:
             logger.info("%s: No running or pending scan jobs to start", self.log_prefix)
 
+    def _check_terminated_job_runner(self, slot: int, job_runner: ScanJobRunner):
+        """Follow up on a job runner that was asked to terminate."""
+        job_id = job_runner.identifier
+        interrupt = job_runner.manager_interrupt
+        if not job_runner.is_alive():
+            # Free the slot so another job can run.
+            job_runner.scan_job.log_message(
+                f"{self.log_prefix}: Process successfully terminated."
+            )
+            self.job_slots[slot] = None
+            del self.termination_elapsed_time[job_id]
+        elif interrupt.value == ScanJob.JOB_TERMINATE_ACK:
+            job_runner.scan_job.log_message(
+                f"{self.log_prefix}: Scan job acknowledged"
+                " request to terminate but still processing."
+            )
+        else:
+            job_runner.scan_job.log_message(
+                f"{self.log_prefix}: Scan job has not acknowledged"
+                " request to terminate after"
+                f" {self.termination_elapsed_time[job_id]:d}s."
+            )
+
+            # After a time period terminate (will not work in gunicorn)
+            self.termination_elapsed_time[job_id] += self.run_queue_sleep_time
+            if (
+                self.termination_elapsed_time[job_id]
+                == settings.MAX_TIMEOUT_ORDERLY_SHUTDOWN
+            ):
+                job_runner.scan_job.log_message("FORCEFUL TERMINATION OF JOB PROCESS")
+                job_runner.terminate()
+
+    def _check_running_job_runner(self, slot: int, job_runner: ScanJobRunner):
+        """Free the slot of a job runner that has finished."""
+        if job_runner.is_alive():
+            return
+        terminated_job = ScanJob.objects.filter(id=job_runner.scan_job.id).first()
+        if terminated_job:
+            if terminated_job.status in [
+                ScanTask.PENDING,
+                ScanTask.CREATED,
+                ScanTask.RUNNING,
+            ]:
+                terminated_job.log_message(
+                    f"{self.log_prefix}: scan job has unexpectedly failed."
+                )
+                terminated_job.status_fail(
+                    "Scan manager failed job due to unexpected error."
+                )
+            else:
+                terminated_job.log_message(
+                    f"{self.log_prefix}: scan job has completed."
+                )
+        else:
+            job_runner.scan_job.log_message(
+                "Scan manager detected deletion of scan job "
+                "model before final updates applied."
+            )
+        self.job_slots[slot] = None
+
+    def check_job_slots(self):
+        """Update the state of every worker slot."""
+        for slot, job_runner in enumerate(self.job_slots):
+            if job_runner is None:
+                continue
+            if job_runner.identifier in self.termination_elapsed_time:
+                # Occurs when the job was terminated
+                self._check_terminated_job_runner(slot, job_runner)
+            else:
+                # Occurs when the job ends
+                self._check_running_job_runner(slot, job_runner)
+
     def run(self):
         """Trigger thread execution."""
-        # pylint: disable=too-many-branches
         self.restart_incomplete_scansjobs()
         logger.info("%s: Started run loop.", self.log_prefix)
         self.start_log_timer()
         while self.running:
-            queue_len = len(self.scan_queue)
-            if self.terminated_job_runner is not None:
-                # Occurs when current job was terminated
-                killed = not self.terminated_job_runner.is_alive()
-                interrupt = self.terminated_job_runner.manager_interrupt
-                if killed:
-                    # Set this to None so another job can run.
-                    self.terminated_job_runner.scan_job.log_message(
-                        f"{self.log_prefix}: Process successfully terminated."
-                    )
-                    self.terminated_job_runner = None
-                elif interrupt.value == ScanJob.JOB_TERMINATE_ACK:
-                    self.terminated_job_runner.log_message(
-                        f"{self.log_prefix}: Scan job acknowledged"
-                        " request to terminate but still processing."
-                    )
-                else:
-                    self.terminated_job_runner.scan_job.log_message(
-                        f"{self.log_prefix}: Scan job has not acknowledged"
-                        " request to terminate after"
-                        f" {self.termination_elapsed_time:d}s."
-                    )
-
-                    # After a time period terminate (will not work in gunicorn)
-                    self.termination_elapsed_time += self.run_queue_sleep_time
-                    if (
-                        self.termination_elapsed_time
-                        == settings.MAX_TIMEOUT_ORDERLY_SHUTDOWN
-                    ):
-                        self.terminated_job_runner.scan_job.log_message(
-                            "FORCEFUL TERMINATION OF JOB PROCESS"
-                        )
-                        self.terminated_job_runner.terminate()
-            elif self.current_job_runner is not None:
-                # Occurs when current jobs ends and at least 1 in queue
-                killed = not self.current_job_runner.is_alive()
-                if killed:
-                    terminated_job = ScanJob.objects.filter(
-                        id=self.current_job_runner.scan_job.id
-                    ).first()
-                    if terminated_job:
-                        if terminated_job.status in [
-                            ScanTask.PENDING,
-                            ScanTask.CREATED,
-                            ScanTask.RUNNING,
-                        ]:
-                            terminated_job.log_message(
-                                f"{self.log_prefix}:"
-                                " scan job has unexpectedly failed."
-                            )
-                            terminated_job.status_fail(
-                                "Scan manager failed job due to unexpected error."
-                            )
-                        else:
-                            terminated_job.log_message(
-                                f"{self.log_prefix}: scan job has completed."
-                            )
-                    else:
-                        self.current_job_runner.scan_job.log_message(
-                            "Scan manager detected deletion of scan job "
-                            "model before final updates applied."
-                        )
-                    self.current_job_runner = None
-                    if queue_len > 0:
-                        self.work()
-            elif queue_len > 0 and self.current_job_runner is None:
-                # Occurs when no current job, but new one added
+            self.check_job_slots()
+            if self.scan_queue:
                 self.work()
             sleep(self.run_queue_sleep_time)
 
@@ -281,6 +380,8 @@ def reinitialize():
     """Reinitialize the SCAN_MANAGER module variable."""
     if settings.QPC_DISABLE_THREADED_SCAN_MANAGER:
         manager_class = DisabledManager
+    elif settings.QPC_ENABLE_CELERY_SCAN_MANAGER:
+        manager_class = CeleryManager
     else:
         manager_class = Manager
 
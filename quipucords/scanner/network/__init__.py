@@ -1,6 +1,11 @@
 """API models for import organization."""
 
-from scanner.network.connect import ConnectTaskRunner
-from scanner.network.connect_callback import ConnectResultCallback
-from scanner.network.inspect import InspectTaskRunner
-from scanner.network.inspect_callback import InspectResultCallback
+from scanner.get_scanner import lazy_attributes
+
+__getattr__ = lazy_attributes(
+    __name__,
+    ConnectTaskRunner="scanner.network.connect",
+    ConnectResultCallback="scanner.network.connect_callback",
+    InspectTaskRunner="scanner.network.inspect",
+    InspectResultCallback="scanner.network.inspect_callback",
+)
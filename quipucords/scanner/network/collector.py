@@ -0,0 +1,154 @@
+"""Commands run by the single session collector of the inspect playbook.
+
+The collector engine runs inspect_collector.yml, which sends the raw commands
+of the inspect roles to each host as one shell script (one for commands that
+need become, one for the others) before running the roles. The raw action
+plugin next to the playbooks then answers raw tasks with the collected output
+instead of opening a new session, so facts are built by the same role tasks.
+
+Commands are only collected when they can be rendered upfront: raw tasks
+with loops, or whose command or condition depends on facts gathered on the
+host, still run on their own.
+"""
+
+import ast
+import re
+from functools import cache
+
+import yaml
+from django.conf import settings
+
+RUNNER_PATH = settings.BASE_DIR / "scanner/network/runner"
+INSPECT_PLAYBOOK = "inspect.yml"
+COLLECTOR_PLAYBOOK = "inspect_collector.yml"
+COMMANDS_VAR = "qpc_collector_commands"
+BECOME_COMMANDS_VAR = "qpc_collector_become_commands"
+
+INSPECT_ENGINE_PLAYBOOK = "playbook"
+INSPECT_ENGINE_COLLECTOR = "collector"
+
+LOOP_KEYWORDS = {"loop", "with_items", "with_list", "with_dict", "with_fileglob"}
+JINJA_EXPRESSION = re.compile(r"{{(.*?)}}|{%")
+JINJA_VARIABLE = re.compile(r"^\s*([A-Za-z_]\w*)\s*$")
+
+
+def _is_true(value):
+    """Convert an ansible boolean option like 'yes' to a bool."""
+    if isinstance(value, str):
+        return value.lower() in ("yes", "true", "1", "on")
+    return bool(value)
+
+
+def _assumed_condition_value(name, extra_vars):
+    """Return the value a condition variable is assumed to have upfront.
+
+    Dependency checks and sudo access are assumed to succeed. If they don't,
+    the collected command just fails, and the real condition skips it later.
+    :returns: the value or None if it can't be known before inspecting
+    """
+    if name in extra_vars:
+        return _is_true(extra_vars[name])
+    if name == "user_has_sudo" or name.startswith("internal_have_"):
+        return True
+    return None
+
+
+def _evaluate_condition(node, extra_vars):
+    """Evaluate a parsed condition made of and, or, not and variables.
+
+    :returns: True or False, or None if it can't be evaluated upfront
+    """
+    if isinstance(node, ast.Name):
+        return _assumed_condition_value(node.id, extra_vars)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        value = _evaluate_condition(node.operand, extra_vars)
+        return None if value is None else not value
+    if isinstance(node, ast.BoolOp):
+        values = [_evaluate_condition(value, extra_vars) for value in node.values]
+        if None in values:
+            return None
+        if isinstance(node.op, ast.And):
+            return all(values)
+        return any(values)
+    return None
+
+
+def should_collect(condition, extra_vars):
+    """Check if a raw task with the given when condition should be collected.
+
+    :param condition: the task's when condition: None, a string or a list
+        of strings that must all be true
+    :param extra_vars: the extra vars of the playbook run
+    """
+    if condition is None:
+        return True
+    conditions = condition if isinstance(condition, list) else [condition]
+    for expression in conditions:
+        if isinstance(expression, bool):
+            value = expression
+        else:
+            try:
+                parsed = ast.parse(str(expression).strip(), mode="eval")
+            except SyntaxError:
+                return False
+            value = _evaluate_condition(parsed.body, extra_vars)
+        if not value:
+            return False
+    return True
+
+
+def render_command(command, extra_vars):
+    """Render the extra vars used in a raw command.
+
+    :returns: the command or None if it uses anything but plain extra vars
+    """
+    unknown = False
+
+    def replace(match):
+        nonlocal unknown
+        variable = JINJA_VARIABLE.match(match.group(1) or "")
+        if variable is None or variable.group(1) not in extra_vars:
+            unknown = True
+            return ""
+        return str(extra_vars[variable.group(1)])
+
+    rendered = JINJA_EXPRESSION.sub(replace, command)
+    return None if unknown else rendered
+
+
+@cache
+def _inspect_raw_tasks():
+    """List the raw tasks of the inspect roles, in the order they run."""
+    playbook = yaml.safe_load((RUNNER_PATH / INSPECT_PLAYBOOK).read_text())
+    tasks = []
+    for play in playbook:
+        for role in play.get("roles", []):
+            role_tasks = RUNNER_PATH / "roles" / role / "tasks/main.yml"
+            for task in yaml.safe_load(role_tasks.read_text()) or []:
+                if "raw" in task:
+                    tasks.append(task)
+    return tasks
+
+
+def collector_commands(extra_vars):
+    """Get the raw commands the collector runs before the inspect roles.
+
+    :param extra_vars: the extra vars of the playbook run
+    :returns: tuple (commands, commands that need become)
+    """
+    commands = []
+    become_commands = []
+    for task in _inspect_raw_tasks():
+        if LOOP_KEYWORDS.intersection(task):
+            continue
+        if not should_collect(task.get("when"), extra_vars):
+            continue
+        command = render_command(str(task["raw"]), extra_vars)
+        if command is None:
+            continue
+        # the raw action plugin looks commands up without surrounding spaces
+        command = command.strip()
+        target = become_commands if _is_true(task.get("become")) else commands
+        if command not in target:
+            target.append(command)
+    return commands, become_commands
@@ -1,6 +1,8 @@
 """ScanTask used for network connection discovery."""
 import logging
+import math
 import os.path
+import threading
 from multiprocessing import Value
 
 import ansible_runner
@@ -21,15 +23,22 @@ from api.models import (
 from api.serializers import SourceSerializer
 from api.vault import decrypt_data_as_unicode, write_to_yaml
 from scanner.network.connect_callback import ConnectResultCallback
+from scanner.network.host_set import HostSet
+from scanner.network.multiplexing import ssh_multiplexing_vars
+from scanner.network.probe import find_unreachable_hosts
 from scanner.network.utils import (
     check_manager_interrupt,
-    construct_inventory,
-    expand_hostpattern,
+    get_run_layout,
+    iter_inventories,
+    run_inventories,
 )
 from scanner.runner import ScanTaskRunner
 
 logger = logging.getLogger(__name__)
 
+# max number of SystemConnectionResults inserted per query
+RESULT_BATCH_SIZE = 500
+
 
 # The ConnectTaskRunner creates a new ConnectResultCallback for each
 # credential it tries to connect with, and the ConnectResultCallbacks
@@ -44,27 +53,17 @@ class ConnectResultStore:
         source = scan_task.source
 
         # Sources can contain patterns that describe multiple hosts,
-        # like '1.2.3.[4:6]'. Expand the patterns so hosts is a list
-        # of single hosts we can try to connect to.
-
-        hosts, exclude_hosts = [], []
-
-        hosts_list = source.get_hosts()
-        exclude_hosts_list = source.get_exclude_hosts()
-
-        for host in hosts_list:
-            hosts.extend(expand_hostpattern(host))
-        for host in exclude_hosts_list:
-            exclude_hosts.extend(expand_hostpattern(host))
-
-        # Remove excluded ip addresses from the hosts list.
-        hosts = list(set(hosts) - set(exclude_hosts))
-
-        self._remaining_hosts = set(hosts)
+        # like '1.2.3.[4:6]'. Keep them as a HostSet, which stores ranges
+        # of addresses instead of every single host we can try to connect to.
+        self._remaining_hosts = HostSet.from_patterns(
+            source.get_hosts(), source.get_exclude_hosts()
+        )
+        # results can be recorded by concurrent ansible runs
+        self._lock = threading.Lock()
 
         scan_task.update_stats(
             "INITIAL NETWORK CONNECT STATS.",
-            sys_count=len(hosts),
+            sys_count=len(self._remaining_hosts),
             sys_scanned=0,
             sys_failed=0,
             sys_unreachable=0,
@@ -102,15 +101,43 @@ class ConnectResultStore:
                 message, increment_sys_failed=True, prefix="FAILED"
             )
 
-        self._remaining_hosts.remove(name)
+        with self._lock:
+            self._remaining_hosts.remove(name)
+
+    @transaction.atomic
+    def record_unreachable(self, names, source):
+        """Record hosts that can't be reached at once."""
+        if not names:
+            return
+        SystemConnectionResult.objects.bulk_create(
+            (
+                SystemConnectionResult(
+                    name=name,
+                    source=source,
+                    credential=None,
+                    status=SystemConnectionResult.UNREACHABLE,
+                    task_connection_result=self.scan_task.connection_result,
+                )
+                for name in names
+            ),
+            batch_size=RESULT_BATCH_SIZE,
+        )
+        self.scan_task.increment_stats(
+            f"{len(names):d} hosts are UNREACHABLE",
+            increment_sys_unreachable=len(names),
+            prefix="FAILED",
+        )
+
+        with self._lock:
+            for name in names:
+                self._remaining_hosts.remove(name)
 
     def remaining_hosts(self):
         """Get the set of hosts that are left to scan."""
-        # Need to return a list because the caller can iterate over
-        # our return value and call record_result repeatedly. If we
-        # returned the actual list, then they would get a 'set changed
-        # size during iteration' error.
-        return list(self._remaining_hosts)
+        # Need to return a copy because the caller can iterate over
+        # our return value and call record_result repeatedly.
+        with self._lock:
+            return self._remaining_hosts.copy()
 
 
 class ConnectTaskRunner(ScanTaskRunner):
@@ -161,6 +188,9 @@ class ConnectTaskRunner(ScanTaskRunner):
         connection_port = source["port"]
         credentials = source["credentials"]
 
+        if settings.QPC_CONNECT_PROBE_ENABLED:
+            self._probe_hosts(manager_interrupt, result_store, connection_port)
+
         remaining_hosts = result_store.remaining_hosts()
 
         for cred_id in credentials:
@@ -208,6 +238,35 @@ class ConnectTaskRunner(ScanTaskRunner):
 
         return None, ScanTask.COMPLETED
 
+    def _probe_hosts(
+        self,
+        manager_interrupt: Value,
+        result_store: ConnectResultStore,
+        connection_port,
+    ):
+        """Record hosts that don't accept connections on port as unreachable.
+
+        Unreachable hosts would otherwise hold an ansible fork until the ssh
+        timeout expires, once for each credential.
+        """
+        remaining_hosts = result_store.remaining_hosts()
+        if not remaining_hosts:
+            return
+        self.scan_task.log_message(
+            f"START CONNECT PROBE of {len(remaining_hosts):d} hosts"
+            f" on port {connection_port}"
+        )
+        unreachable = find_unreachable_hosts(
+            remaining_hosts,
+            connection_port,
+            timeout=settings.QPC_CONNECT_PROBE_TIMEOUT,
+            concurrency=settings.QPC_CONNECT_PROBE_CONCURRENCY,
+            should_stop=lambda: bool(manager_interrupt)
+            and manager_interrupt.value != ScanJob.JOB_RUN,
+        )
+        check_manager_interrupt(manager_interrupt)
+        result_store.record_unreachable(unreachable, self.scan_task.source)
+
 
 def _connect(  # pylint: disable=too-many-arguments
     manager_interrupt: Value,
@@ -218,7 +277,6 @@ def _connect(  # pylint: disable=too-many-arguments
     connection_port,
     forks,
     use_paramiko=False,
-    exclude_hosts=None,
 ):
     """Attempt to connect to hosts using the given credential.
 
@@ -230,109 +288,143 @@ def _connect(  # pylint: disable=too-many-arguments
     :param connection_port: The connection port
     :param use_paramiko: use paramiko instead of ssh for connection
     :param forks: number of forks to run with
-    :param exclude_hosts: Optional. Hosts to exclude from test connections
     :returns: list of connected hosts credential tuples and
             list of host that failed connection
     """
-    # pylint: disable=too-many-locals, disable=too-many-statements, too-many-branches
+    # pylint: disable=too-many-locals
     cred_data = model_to_dict(credential)
-    group_names, inventory = construct_inventory(
-        hosts=hosts,
+    group_size, slots = get_run_layout(forks)
+    group_count = math.ceil(len(hosts) / group_size)
+    inventories = iter_inventories(
+        hosts,
+        connection_port,
+        group_size,
         credential=cred_data,
-        connection_port=connection_port,
-        concurrency_count=forks,
-        exclude_hosts=exclude_hosts,
     )
-    inventory_file = write_to_yaml(inventory)
     _handle_ssh_passphrase(cred_data)
 
     log_message = (
         "START CONNECT PROCESSING GROUPS"
         f" with use_paramiko: {use_paramiko} and {forks:d} forks"
     )
+    if slots > 1:
+        log_message += f" in {slots:d} runs of {group_size:d} hosts at once"
     scan_task.log_message(log_message)
-    for idx, group_name in enumerate(group_names):
-        check_manager_interrupt(manager_interrupt)
+
+    def run_inventory(idx, group_name, inventory):
         group_ips = (
             inventory.get("all").get("children").get(group_name).get("hosts").keys()
         )
         group_ips = [f"'{ip}'" for ip in group_ips]
         group_ip_string = ", ".join(group_ips)
         log_message = (
-            f"START CONNECT PROCESSING GROUP {(idx + 1):d} of {len(group_names):d}. "
+            f"START CONNECT PROCESSING GROUP {(idx + 1):d} of {group_count:d}. "
             f"About to connect to hosts [{group_ip_string}]"
         )
         scan_task.log_message(log_message)
-        call = ConnectResultCallback(
-            result_store, credential, scan_task.source, manager_interrupt
+        return _run_connect_playbook(
+            manager_interrupt,
+            scan_task,
+            result_store,
+            credential,
+            group_name,
+            inventory,
+            group_size,
+            use_paramiko,
         )
 
-        # Create parameters for ansible runner
-        runner_settings = {"job_timeout": int(settings.NETWORK_CONNECT_JOB_TIMEOUT)}
-        extra_vars_dict = {
-            "variable_host": group_name,
-            "ansible_ssh_timeout": settings.QPC_SSH_CONNECT_TIMEOUT,
-        }
-        playbook_path = os.path.join(
-            settings.BASE_DIR, "scanner/network/runner/connect.yml"
+    return run_inventories(inventories, run_inventory, slots, manager_interrupt)
+
+
+def _run_connect_playbook(  # pylint: disable=too-many-arguments,too-many-locals
+    manager_interrupt: Value,
+    scan_task: ScanTask,
+    result_store: ConnectResultStore,
+    credential,
+    group_name,
+    inventory,
+    forks,
+    use_paramiko,
+):
+    """Run the connect playbook against the hosts of one inventory group.
+
+    :returns: tuple (message, status), where status is scan_task.COMPLETED
+        unless the remaining groups shouldn't be run
+    """
+    call = ConnectResultCallback(
+        result_store, credential, scan_task.source, manager_interrupt
+    )
+
+    # Create parameters for ansible runner
+    runner_settings = {"job_timeout": int(settings.NETWORK_CONNECT_JOB_TIMEOUT)}
+    extra_vars_dict = {
+        "variable_host": group_name,
+        "ansible_ssh_timeout": settings.QPC_SSH_CONNECT_TIMEOUT,
+        **ssh_multiplexing_vars(scan_task.job_id, scan_task.source_id),
+    }
+    playbook_path = os.path.join(
+        settings.BASE_DIR, "scanner/network/runner/connect.yml"
+    )
+    cmdline_list = []
+    vault_file_path = f"--vault-password-file={settings.DJANGO_SECRET_PATH}"
+    cmdline_list.append(vault_file_path)
+    forks_cmd = f"--forks={forks}"
+    cmdline_list.append(forks_cmd)
+    if use_paramiko:
+        cmdline_list.append("--connection=paramiko")  # paramiko conn
+    all_commands = " ".join(cmdline_list)
+    if int(settings.ANSIBLE_LOG_LEVEL) == 0:
+        quiet_bool = True
+        verbosity_lvl = 0
+    else:
+        quiet_bool = False
+        verbosity_lvl = int(settings.ANSIBLE_LOG_LEVEL)
+    inventory_file = write_to_yaml(inventory)
+    try:
+        runner_obj = ansible_runner.run(
+            quiet=quiet_bool,
+            settings=runner_settings,
+            inventory=inventory_file,
+            extravars=extra_vars_dict,
+            event_handler=call.event_callback,
+            cancel_callback=call.cancel_callback,
+            playbook=playbook_path,
+            cmdline=all_commands,
+            verbosity=verbosity_lvl,
         )
-        cmdline_list = []
-        vault_file_path = f"--vault-password-file={settings.DJANGO_SECRET_PATH}"
-        cmdline_list.append(vault_file_path)
-        forks_cmd = f"--forks={forks}"
-        cmdline_list.append(forks_cmd)
-        if use_paramiko:
-            cmdline_list.append("--connection=paramiko")  # paramiko conn
-        all_commands = " ".join(cmdline_list)
-        if int(settings.ANSIBLE_LOG_LEVEL) == 0:
-            quiet_bool = True
-            verbosity_lvl = 0
+    except Exception as err_msg:
+        raise AnsibleRunnerException(err_msg) from err_msg
+    finally:
+        os.remove(inventory_file)
+
+    final_status = runner_obj.status
+    if final_status == "canceled":
+        if (
+            manager_interrupt
+            and manager_interrupt.value == ScanJob.JOB_TERMINATE_CANCEL
+        ):
+            msg = log_messages.NETWORK_PLAYBOOK_STOPPED % (
+                "CONNECT",
+                "canceled",
+            )
+            return msg, scan_task.CANCELED
+        msg = log_messages.NETWORK_PLAYBOOK_STOPPED % ("CONNECT", "paused")
+        return msg, scan_task.PAUSED
+    if final_status not in ["successful", "unreachable", "failed", "canceled"]:
+        if final_status == "timeout":
+            error = log_messages.NETWORK_TIMEOUT_ERR
         else:
-            quiet_bool = False
-            verbosity_lvl = int(settings.ANSIBLE_LOG_LEVEL)
-        try:
-            runner_obj = ansible_runner.run(
-                quiet=quiet_bool,
-                settings=runner_settings,
-                inventory=inventory_file,
-                extravars=extra_vars_dict,
-                event_handler=call.event_callback,
-                cancel_callback=call.cancel_callback,
-                playbook=playbook_path,
-                cmdline=all_commands,
-                verbosity=verbosity_lvl,
+            error = log_messages.NETWORK_UNKNOWN_ERR
+        if scan_task.systems_scanned:
+            msg = log_messages.NETWORK_CONNECT_CONTINUE % (
+                final_status,
+                str(scan_task.systems_scanned),
+                error,
             )
-        except Exception as err_msg:
-            raise AnsibleRunnerException(err_msg) from err_msg
-
-        final_status = runner_obj.status
-        if final_status == "canceled":
-            if (
-                manager_interrupt
-                and manager_interrupt.value == ScanJob.JOB_TERMINATE_CANCEL
-            ):
-                msg = log_messages.NETWORK_PLAYBOOK_STOPPED % (
-                    "CONNECT",
-                    "canceled",
-                )
-                return msg, scan_task.CANCELED
-            msg = log_messages.NETWORK_PLAYBOOK_STOPPED % ("CONNECT", "paused")
-            return msg, scan_task.PAUSED
-        if final_status not in ["successful", "unreachable", "failed", "canceled"]:
-            if final_status == "timeout":
-                error = log_messages.NETWORK_TIMEOUT_ERR
-            else:
-                error = log_messages.NETWORK_UNKNOWN_ERR
-            if scan_task.systems_scanned:
-                msg = log_messages.NETWORK_CONNECT_CONTINUE % (
-                    final_status,
-                    str(scan_task.systems_scanned),
-                    error,
-                )
-                scan_task.log_message(msg, log_level=logging.ERROR)
-            else:
-                msg = log_messages.NETWORK_CONNECT_FAIL % (final_status, error)
-                return msg, scan_task.FAILED
+            scan_task.log_message(msg, log_level=logging.ERROR)
+        else:
+            msg = log_messages.NETWORK_CONNECT_FAIL % (final_status, error)
+            return msg, scan_task.FAILED
     return None, scan_task.COMPLETED
 
 
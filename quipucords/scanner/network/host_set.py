@@ -0,0 +1,250 @@
+"""Compact set of the hosts described by network source host patterns."""
+
+import re
+from bisect import bisect_right
+from itertools import product
+
+from scanner.network.utils import expand_hostpattern
+
+# an octet value or an ansible range like [0:255] or [0:255:2]
+_OCTET_PATTERN = re.compile(
+    r"^(?:(?P<value>\d{1,3})"
+    r"|\[(?P<start>\d{1,3}):(?P<end>\d{1,3})(?::(?P<step>\d+))?\])$"
+)
+
+
+def _octet(text):
+    """Convert text to an octet value, rejecting non canonical numbers like 01."""
+    value = int(text)
+    if value > 255 or str(value) != text:
+        raise ValueError(text)
+    return value
+
+
+def ipv4_to_int(host):
+    """Convert an IPv4 address in dotted decimal notation to an int.
+
+    :returns: the address as an int or None if host isn't an IPv4 address
+        written the way str(int_to_ipv4(value)) would write it
+    """
+    octets = host.split(".")
+    if len(octets) != 4 or not all(octet.isdigit() for octet in octets):
+        return None
+    try:
+        values = [_octet(octet) for octet in octets]
+    except ValueError:
+        return None
+    return (values[0] << 24) | (values[1] << 16) | (values[2] << 8) | values[3]
+
+
+def int_to_ipv4(value):
+    """Convert an int to an IPv4 address in dotted decimal notation."""
+    return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+
+def _ipv4_pattern_intervals(pattern):
+    """Return the inclusive address intervals of an IPv4 host pattern.
+
+    Patterns are addresses where octets can be ansible ranges like [0:255] or
+    [0:255:2], as produced by SourceSerializer.cidr_to_ansible.
+    :returns: list of (start, end) ints, or None if pattern is something else
+    """
+    octets = pattern.split(".")
+    if len(octets) != 4:
+        return None
+    ranges = []
+    try:
+        for octet in octets:
+            match = _OCTET_PATTERN.match(octet)
+            if match is None:
+                return None
+            if match["value"] is not None:
+                value = _octet(match["value"])
+                ranges.append(range(value, value + 1))
+                continue
+            start, end = _octet(match["start"]), _octet(match["end"])
+            step = int(match["step"] or 1)
+            if start > end or step < 1:
+                return None
+            ranges.append(range(start, end + 1, step))
+    except ValueError:
+        return None
+
+    # the lowest octets spanning [0:255] and the one above them, when it has no
+    # step, describe contiguous blocks of addresses
+    index = 3
+    while index > 0 and ranges[index] == range(256):
+        index -= 1
+    unit = 256 ** (3 - index)
+    if ranges[index].step == 1:
+        blocks = [(ranges[index].start, ranges[index].stop - 1)]
+    else:
+        blocks = [(value, value) for value in ranges[index]]
+
+    intervals = []
+    for prefix in product(*ranges[:index]):
+        base = sum(
+            value * 256 ** (3 - position) for position, value in enumerate(prefix)
+        )
+        for first, last in blocks:
+            intervals.append((base + first * unit, base + (last + 1) * unit - 1))
+    return intervals
+
+
+def _merge(intervals):
+    """Sort intervals and merge the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _subtract(intervals, excluded):
+    """Subtract the excluded merged intervals from the merged intervals."""
+    result = []
+    excluded = iter(excluded)
+    current = next(excluded, None)
+    for start, end in intervals:
+        while current is not None and current[1] < start:
+            current = next(excluded, None)
+        while current is not None and current[0] <= end:
+            if current[0] > start:
+                result.append([start, current[0] - 1])
+            if current[1] >= end:
+                start = end + 1
+                break
+            start = current[1] + 1
+            current = next(excluded, None)
+        if start <= end:
+            result.append([start, end])
+    return result
+
+
+class HostSet:
+    """Set of hosts where IPv4 addresses are stored as integer intervals.
+
+    A /16 range is a single interval instead of 65536 strings, so the hosts
+    of large sources can be counted, checked, removed and iterated without
+    being expanded. Host names and other addresses are kept as strings.
+    """
+
+    def __init__(self, intervals=(), names=()):
+        """Create a set from (start, end) address intervals and other hosts."""
+        self._intervals = _merge(intervals)
+        self._starts = [start for start, _ in self._intervals]
+        self._names = set(names)
+        self._count = len(self._names) + sum(
+            end - start + 1 for start, end in self._intervals
+        )
+
+    @classmethod
+    def from_patterns(cls, patterns, exclude_patterns=()):
+        """Create a set with the hosts of patterns minus the excluded ones.
+
+        :param patterns: host patterns like '1.2.3.4', '1.2.[0:255].[0:255]'
+            or 'host[1:3].example.com'
+        :param exclude_patterns: host patterns to leave out
+        """
+        host_set = cls._from_patterns(patterns)
+        if exclude_patterns:
+            excluded = cls._from_patterns(exclude_patterns)
+            return cls(
+                _subtract(host_set._intervals, excluded._intervals),
+                host_set._names - excluded._names,
+            )
+        return host_set
+
+    @classmethod
+    def _from_patterns(cls, patterns):
+        intervals, names = [], []
+        for pattern in patterns:
+            pattern_intervals = _ipv4_pattern_intervals(pattern)
+            if pattern_intervals is not None:
+                intervals.extend(pattern_intervals)
+                continue
+            for host in expand_hostpattern(pattern):
+                address = ipv4_to_int(host)
+                if address is None:
+                    names.append(host)
+                else:
+                    intervals.append((address, address))
+        return cls(intervals, names)
+
+    def copy(self):
+        """Return a copy of the set."""
+        return HostSet(self._intervals, self._names)
+
+    def __len__(self):
+        """Return the number of hosts."""
+        return self._count
+
+    def __bool__(self):
+        """Check if there is any host."""
+        return self._count > 0
+
+    def _interval_index(self, address):
+        index = bisect_right(self._starts, address) - 1
+        if index >= 0 and address <= self._intervals[index][1]:
+            return index
+        return None
+
+    def __contains__(self, host):
+        """Check if host is in the set."""
+        address = ipv4_to_int(host)
+        if address is None:
+            return host in self._names
+        return self._interval_index(address) is not None
+
+    def remove(self, host):
+        """Remove host from the set; raise KeyError if it isn't there."""
+        address = ipv4_to_int(host)
+        if address is None:
+            self._names.remove(host)
+            self._count -= 1
+            return
+        index = self._interval_index(address)
+        if index is None:
+            raise KeyError(host)
+        start, end = self._intervals[index]
+        replacement = []
+        if start < address:
+            replacement.append([start, address - 1])
+        if address < end:
+            replacement.append([address + 1, end])
+        self._intervals[index : index + 1] = replacement
+        self._starts[index : index + 1] = [interval[0] for interval in replacement]
+        self._count -= 1
+
+    def discard(self, host):
+        """Remove host from the set if it is there."""
+        try:
+            self.remove(host)
+        except KeyError:
+            pass
+
+    def __iter__(self):
+        """Iterate over the hosts the set has when iteration starts.
+
+        Addresses are generated in ascending order, followed by the other
+        hosts in alphabetical order.
+        """
+        intervals = [tuple(interval) for interval in self._intervals]
+        names = sorted(self._names)
+        for start, end in intervals:
+            for address in range(start, end + 1):
+                yield int_to_ipv4(address)
+        yield from names
+
+    def __repr__(self):
+        """Return a compact representation of the set."""
+        intervals = ", ".join(
+            int_to_ipv4(start)
+            if start == end
+            else f"{int_to_ipv4(start)}-{int_to_ipv4(end)}"
+            for start, end in self._intervals
+        )
+        return f"<HostSet ({len(self)} hosts): [{intervals}] {sorted(self._names)}>"
@@ -1,5 +1,6 @@
 """ScanTask used for network connection discovery."""
 import logging
+import math
 import os.path
 
 import ansible_runner
@@ -17,9 +18,16 @@ from api.models import (
 )
 from api.vault import write_to_yaml
 from scanner.exceptions import ScanFailureError
+from scanner.network import collector
 from scanner.network.exceptions import ScannerException
 from scanner.network.inspect_callback import InspectResultCallback
-from scanner.network.utils import check_manager_interrupt, construct_inventory
+from scanner.network.multiplexing import ssh_multiplexing_vars
+from scanner.network.utils import (
+    check_manager_interrupt,
+    get_run_layout,
+    iter_inventories,
+    run_inventories,
+)
 from scanner.runner import ScanTaskRunner
 
 logger = logging.getLogger(__name__)
@@ -155,8 +163,7 @@ class InspectTaskRunner(ScanTaskRunner):
         Note: base_ssh_executable & ssh_timeout are parameters that
         are only used for testing.
         """
-        # pylint: disable=too-many-locals,too-many-arguments
-        # pylint: disable=too-many-branches,too-many-statements
+        # pylint: disable=too-many-locals
         connection_port = self.scan_task.source.port
 
         if self.scan_task.source.options is not None:
@@ -178,102 +185,139 @@ class InspectTaskRunner(ScanTaskRunner):
 
         extra_vars["QPC_FEATURE_FLAGS"] = settings.QPC_FEATURE_FLAGS.as_dict()
         extra_vars["ansible_ssh_timeout"] = settings.QPC_SSH_INSPECT_TIMEOUT
-
-        group_names, inventory = construct_inventory(
-            hosts=connected,
-            connection_port=connection_port,
-            concurrency_count=forks,
+        extra_vars.update(
+            ssh_multiplexing_vars(self.scan_job.id, self.scan_task.source_id)
         )
-        inventory_file = write_to_yaml(inventory)
 
-        error_msg = None
+        group_size, slots = get_run_layout(forks)
+        group_count = math.ceil(len(connected) / group_size)
+        inventories = iter_inventories(connected, connection_port, group_size)
+
         log_message = (
             "START INSPECT PROCESSING GROUPS"
             f" with use_paramiko: {use_paramiko}, "
             f"{forks} forks and extra_vars={extra_vars}"
         )
+        if slots > 1:
+            log_message += f" in {slots:d} runs of {group_size:d} hosts at once"
         self.scan_task.log_message(log_message)
-        scan_result = ScanTask.COMPLETED
+        if settings.QPC_NETWORK_INSPECT_ENGINE == collector.INSPECT_ENGINE_COLLECTOR:
+            commands, become_commands = collector.collector_commands(extra_vars)
+            extra_vars[collector.COMMANDS_VAR] = commands
+            extra_vars[collector.BECOME_COMMANDS_VAR] = become_commands
+            self.scan_task.log_message(
+                "INSPECT COLLECTOR will run"
+                f" {len(commands) + len(become_commands):d} commands in one session"
+            )
+        error_messages = []
 
-        # Build Ansible Runner Dependencies
-        for idx, group_name in enumerate(group_names):
-            check_manager_interrupt(manager_interrupt)
+        def run_inventory(idx, group_name, inventory):
             log_message = (
-                "START INSPECT PROCESSING GROUP"
-                f" {(idx + 1):d} of {len(group_names):d}"
+                f"START INSPECT PROCESSING GROUP {(idx + 1):d} of {group_count:d}"
             )
             self.scan_task.log_message(log_message)
-            call = InspectResultCallback(self.scan_task, manager_interrupt)
-
-            # Build Ansible Runner Parameters
-            runner_settings = {
-                "idle_timeout": int(settings.NETWORK_INSPECT_JOB_TIMEOUT),
-                "job_timeout": int(settings.NETWORK_INSPECT_JOB_TIMEOUT),
-                "pexpect_timeout": 5,
-            }
-            playbook_path = os.path.join(
-                settings.BASE_DIR, "scanner/network/runner/inspect.yml"
+            error_msg = self._run_inspect_playbook(
+                manager_interrupt,
+                group_name,
+                inventory,
+                dict(extra_vars, variable_host=group_name),
+                group_size,
+                use_paramiko,
             )
-            extra_vars["variable_host"] = group_name
-            cmdline_list = []
-            vault_file_path = f"--vault-password-file={settings.DJANGO_SECRET_PATH}"
-            cmdline_list.append(vault_file_path)
-            forks_cmd = f"--forks={forks}"
-            cmdline_list.append(forks_cmd)
-            if use_paramiko:
-                cmdline_list.append("--connection=paramiko")
-            all_commands = " ".join(cmdline_list)
-
-            if int(settings.ANSIBLE_LOG_LEVEL) == 0:
-                quiet_bool = True
-                verbosity_lvl = 0
+            if error_msg is not None:
+                error_messages.append(error_msg)
+            # a failed group doesn't stop the others
+            return None, ScanTask.COMPLETED
+
+        run_inventories(inventories, run_inventory, slots, manager_interrupt)
+        if error_messages:
+            return error_messages[-1], ScanTask.FAILED
+        return None, ScanTask.COMPLETED
+
+    def _run_inspect_playbook(  # pylint: disable=too-many-arguments,too-many-locals
+        self, manager_interrupt, group_name, inventory, extra_vars, forks, use_paramiko
+    ):
+        """Run the inspect playbook against the hosts of one inventory group.
+
+        :returns: error message if the run failed, otherwise None
+        """
+        call = InspectResultCallback(self.scan_task, manager_interrupt)
+
+        # Build Ansible Runner Parameters
+        runner_settings = {
+            "idle_timeout": int(settings.NETWORK_INSPECT_JOB_TIMEOUT),
+            "job_timeout": int(settings.NETWORK_INSPECT_JOB_TIMEOUT),
+            "pexpect_timeout": 5,
+        }
+        if settings.QPC_NETWORK_INSPECT_ENGINE == collector.INSPECT_ENGINE_COLLECTOR:
+            playbook = collector.COLLECTOR_PLAYBOOK
+        else:
+            playbook = collector.INSPECT_PLAYBOOK
+        playbook_path = os.path.join(collector.RUNNER_PATH, playbook)
+        cmdline_list = []
+        vault_file_path = f"--vault-password-file={settings.DJANGO_SECRET_PATH}"
+        cmdline_list.append(vault_file_path)
+        forks_cmd = f"--forks={forks}"
+        cmdline_list.append(forks_cmd)
+        if use_paramiko:
+            cmdline_list.append("--connection=paramiko")
+        all_commands = " ".join(cmdline_list)
+
+        if int(settings.ANSIBLE_LOG_LEVEL) == 0:
+            quiet_bool = True
+            verbosity_lvl = 0
+        else:
+            quiet_bool = False
+            verbosity_lvl = int(settings.ANSIBLE_LOG_LEVEL)
+
+        inventory_file = write_to_yaml(inventory)
+        try:
+            runner_obj = ansible_runner.run(
+                quiet=quiet_bool,
+                settings=runner_settings,
+                inventory=inventory_file,
+                extravars=extra_vars,
+                event_handler=call.event_callback,
+                cancel_callback=call.cancel_callback,
+                playbook=playbook_path,
+                cmdline=all_commands,
+                verbosity=verbosity_lvl,
+            )
+        except Exception as error:
+            logger.exception("Unexpected error")
+            raise AnsibleRunnerException(str(error)) from error
+        finally:
+            os.remove(inventory_file)
+            # save the hosts finished before the run ended or was stopped
+            call.flush()
+
+        error_msg = None
+        final_status = runner_obj.status
+        if final_status == "canceled":
+            if (
+                manager_interrupt
+                and manager_interrupt.value == ScanJob.JOB_TERMINATE_CANCEL
+            ):
+                msg = log_messages.NETWORK_PLAYBOOK_STOPPED % (
+                    "INSPECT",
+                    "canceled",
+                )
             else:
-                quiet_bool = False
-                verbosity_lvl = int(settings.ANSIBLE_LOG_LEVEL)
-
-            try:
-                runner_obj = ansible_runner.run(
-                    quiet=quiet_bool,
-                    settings=runner_settings,
-                    inventory=inventory_file,
-                    extravars=extra_vars,
-                    event_handler=call.event_callback,
-                    cancel_callback=call.cancel_callback,
-                    playbook=playbook_path,
-                    cmdline=all_commands,
-                    verbosity=verbosity_lvl,
+                msg = log_messages.NETWORK_PLAYBOOK_STOPPED % (
+                    "INSPECT",
+                    "paused",
                 )
-            except Exception as error:
-                logger.exception("Unexpected error")
-                raise AnsibleRunnerException(str(error)) from error
-
-            final_status = runner_obj.status
-            if final_status == "canceled":
-                if (
-                    manager_interrupt
-                    and manager_interrupt.value == ScanJob.JOB_TERMINATE_CANCEL
-                ):
-                    msg = log_messages.NETWORK_PLAYBOOK_STOPPED % (
-                        "INSPECT",
-                        "canceled",
-                    )
-                else:
-                    msg = log_messages.NETWORK_PLAYBOOK_STOPPED % (
-                        "INSPECT",
-                        "paused",
-                    )
-                self.scan_task.log_message(msg)
-                check_manager_interrupt(manager_interrupt)
-            if final_status not in ["successful", "unreachable", "failed"]:
-                if final_status == "timeout":
-                    error_msg = log_messages.NETWORK_TIMEOUT_ERR
-                else:
-                    error_msg = log_messages.NETWORK_UNKNOWN_ERR
-                scan_result = ScanTask.FAILED
-
-            # Always run this as our scans are more tolerant of errors
-            call.finalize_failed_hosts()
-        return error_msg, scan_result
+            self.scan_task.log_message(msg)
+            check_manager_interrupt(manager_interrupt)
+        if final_status not in ["successful", "unreachable", "failed"]:
+            if final_status == "timeout":
+                error_msg = log_messages.NETWORK_TIMEOUT_ERR
+            else:
+                error_msg = log_messages.NETWORK_UNKNOWN_ERR
+
+        # Always run this as our scans are more tolerant of errors
+        call.finalize_failed_hosts()
+        return error_msg
 
     def _obtain_discovery_data(self):
         """Obtain discover scan data.  Either via new scan or paused scan.
@@ -1,13 +1,16 @@
 """Callback object for capturing ansible task execution."""
 
+import contextvars
 import logging
+import queue
+import threading
 
 from ansible_runner.exceptions import AnsibleRunnerException
 from django.conf import settings
-from django.db import transaction
+from django.db import connections, transaction
 
 import log_messages
-from api.models import RawFact, SystemInspectionResult
+from api.models import SystemInspectionResult
 from scanner.network.processing import process
 from scanner.network.utils import STOP_STATES, raw_facts_template
 
@@ -26,6 +29,11 @@ class InspectResultCallback:
     If you want to collect all results into a single object for processing at
     the end of the execution, look into utilizing the ``json`` callback plugin
     or writing your own custom callback plugin
+
+    Task events are processed by settings.QPC_INSPECT_EVENT_WORKERS threads,
+    so processing facts and saving results doesn't slow down the playbook.
+    Events of a host are always handled by the same worker, in the order
+    ansible sent them. Call flush() once the playbook run is over.
     """
 
     # pylint: disable=protected-access
@@ -37,6 +45,12 @@ class InspectResultCallback:
         self.last_role = None
         self.stopped = False
         self.interrupt = manager_interrupt
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._finished_hosts = []
+        self._event_queues = []
+        self._workers = []
+        self._worker_error = None
 
     def process_task_facts(self, task_facts, host):
         """Collect, process, and save task facts."""
@@ -64,7 +78,8 @@ class InspectResultCallback:
         task = event_data.get("task")
         # Print Role started for each host
         if task_action == "set_fact" and task == STARTED_PROCESSING_ROLE:
-            log_message = f"PROCESSING {host} - ANSIBLE ROLE {self.last_role}"
+            role = event_data.get("role", self.last_role)
+            log_message = f"PROCESSING {host} - ANSIBLE ROLE {role}"
             self.scan_task.log_message(log_message)
         task_facts = result.get("ansible_facts")
         if task_facts:
@@ -108,9 +123,12 @@ class InspectResultCallback:
         for host in host_list:
             self._finalize_host(host, SystemInspectionResult.FAILED)
 
-    @transaction.atomic
     def _finalize_host(self, host, host_status):
-        """Save facts collected and update the scan counts."""
+        """Queue the facts collected for a host to be saved.
+
+        Finished hosts are saved right away unless event workers are running,
+        which save them in batches.
+        """
         results = raw_facts_template()
         results.update(self._ansible_facts.pop(host, {}))
 
@@ -127,8 +145,31 @@ class InspectResultCallback:
             log_level=logging.DEBUG,
         )
 
-        # Update scan counts
-        if self.scan_task is not None:
+        # Generate facts for host
+        facts = {
+            result_key: None if result_value == process.NO_DATA else result_value
+            for result_key, result_value in results.items()
+        }
+        with self._lock:
+            self._finished_hosts.append((host, host_status, facts))
+            finished_count = len(self._finished_hosts)
+        batch_size = settings.QPC_INSPECT_RESULT_BATCH_SIZE
+        if not self._workers or finished_count >= batch_size:
+            self._save_finished_hosts()
+
+    def _save_finished_hosts(self):
+        """Save the finished hosts and update the scan counts."""
+        with self._save_lock:
+            with self._lock:
+                finished_hosts, self._finished_hosts = self._finished_hosts, []
+            if finished_hosts:
+                self._save_hosts(finished_hosts)
+
+    @transaction.atomic
+    def _save_hosts(self, finished_hosts):
+        """Save a batch of finished hosts in one transaction."""
+        for host, host_status, facts in finished_hosts:
+            # Update scan counts
             if host_status == SystemInspectionResult.SUCCESS:
                 self.scan_task.increment_stats(host, increment_sys_scanned=True)
             elif host_status == SystemInspectionResult.UNREACHABLE:
@@ -136,23 +177,13 @@ class InspectResultCallback:
             else:
                 self.scan_task.increment_stats(host, increment_sys_failed=True)
 
-        sys_result = SystemInspectionResult(
-            name=host,
-            status=host_status,
-            source=self.scan_task.source,
-            task_inspection_result=self.scan_task.inspection_result,
-        )
-        sys_result.save()
-
-        # Generate facts for host
-        for result_key, result_value in results.items():
-            if result_value == process.NO_DATA:
-                result_value = None
-
-            stored_fact = RawFact(
-                name=result_key, value=result_value, system_inspection_result=sys_result
+            SystemInspectionResult.objects.create_with_facts(
+                facts,
+                name=host,
+                status=host_status,
+                source=self.scan_task.source,
+                task_inspection_result=self.scan_task.inspection_result,
             )
-            stored_fact.save()
 
     @transaction.atomic
     def task_on_unreachable(self, event_dict):
@@ -166,13 +197,88 @@ class InspectResultCallback:
         self.scan_task.log_message(message, log_level=logging.ERROR)
         self._finalize_host(host, SystemInspectionResult.UNREACHABLE)
 
+    def handle_task_event(self, event_dict):
+        """Process the result of a task on a host."""
+        okay = ["runner_on_ok", "runner_item_on_ok"]
+        failed = ["runner_on_failed", "runner_item_on_failed"]
+        unreachable = ["runner_on_unreachable"]
+        runner_ignore = ["runner_on_skipped", "runner_item_on_skipped"]
+        event = event_dict.get("event")
+        if event in okay:
+            self.task_on_ok(event_dict)
+        elif event in failed:
+            self.task_on_failed(event_dict)
+        elif event in unreachable:
+            self.task_on_unreachable(event_dict)
+        elif event not in runner_ignore:
+            self.scan_task.log_message(
+                log_messages.TASK_UNEXPECTED_FAILURE
+                % ("event_callback", event, event_dict),
+                log_level=logging.ERROR,
+            )
+
+    def _start_workers(self):
+        """Start the threads processing task events."""
+        for _ in range(settings.QPC_INSPECT_EVENT_WORKERS):
+            event_queue = queue.Queue(maxsize=settings.QPC_INSPECT_EVENT_QUEUE_SIZE)
+            # workers see the context of the caller, like decrypted_data_cache
+            worker = threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._process_events, event_queue),
+                daemon=True,
+            )
+            worker.start()
+            self._event_queues.append(event_queue)
+            self._workers.append(worker)
+
+    def _process_events(self, event_queue):
+        """Process queued task events until flush() is called."""
+        try:
+            while (event_dict := event_queue.get()) is not None:
+                # keep consuming after an error so the event handler never
+                # waits on a full queue
+                if self._worker_error is None:
+                    try:
+                        self.handle_task_event(event_dict)
+                    except Exception as error:  # pylint: disable=broad-except
+                        logger.exception("Failed to process inspect event")
+                        self._worker_error = error
+                if event_queue.empty():
+                    self._save_finished_hosts()
+        finally:
+            connections.close_all()
+
+    def _queue_task_event(self, event_dict):
+        """Send a task event to the worker handling its host."""
+        if self._worker_error is not None:
+            raise self._worker_error
+        if not self._workers:
+            self._start_workers()
+        host = (event_dict.get("event_data") or {}).get("host", UNKNOWN)
+        event_queue = self._event_queues[hash(host) % len(self._event_queues)]
+        event_queue.put(event_dict)
+
+    def flush(self):
+        """Wait for queued task events to be processed and save all results.
+
+        Must be called after the playbook run, also when it was stopped, so
+        hosts finished before a pause or cancel are saved and don't have to
+        be inspected again.
+        """
+        for event_queue in self._event_queues:
+            event_queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._event_queues = []
+        self._workers = []
+        self._save_finished_hosts()
+        if self._worker_error is not None:
+            error, self._worker_error = self._worker_error, None
+            raise AnsibleRunnerException(error) from error
+
     def event_callback(self, event_dict=None):
         """Control the event callback for Ansible Runner."""
         try:
-            okay = ["runner_on_ok", "runner_item_on_ok"]
-            failed = ["runner_on_failed", "runner_item_on_failed"]
-            unreachable = ["runner_on_unreachable"]
-            runner_ignore = ["runner_on_skipped", "runner_item_on_skipped"]
             event = event_dict.get("event")
             event_data = event_dict.get("event_data")
 
@@ -183,19 +289,10 @@ class InspectResultCallback:
             if event_dict:
                 # Check if it is a task event
                 if "runner" in event:
-                    if event in okay:
-                        self.task_on_ok(event_dict)
-                    elif event in failed:
-                        self.task_on_failed(event_dict)
-                    elif event in unreachable:
-                        self.task_on_unreachable(event_dict)
+                    if settings.QPC_INSPECT_EVENT_WORKERS > 0:
+                        self._queue_task_event(event_dict)
                     else:
-                        if event not in runner_ignore:
-                            self.scan_task.log_message(
-                                log_messages.TASK_UNEXPECTED_FAILURE
-                                % ("event_callback", event, event_dict),
-                                log_level=logging.ERROR,
-                            )
+                        self.handle_task_event(event_dict)
                 # Save last role for task logging later
                 if event == "playbook_on_task_start":
                     if event_data:
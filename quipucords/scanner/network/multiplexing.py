@@ -0,0 +1,77 @@
+"""SSH connection sharing between the ansible runs of a scan job.
+
+Connect and inspect runs of the same source use one ControlMaster socket
+directory, so the ssh connection opened to a host by the connect phase is
+reused by the inspect phase instead of authenticating again.
+
+Celery workers don't share these directories: the connect and inspect tasks
+of a source can run on different workers, so each task closes its masters
+when it ends (see scanner.tasks.run_scan_task) and only the ssh sessions of a
+single run are shared there.
+"""
+
+import logging
+import shutil
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSE_MASTER_TIMEOUT = 10
+
+
+def control_path_dir(scan_job_id, source_id=None) -> Path:
+    """Get the ControlMaster socket directory of a scan job or of one source.
+
+    :param scan_job_id: the ScanJob id
+    :param source_id: the Source id, None for the directory of the whole job
+    """
+    job_dir = Path(settings.QPC_SSH_CONTROL_PATH_DIR) / f"job-{scan_job_id}"
+    if source_id is None:
+        return job_dir
+    return job_dir / f"source-{source_id}"
+
+
+def ssh_multiplexing_vars(scan_job_id, source_id) -> dict:
+    """Get the ansible vars making ssh connections of a job's source shared.
+
+    :returns: dict of extra vars, empty if multiplexing is disabled
+    """
+    if not settings.QPC_SSH_MULTIPLEXING:
+        return {}
+    socket_dir = control_path_dir(scan_job_id, source_id)
+    socket_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return {
+        "ansible_ssh_args": (
+            "-C -o ControlMaster=auto"
+            f" -o ControlPersist={settings.QPC_SSH_CONTROL_PERSIST}s"
+        ),
+        "ansible_control_path_dir": str(socket_dir),
+    }
+
+
+def close_ssh_connections(scan_job_id, source_id=None):
+    """Stop the ControlMaster processes of a job and remove their sockets.
+
+    :param scan_job_id: the ScanJob id
+    :param source_id: the Source id, None to close every source of the job
+    """
+    socket_dir = control_path_dir(scan_job_id, source_id)
+    if not socket_dir.is_dir():
+        return
+    for socket_path in socket_dir.rglob("*"):
+        if socket_path.is_dir():
+            continue
+        try:
+            # the host name is required but unused when ControlPath is given
+            subprocess.run(
+                ["ssh", "-O", "exit", "-o", f"ControlPath={socket_path}", "qpc"],
+                capture_output=True,
+                check=False,
+                timeout=CLOSE_MASTER_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired) as error:
+            logger.warning("Couldn't close ssh connection %s: %s", socket_path, error)
+    shutil.rmtree(socket_dir, ignore_errors=True)
@@ -0,0 +1,79 @@
+"""Check which hosts accept TCP connections before trying credentials on them."""
+
+import asyncio
+import errno
+import logging
+import resource
+
+logger = logging.getLogger(__name__)
+
+# errors telling the probe ran out of file descriptors, not that the host
+# can't be reached
+OUT_OF_FILES_ERRNOS = (errno.EMFILE, errno.ENFILE)
+
+
+async def _is_reachable(host, port, timeout):
+    """Check if a TCP connection to host:port opens within timeout seconds."""
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout=timeout
+        )
+    except (OSError, asyncio.TimeoutError) as error:
+        if getattr(error, "errno", None) in OUT_OF_FILES_ERRNOS:
+            # let the connect playbook try the host instead
+            logger.warning("Couldn't probe %s:%s: %r", host, port, error)
+            return True
+        logger.debug("%s:%s did not accept connection: %r", host, port, error)
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def _probe(hosts, port, timeout, concurrency, should_stop):
+    """Probe hosts with at most concurrency connections open at once."""
+    host_iterator = iter(hosts)
+    unreachable = []
+
+    async def worker():
+        for host in host_iterator:
+            if should_stop is not None and should_stop():
+                return
+            if not await _is_reachable(host, port, timeout):
+                unreachable.append(host)
+
+    # workers share one iterator, so hosts are produced as they are needed
+    # instead of creating one task per host upfront
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return unreachable
+
+
+def max_probe_concurrency(concurrency):
+    """Cap concurrency so probes use at most half of the open files limit.
+
+    The other half is left to the database, ansible and the rest of the
+    process.
+    """
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return max(concurrency, 1)
+    return max(min(concurrency, soft_limit // 2), 1)
+
+
+def find_unreachable_hosts(hosts, port, timeout, concurrency, should_stop=None):
+    """Return the hosts that don't accept TCP connections on port.
+
+    :param hosts: iterable of host names or addresses
+    :param port: the port to connect to, usually the ssh port
+    :param timeout: seconds to wait for each connection
+    :param concurrency: max number of connection attempts in flight, capped
+        by max_probe_concurrency
+    :param should_stop: Optional. Callable returning True when probing
+        must stop; hosts not probed yet are not reported as unreachable
+    :returns: list of unreachable hosts
+    """
+    concurrency = max_probe_concurrency(concurrency)
+    return asyncio.run(_probe(hosts, port, timeout, concurrency, should_stop))
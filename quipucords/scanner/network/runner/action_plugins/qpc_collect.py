@@ -0,0 +1,80 @@
+"""Run many raw commands on a host in a single session.
+
+Used by inspect_collector.yml. Each command runs in its own subshell and its
+output is returned in the 'collected' dict of the result, keyed by command,
+in the format the raw action returns, so the raw action plugin can answer
+raw tasks running the same commands without connecting to the host again.
+"""
+
+import re
+import uuid
+
+from ansible.plugins.action import ActionBase
+
+
+def build_script(commands, boundary):
+    """Build a POSIX shell script running commands one after another."""
+    lines = [f"echo '{boundary}'"]
+    for index, command in enumerate(commands):
+        lines.extend(
+            [
+                f"echo '{boundary} begin {index}'",
+                # ':' keeps the subshell valid for empty commands and the
+                # newlines keep comments in command from hiding the ')'
+                "( :",
+                command,
+                ") </dev/null 2>&1",
+                f"printf '\\n{boundary} end {index} %s\\n' \"$?\"",
+            ]
+        )
+    lines.append("exit 0")
+    return "\n".join(lines)
+
+
+def parse_output(output, commands, boundary):
+    """Split the output of a script built by build_script by command.
+
+    :returns: dict of command to raw action like results, for the commands
+        that ran to the end
+    """
+    output = output.replace("\r\n", "\n")
+    pattern = re.compile(
+        rf"{boundary} begin (\d+)\n(.*?)\n{boundary} end \1 (\d+)\n", re.DOTALL
+    )
+    collected = {}
+    for match in pattern.finditer(output):
+        stdout = match.group(2)
+        collected[commands[int(match.group(1))]] = {
+            "rc": int(match.group(3)),
+            "stdout": stdout,
+            "stdout_lines": stdout.splitlines(),
+            "stderr": "",
+            "stderr_lines": [],
+        }
+    return collected
+
+
+class ActionModule(ActionBase):
+    """Run a list of commands on a host with a single raw command."""
+
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset(("commands",))
+
+    def run(self, tmp=None, task_vars=None):
+        """Run the commands and return their output by command."""
+        result = super().run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+        commands = [str(command) for command in self._task.args.get("commands", [])]
+        result["changed"] = False
+        result["collected"] = {}
+        if not commands:
+            return result
+
+        boundary = f"__qpc_collector_{uuid.uuid4().hex}"
+        output = self._low_level_execute_command(build_script(commands, boundary))
+        result["rc"] = output["rc"]
+        result["collected"] = parse_output(output["stdout"], commands, boundary)
+        if output["rc"] != 0:
+            result["failed"] = True
+            result["msg"] = "non-zero return code"
+        return result
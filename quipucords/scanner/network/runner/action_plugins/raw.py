@@ -0,0 +1,37 @@
+"""Raw action answering commands already run by the qpc_collect action.
+
+Playbooks that don't run qpc_collect, like connect.yml and inspect.yml, get
+the builtin raw action behavior.
+"""
+
+from ansible.plugins.action.raw import ActionModule as RawActionModule
+
+# variables registered by the qpc_collect tasks of inspect_collector.yml
+COLLECTOR_OUTPUT = "internal_collector_output"
+COLLECTOR_BECOME_OUTPUT = "internal_collector_become_output"
+
+
+class ActionModule(RawActionModule):
+    """Raw action using the qpc_collect output when there is one."""
+
+    def run(self, tmp=None, task_vars=None):
+        """Return the collected result of the command or run it."""
+        collected = self._collected_result(task_vars or {})
+        if collected is None:
+            return super().run(tmp, task_vars)
+        result = dict(collected, changed=True)
+        if result["rc"] != 0:
+            result["failed"] = True
+            result["msg"] = "non-zero return code"
+        return result
+
+    def _collected_result(self, task_vars):
+        """Find the output of the command collected with the same become."""
+        if self._play_context.check_mode:
+            return None
+        output_var = (
+            COLLECTOR_BECOME_OUTPUT if self._play_context.become else COLLECTOR_OUTPUT
+        )
+        output = task_vars.get(output_var) or {}
+        command = str(self._task.args.get("_raw_params", "")).strip()
+        return (output.get("collected") or {}).get(command)
@@ -0,0 +1,112 @@
+"""Filters reading the paths found by the jboss_discovery role.
+
+jboss_discovery walks the search directories and queries locate once for
+the files of every jboss product. The product roles use these filters in
+place of their own find and locate commands: they return a shell command
+printing the paths the original command would have printed. If discovery
+didn't run, or printing the paths would take a command too long for the
+host, the original command is returned instead.
+"""
+
+import os
+import shlex
+from fnmatch import fnmatchcase
+
+GLOB_CHARACTERS = frozenset("*?[")
+# raw passes the whole command to the remote shell as one argument, which
+# linux caps at MAX_ARG_STRLEN (128KiB); keep the printed paths well below it
+# to leave room for the rest of the role's command.
+MAX_PRINT_LENGTH = 32 * 1024
+
+
+def _discovered(result):
+    """Check if a jboss_discovery task ran and returned paths."""
+    return (
+        isinstance(result, dict)
+        and not result.get("skipped")
+        and "stdout_lines" in result
+    )
+
+
+def _print_paths(paths, fallback):
+    """Return a shell command printing paths, one per line.
+
+    :param paths: the paths to print
+    :param fallback: the command returned if printing the paths is too long
+    """
+    if not paths:
+        return "true"
+    command = "printf '%s\\n' " + " ".join(shlex.quote(path) for path in paths)
+    if len(command.encode()) > MAX_PRINT_LENGTH:
+        return fallback
+    return command
+
+
+def qpc_find(result, search_directories, name, file_type=None, xdev=True):
+    """Get the paths find would print for '-name name [-type file_type]'.
+
+    :param result: the internal_jboss_discovery_find result; its lines are
+        formatted as "<type> <path>" (find -printf '%y %p\\n')
+    :param search_directories: the directories find walks if result is
+        missing
+    :param name: the -name pattern
+    :param file_type: the -type letter, None to match any type
+    :param xdev: use -xdev if find walks the directories itself
+    """
+    command = ["find", str(search_directories)]
+    if xdev:
+        command.append("-xdev")
+    if file_type:
+        command.extend(["-type", file_type])
+    command.extend(["-name", shlex.quote(name), "2>/dev/null"])
+    own_find = " ".join(command)
+    if not _discovered(result):
+        return own_find
+
+    paths = []
+    for line in result["stdout_lines"]:
+        entry_type, _, path = line.partition(" ")
+        if not path or (file_type and entry_type != file_type):
+            continue
+        if fnmatchcase(os.path.basename(path), name):
+            paths.append(path)
+    return _print_paths(paths, own_find)
+
+
+def _locate_match(path, pattern, basename):
+    """Match a path the way locate matches it against a pattern."""
+    target = os.path.basename(path.rstrip("/")) if basename else path
+    if GLOB_CHARACTERS.intersection(pattern):
+        return fnmatchcase(target, pattern)
+    return pattern in target
+
+
+def qpc_locate(result, pattern, basename=False):
+    """Get the paths 'locate [--basename] pattern' would print.
+
+    :param result: the internal_jboss_discovery_locate result
+    :param pattern: the locate pattern
+    :param basename: match the pattern against file names only
+    """
+    command = ["locate"]
+    if basename:
+        command.append("--basename")
+    command.append(shlex.quote(pattern))
+    own_locate = " ".join(command)
+    if not _discovered(result):
+        return own_locate
+
+    paths = [
+        path
+        for path in result["stdout_lines"]
+        if _locate_match(path, pattern, basename)
+    ]
+    return _print_paths(paths, own_locate)
+
+
+class FilterModule:
+    """Filters for the jboss product roles."""
+
+    def filters(self):
+        """Return the filters by name."""
+        return {"qpc_find": qpc_find, "qpc_locate": qpc_locate}
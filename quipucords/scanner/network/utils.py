@@ -1,14 +1,20 @@
 """Scanner used for host connection discovery."""
 
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import cache
+from itertools import islice
+from math import ceil
 from multiprocessing import Value
 
 import yaml
 from ansible.parsing.utils.addresses import parse_address
 from ansible.plugins.inventory import detect_range, expand_hostname_range
 from django.conf import settings
+from django.db import connections
 
-from api.models import ScanJob
+from api.models import ScanJob, ScanTask
 from api.vault import decrypt_data_as_unicode
 from scanner.network.exceptions import NetworkCancelException, NetworkPauseException
 
@@ -29,6 +35,83 @@ def check_manager_interrupt(interrupt: Value):
         raise NetworkPauseException()
 
 
+def get_run_layout(forks):
+    """Get how hosts are split between ansible runs.
+
+    In the default lock-step mode hosts are split in groups of forks hosts,
+    run one after another. With QPC_NETWORK_SLIDING_WINDOW, hosts are split in
+    groups of QPC_NETWORK_SLIDING_WINDOW_GROUP_SIZE hosts and enough runs are
+    kept in flight to have forks hosts scanned at once.
+    :param forks: the max number of hosts scanned at once
+    :returns: tuple (hosts per group, number of runs in flight)
+    """
+    if not settings.QPC_NETWORK_SLIDING_WINDOW:
+        return forks, 1
+    group_size = max(min(settings.QPC_NETWORK_SLIDING_WINDOW_GROUP_SIZE, forks), 1)
+    return group_size, ceil(forks / group_size)
+
+
+def run_inventories(inventories, run_inventory, slots, manager_interrupt: Value):
+    """Call run_inventory for every inventory, with up to slots calls at once.
+
+    As soon as a call returns, its slot picks up the next inventory, so a slow
+    group of hosts doesn't hold the others back.
+    :param inventories: iterable of (group name, inventory)
+    :param run_inventory: callable receiving (index, group name, inventory)
+        and returning a (message, status) tuple. No more inventories are run
+        once a call returns a status other than ScanTask.COMPLETED.
+    :param slots: max number of run_inventory calls at once
+    :param manager_interrupt: Signal used to communicate termination of scan
+    :returns: the first (message, status) tuple that stopped execution or
+        (None, ScanTask.COMPLETED)
+    """
+    if slots <= 1:
+        for index, (group_name, inventory) in enumerate(inventories):
+            check_manager_interrupt(manager_interrupt)
+            message, status = run_inventory(index, group_name, inventory)
+            if status != ScanTask.COMPLETED:
+                return message, status
+        return None, ScanTask.COMPLETED
+
+    lock = threading.Lock()
+    stop = threading.Event()
+    inventories = enumerate(inventories)
+    stop_results = []
+
+    def worker():
+        try:
+            while not stop.is_set():
+                check_manager_interrupt(manager_interrupt)
+                with lock:
+                    next_inventory = next(inventories, None)
+                if next_inventory is None:
+                    return
+                index, (group_name, inventory) = next_inventory
+                message, status = run_inventory(index, group_name, inventory)
+                if status != ScanTask.COMPLETED:
+                    stop_results.append((message, status))
+                    stop.set()
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            # each thread has its own database connection
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=slots) as executor:
+        # workers see the context of the caller, like decrypted_data_cache
+        futures = [
+            executor.submit(contextvars.copy_context().run, worker)
+            for _ in range(slots)
+        ]
+    for future in futures:
+        # re-raises interruptions and errors the way lock-step runs would
+        future.result()
+    if stop_results:
+        return stop_results[0]
+    return None, ScanTask.COMPLETED
+
+
 def _credential_vars(credential):
     """Build a dictionary containing cred information."""
     ansible_dict = {}
@@ -70,38 +153,25 @@ def _construct_vars(connection_port, credential=None):
     return ansible_vars
 
 
-def construct_inventory(
-    hosts,
-    connection_port,
-    concurrency_count,
-    *,
-    credential=None,
-    exclude_hosts=None,
-):
-    """Create a dictionary inventory for Ansible to execute with.
+def iter_inventories(hosts, connection_port, concurrency_count, *, credential=None):
+    """Create an Ansible inventory for each group of concurrent hosts.
 
+    Hosts are read one group at a time, so large collections like a HostSet
+    are never expanded as a whole.
     :param hosts: The collection of hosts (or hosts/credential tuples)
-    :param credential: The credential used for connections
     :param connection_port: The connection port
     :param concurrency_count: The number of concurrent scans
-    :param exclude_hosts: Optional. Hosts to exclude test connections
-    :returns: A dictionary of the ansible inventory
+    :param credential: The credential used for connections
+    :returns: generator of (group name, inventory with that group only)
     """
-    if exclude_hosts is not None:
-        hosts = list(set(hosts) - set(exclude_hosts))
-    concurreny_groups = [
-        hosts[i : i + concurrency_count]
-        for i in range(0, len(hosts), concurrency_count)
-    ]
     vars_dict = _construct_vars(connection_port, credential)
-    children = {}
-    group_names = []
-    inventory = {"all": {"children": children, "vars": vars_dict}}
-    for index, group in enumerate(concurreny_groups):
+    hosts = iter(hosts)
+    index = 0
+    while group := list(islice(hosts, concurrency_count)):
         group_name = f"group_{index}"
-        group_names.append(group_name)
-        children[group_name] = {"hosts": _format_hosts_dict(group)}
-    return group_names, inventory
+        children = {group_name: {"hosts": _format_hosts_dict(group)}}
+        yield group_name, {"all": {"children": children, "vars": vars_dict}}
+        index += 1
 
 
 def _format_hosts_dict(group) -> dict:
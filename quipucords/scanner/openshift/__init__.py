@@ -1,4 +1,9 @@
 """Package for import organization."""
 
-from scanner.openshift.connect import ConnectTaskRunner
-from scanner.openshift.inspect import InspectTaskRunner
+from scanner.get_scanner import lazy_attributes
+
+__getattr__ = lazy_attributes(
+    __name__,
+    ConnectTaskRunner="scanner.openshift.connect",
+    InspectTaskRunner="scanner.openshift.inspect",
+)
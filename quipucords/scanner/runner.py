@@ -5,6 +5,7 @@ from multiprocessing import Value
 from typing import Tuple
 
 from api.models import ScanJob, ScanTask
+from api.vault import decrypted_data_cache
 from scanner.exceptions import (
     ScanCancelException,
     ScanFailureError,
@@ -75,7 +76,10 @@ class ScanTaskRunner(metaclass=ABCMeta):
             # Make sure job is not cancelled or paused
             self.check_for_interrupt(manager_interrupt)
             # call the inner task executor (should be implemented in concrete classes)
-            return self.execute_task(manager_interrupt)
+            # credentials are decrypted once per task instead of once per host,
+            # and stats are saved periodically instead of once per host
+            with decrypted_data_cache(), self.scan_task.buffered_stats():
+                return self.execute_task(manager_interrupt)
         except ScanInterruptException as interrupt_exc:
             return self.handle_interrupt_exception(interrupt_exc, manager_interrupt)
         except ScanFailureError as failure_error:
@@ -1,4 +1,9 @@
 """API models for import organization."""
 
-from scanner.satellite.connect import ConnectTaskRunner
-from scanner.satellite.inspect import InspectTaskRunner
+from scanner.get_scanner import lazy_attributes
+
+__getattr__ = lazy_attributes(
+    __name__,
+    ConnectTaskRunner="scanner.satellite.connect",
+    InspectTaskRunner="scanner.satellite.inspect",
+)
@@ -1,13 +1,15 @@
 """Satellite API Interface."""
 import logging
 from collections.abc import Callable, Iterable
-from multiprocessing import Pool, Value
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import chain, islice
+from multiprocessing import Value
 
+from django.conf import settings
 from django.db import transaction
 from more_itertools import chunked
 
 from api.models import (
-    RawFact,
     ScanOptions,
     ScanTask,
     SystemConnectionResult,
@@ -84,21 +86,17 @@ class SatelliteInterface:
         :param facts: The dictionary of facts
         :param status: The status of the inspection
         """
-        sys_result = SystemInspectionResult(
+        if status == SystemInspectionResult.SUCCESS:
+            facts = {key: val for key, val in facts.items() if val is not None}
+        else:
+            facts = {}
+        SystemInspectionResult.objects.create_with_facts(
+            facts,
             name=name,
             source=self.source,
             status=status,
             task_inspection_result=self.inspect_scan_task.inspection_result,
         )
-        sys_result.save()
-
-        if status == SystemInspectionResult.SUCCESS:
-            for key, val in facts.items():
-                if val is not None:
-                    stored_fact = RawFact(
-                        name=key, value=val, system_inspection_result=sys_result
-                    )
-                    stored_fact.save()
 
         if status == SystemInspectionResult.SUCCESS:
             self.inspect_scan_task.increment_stats(name, increment_sys_scanned=True)
@@ -126,30 +124,53 @@ class SatelliteInterface:
         }
         return request_options
 
-    def _process_hosts_using_multiprocessing(
+    def _process_hosts_concurrently(
         self,
         hosts: Iterable[dict],
         request_host_details: Callable,
         process_results: Callable,
         manager_interrupt: Value,
     ):
-        """Prepare and process hosts using multiprocessing.Pool.
+        """Request host details in worker threads and process them as they complete.
+
+        max_concurrency requests are kept in flight: a host is requested as soon
+        as any other one completes, instead of waiting for the slowest host of a
+        chunk. Completed results are processed in batches of
+        QPC_SATELLITE_RESULT_BATCH_SIZE.
 
         :param hosts: iterable of host dicts
         :param request_host_details: API version-specific function to get host details
         :param process_results: API version-specific function to process results
         :param manager_interrupt: shared multiprocessing value with possible interrupt
         """
-        with Pool(processes=self.max_concurrency) as pool:
-            for chunk in chunked(hosts, self.max_concurrency):
+        # workers only log with the scan task, so load everything logging
+        # reads from the database before they share it
+        _ = self.inspect_scan_task.scan_job_task_count, self.inspect_scan_task.source
+        host_params = chain.from_iterable(
+            self.prepare_host(chunk) for chunk in chunked(hosts, self.max_concurrency)
+        )
+        batch_size = settings.QPC_SATELLITE_RESULT_BATCH_SIZE
+        results = []
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while True:
                 if manager_interrupt.value == ScanJob.JOB_TERMINATE_CANCEL:
                     raise SatelliteCancelException()
 
                 if manager_interrupt.value == ScanJob.JOB_TERMINATE_PAUSE:
                     raise SatellitePauseException()
-                host_params = self.prepare_host(chunk)
-                results = pool.starmap(request_host_details, host_params)
-                process_results(results=results)
+                free_workers = self.max_concurrency - len(in_flight)
+                for params in islice(host_params, free_workers):
+                    in_flight.add(executor.submit(request_host_details, *params))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+                if len(results) >= batch_size:
+                    process_results(results=results)
+                    results = []
+        if results:
+            process_results(results=results)
 
     def _prepare_host_logging_options(self):
 
@@ -1,8 +1,10 @@
 """Satellite 5 API handlers."""
 import logging
+import threading
 import xmlrpc.client
 from functools import partial
 
+from django.conf import settings
 from more_itertools import unique_everseen
 
 from api.models import SystemInspectionResult
@@ -46,6 +48,51 @@ VIRTUAL_HOST_UUID = "virtual_host_uuid"
 VIRTUAL_HOST_NAME = "virtual_host_name"
 HYPERVISOR = "hypervisor"
 
+# results of the calls made by _request_system_details, in order
+SYSTEM_DETAILS = (
+    "uuid",
+    "cpu",
+    "system_details",
+    "kernel",
+    "subs",
+    "network_devices",
+    "registration_date",
+)
+
+
+class MulticallUnsupportedError(Exception):
+    """Exception for a Satellite 5 server without system.multicall."""
+
+
+def _request_system_details(client, key, host_id, multicall=False):
+    """Request the details of a system.
+
+    :param client: The xmlrpc client
+    :param key: The session key
+    :param host_id: The identifier of the host
+    :param multicall: Send all calls in one system.multicall request
+    :returns: dictionary of the SYSTEM_DETAILS of the host
+    :throws: MulticallUnsupportedError if the server rejects system.multicall
+    """
+    proxy = xmlrpc.client.MultiCall(client) if multicall else client
+    values = [
+        proxy.system.get_uuid(key, host_id),
+        proxy.system.get_cpu(key, host_id),
+        proxy.system.get_details(key, host_id),
+        proxy.system.get_running_kernel(key, host_id),
+        proxy.system.get_entitlements(key, host_id),
+        proxy.system.get_network_devices(key, host_id),
+        proxy.system.get_registration_date(key, host_id),
+    ]
+    if multicall:
+        try:
+            multicall_results = proxy()
+        except xmlrpc.client.Fault as xml_error:
+            raise MulticallUnsupportedError(str(xml_error)) from xml_error
+        # a fault of any of the calls is raised while reading its result
+        values = list(multicall_results)
+    return dict(zip(SYSTEM_DETAILS, values))
+
 
 # pylint: disable=too-many-locals,too-many-branches,too-many-statements
 # pylint: disable=too-many-arguments
@@ -71,24 +118,9 @@ def request_host_details(
         scan_task.log_message(message, logging.INFO, logging_options)
 
         key = client.auth.login(user, password)
-        uuid = client.system.get_uuid(key, host_id)
-        cpu = client.system.get_cpu(key, host_id)
-        system_details = client.system.get_details(key, host_id)
-        kernel = client.system.get_running_kernel(key, host_id)
-        subs = client.system.get_entitlements(key, host_id)
-
-        network_devices = client.system.get_network_devices(key, host_id)
-        registration_date = client.system.get_registration_date(key, host_id)
-
+        results.update(_request_system_details(client, key, host_id))
         client.auth.logout(key)
         system_inspection_result = SystemInspectionResult.SUCCESS
-        results["uuid"] = uuid
-        results["cpu"] = cpu
-        results["system_details"] = system_details
-        results["kernel"] = kernel
-        results["subs"] = subs
-        results["network_devices"] = network_devices
-        results["registration_date"] = registration_date
 
     except xmlrpc.client.Fault as xml_error:
         error_message = f"Satellite 5 fault error encountered: {xml_error}\n"
@@ -103,6 +135,120 @@ def request_host_details(
     return results
 
 
+class WorkerSessions:
+    """Authenticated Satellite 5 sessions, one per worker thread.
+
+    Each worker logs in once and inspects all its hosts with the same client
+    and session key, sending the calls for a host in one system.multicall
+    request unless the server doesn't support it.
+    """
+
+    def __init__(self, request_options):
+        """Set the options used to log in.
+
+        :param request_options: A dictionary containing the host, port,
+            user, and password for the source
+        """
+        self.request_options = request_options
+        self.multicall = True
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions = []
+
+    def get(self):
+        """Get the client and session key of the current worker, logging in first.
+
+        :returns: tuple of (client, key)
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            client, user, password = utils.get_sat5_client(None, self.request_options)
+            session = (client, client.auth.login(user, password))
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def discard(self):
+        """Forget the session of the current worker, e.g. after it expired."""
+        self._local.session = None
+
+    def request_system_details(self, host_id):
+        """Request the details of a system using the session of the current worker.
+
+        The session is renewed and the request retried once on a fault, in
+        case the session expired.
+        :returns: dictionary of the SYSTEM_DETAILS of the host
+        """
+        for attempt in range(2):
+            client, key = self.get()
+            try:
+                return self._request_system_details(client, key, host_id)
+            except xmlrpc.client.Fault:
+                self.discard()
+                if attempt:
+                    raise
+        return None
+
+    def _request_system_details(self, client, key, host_id):
+        if self.multicall:
+            try:
+                return _request_system_details(client, key, host_id, multicall=True)
+            except MulticallUnsupportedError as error:
+                logger.info(
+                    "Satellite 5 system.multicall isn't supported (%s)."
+                    " Sending each call on its own.",
+                    error,
+                )
+                self.multicall = False
+        return _request_system_details(client, key, host_id)
+
+    def logout(self):
+        """Log all the sessions out."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for client, key in sessions:
+            try:
+                client.auth.logout(key)
+            except (xmlrpc.client.Error, OSError) as error:
+                logger.warning("Satellite 5 logout failed: %s", error)
+
+
+# pylint: disable=too-many-arguments,unused-argument
+def request_host_details_in_session(
+    host_id,
+    host_name,
+    last_checkin,
+    scan_task,
+    request_options,
+    logging_options,
+    sessions,
+):
+    """Gather satellite data of a host with the session of the current worker.
+
+    Takes the same arguments as request_host_details, plus the WorkerSessions
+    to use, and returns the same results.
+    """
+    unique_name = f"{host_name}_{host_id}"
+    results = raw_facts_template()
+    try:
+        message = f"REQUESTING HOST DETAILS: {unique_name}"
+        scan_task.log_message(message, logging.INFO, logging_options)
+        results.update(sessions.request_system_details(host_id))
+        system_inspection_result = SystemInspectionResult.SUCCESS
+    except xmlrpc.client.Fault as xml_error:
+        error_message = f"Satellite 5 fault error encountered: {xml_error}\n"
+        logger.error(error_message)
+        system_inspection_result = SystemInspectionResult.FAILED
+
+    results["host_name"] = host_name
+    results["host_id"] = host_id
+    results["last_checkin"] = last_checkin
+    results["system_inspection_result"] = system_inspection_result
+
+    return results
+
+
 class SatelliteFive(SatelliteInterface):
     """Interact with Satellite 5."""
 
@@ -382,8 +528,20 @@ class SatelliteFive(SatelliteInterface):
             physical_hosts=physical_hosts,
         )
 
-        self._process_hosts_using_multiprocessing(
-            hosts, request_host_details, _process_results, manager_interrupt
-        )
+        if not settings.QPC_SATELLITE5_WORKER_SESSIONS:
+            self._process_hosts_concurrently(
+                hosts, request_host_details, _process_results, manager_interrupt
+            )
+        else:
+            sessions = WorkerSessions(self._prepare_host_request_options())
+            try:
+                self._process_hosts_concurrently(
+                    hosts,
+                    partial(request_host_details_in_session, sessions=sessions),
+                    _process_results,
+                    manager_interrupt,
+                )
+            finally:
+                sessions.logout()
 
         utils.validate_task_stats(self.inspect_scan_task)
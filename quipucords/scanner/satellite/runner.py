@@ -52,6 +52,8 @@ class SatelliteTaskRunner(ScanTaskRunner, metaclass=ABCMeta):
             self.handle_api_calls(api, manager_interrupt)
         except self.EXPECTED_EXCEPTIONS as error:
             return self._handle_error(error)
+        finally:
+            utils.close_sessions()
 
         return None, ScanTask.COMPLETED
 
@@ -3,11 +3,14 @@ from __future__ import annotations
 
 import itertools
 import logging
+import math
 from abc import ABCMeta, abstractmethod
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 import requests
+from django.conf import settings
 from more_itertools import unique_everseen
 from requests.exceptions import Timeout
 
@@ -24,6 +27,8 @@ PER_PAGE = "per_page"
 PAGE = "page"
 THIN = "thin"
 RESULTS = "results"
+TOTAL = "total"
+SUBTOTAL = "subtotal"
 ID = "id"
 NAME = "name"
 OS_NAME = "os_name"
@@ -138,35 +143,79 @@ def request_results(  # pylint: disable=too-many-arguments
     org_id=None,
     host_id=None,
     options=None,
-    per_page: int = 100,
+    per_page: int | None = None,
+    max_concurrency: int = 1,
 ) -> Generator[dict, None, None]:
     """
     Request and yield results for the given scan_task and url_template.
 
     This generator yields each result individually from the response and continues to
     execute more requests and yield their results until pagination is exhausted.
+
+    The first page tells the total number of results and the page size the server
+    actually uses, so the remaining pages are then requested with up to
+    max_concurrency requests at once. Results are still yielded in page order.
     """
-    for page in itertools.count(1):
-        query_params = {PAGE: page, PER_PAGE: per_page, THIN: 1}
-        response, url = utils.execute_request(
-            scan_task,
-            url=url_template,
-            org_id=org_id,
-            host_id=host_id,
-            query_params=query_params,
-            options=options,
+    if per_page is None:
+        per_page = settings.QPC_SATELLITE_PAGE_SIZE
+    if not options:
+        # workers must not query the database for the options
+        options = utils.request_options(scan_task)
+    request_page = partial(
+        _request_page,
+        scan_task,
+        url_template,
+        org_id=org_id,
+        host_id=host_id,
+        options=options,
+    )
+    response_body = request_page(page=1, per_page=per_page)
+    results = response_body.get(RESULTS, [])
+    yield from results
+    page_size = int(response_body.get(PER_PAGE, 0))
+    if not results or len(results) != page_size:
+        return
+    total = response_body.get(SUBTOTAL, response_body.get(TOTAL))
+    if total is None or max_concurrency < 2:
+        # without a total, walk pages until one isn't full
+        for page in itertools.count(2):
+            results = request_page(page=page, per_page=page_size).get(RESULTS, [])
+            yield from results
+            if len(results) != page_size:
+                return
+    last_page = math.ceil(int(total) / page_size)
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        pages = executor.map(
+            partial(request_page, per_page=page_size), range(2, last_page + 1)
         )
-        if response.status_code != requests.codes.ok:
-            raise SatelliteException(
-                f"Invalid response code {response.status_code}" f" for url: {url}"
-            )
-        response_body = response.json()
-        results = response_body.get(RESULTS, [])
-        for result in results:
-            yield result
-        expect_more_pages = len(results) == int(response_body.get(PER_PAGE, 0))
-        if not results or not expect_more_pages:
-            break
+        for page_body in pages:
+            yield from page_body.get(RESULTS, [])
+    finally:
+        # don't wait for pages nobody reads if the caller stops early
+        executor.shutdown(cancel_futures=True)
+
+
+# pylint: disable=too-many-arguments
+def _request_page(scan_task, url_template, org_id, host_id, options, page, per_page):
+    """Request one page of results.
+
+    :returns: the response json
+    """
+    query_params = {PAGE: page, PER_PAGE: per_page, THIN: 1}
+    response, url = utils.execute_request(
+        scan_task,
+        url=url_template,
+        org_id=org_id,
+        host_id=host_id,
+        query_params=query_params,
+        options=options,
+    )
+    if response.status_code != requests.codes.ok:
+        raise SatelliteException(
+            f"Invalid response code {response.status_code}" f" for url: {url}"
+        )
+    return response.json()
 
 
 # pylint: disable=too-many-locals,too-many-statements,too-many-branches
@@ -441,7 +490,12 @@ class SatelliteSix(SatelliteInterface, metaclass=ABCMeta):
     def _request_and_record_hosts(self, credential, org_id=None):
         """Request and record hosts for the given credential and optional org filter."""
         hosts = []
-        for result in request_results(self.connect_scan_task, self.HOSTS_URL, org_id):
+        for result in request_results(
+            self.connect_scan_task,
+            self.HOSTS_URL,
+            org_id,
+            max_concurrency=self.max_concurrency,
+        ):
             host_name = result.get(NAME)
             host_id = result.get(ID)
 
@@ -472,7 +526,7 @@ class SatelliteSix(SatelliteInterface, metaclass=ABCMeta):
             process_results, self=self, api_version=self.SATELLITE_API_VERSION
         )
 
-        self._process_hosts_using_multiprocessing(
+        self._process_hosts_concurrently(
             hosts, request_host_details, _process_results, manager_interrupt
         )
 
@@ -550,7 +604,12 @@ class SatelliteSixV1(SatelliteSix):
         """Get an iterable of all unique hosts spanning all orgs."""
         hosts = unique_everseen(
             itertools.chain.from_iterable(
-                request_results(self.inspect_scan_task, self.HOSTS_URL, org_id)
+                request_results(
+                    self.inspect_scan_task,
+                    self.HOSTS_URL,
+                    org_id,
+                    max_concurrency=self.max_concurrency,
+                )
                 for org_id in self.get_orgs()
             )
         )
@@ -588,4 +647,10 @@ class SatelliteSixV2(SatelliteSix):
 
     def _requests_hosts_unique(self):
         """Get an iterable of all unique hosts."""
-        return unique_everseen(request_results(self.inspect_scan_task, self.HOSTS_URL))
+        return unique_everseen(
+            request_results(
+                self.inspect_scan_task,
+                self.HOSTS_URL,
+                max_concurrency=self.max_concurrency,
+            )
+        )
@@ -1,7 +1,9 @@
 """Utilities used for Satellite operations."""
 
 import logging
+import os
 import ssl
+import threading
 import xmlrpc.client
 
 import requests
@@ -9,6 +11,7 @@ from django.conf import settings
 from rest_framework import status as codes
 
 from api.vault import decrypt_data_as_unicode
+from compat.requests import Session
 from scanner.satellite.api import (
     SATELLITE_VERSION_5,
     SATELLITE_VERSION_6,
@@ -21,6 +24,13 @@ logger = logging.getLogger(__name__)
 # Disable warnings for satellite requests
 requests.packages.urllib3.disable_warnings()  # pylint: disable=no-member
 
+# keep-alive sessions of the current worker, see get_session
+_worker_sessions = threading.local()
+# sessions opened by any thread, mapped to the id of their process, so
+# close_sessions can close the ones of worker threads too
+_open_sessions = {}
+_open_sessions_lock = threading.Lock()
+
 
 def get_credential(scan_task):
     """Extract the credential from the scan task.
@@ -45,6 +55,27 @@ def get_connect_data(scan_task):
     return (host, port, user, password)
 
 
+def request_options(scan_task):
+    """Extract the request options of execute_request from the scan task.
+
+    :param scan_task: The scan tasks
+    :returns: A dictionary containing the values for ssl_cert_verify,
+        host, port, user, and password.
+    """
+    ssl_verify = True
+    source_options = scan_task.source.options
+    if source_options:
+        ssl_verify = source_options.ssl_cert_verify
+    host, port, user, password = get_connect_data(scan_task)
+    return {
+        "host": host,
+        "port": port,
+        "user": user,
+        "password": password,
+        "ssl_cert_verify": ssl_verify,
+    }
+
+
 def get_sat5_client(scan_task, options=None):
     """Create xmlrpc client and credential for Satellite 5.
 
@@ -95,6 +126,60 @@ def construct_url(url, sat_host, port="443", org_id=None, host_id=None):
     return url.format(sat_host=sat_host, port=port, org_id=org_id, host_id=host_id)
 
 
+def get_session(host, port, user, password, ssl_verify=True):
+    """Get the pooled keep-alive session of the current worker for a Satellite.
+
+    Sessions are kept per thread and per process, so multiprocessing workers
+    never share the sockets of a session created before they were forked.
+    Requests failing with a status eligible for retry are retried with the
+    QPC_HTTP_RETRY_* backoff; the last response is returned once retries are
+    exhausted.
+
+    :param host: The hostname or ip of Satellite
+    :param port: The port of the Satellite server
+    :param user: The user to authenticate with
+    :param password: The password to authenticate with
+    :param ssl_verify: SSL verify
+    :returns: compat.requests.Session
+    """
+    pid = os.getpid()
+    if getattr(_worker_sessions, "pid", None) != pid:
+        _worker_sessions.pid = pid
+        _worker_sessions.sessions = {}
+    key = (host, port, user, password, ssl_verify)
+    session = _worker_sessions.sessions.get(key)
+    with _open_sessions_lock:
+        if session is None or session not in _open_sessions:
+            session = Session(
+                auth=(user, password),
+                verify=ssl_verify,
+                raise_on_status=False,
+                pool_maxsize=settings.QPC_SATELLITE_HTTP_POOL_SIZE,
+            )
+            _worker_sessions.sessions[key] = session
+            _open_sessions[session] = pid
+    return session
+
+
+def close_sessions():
+    """Close the keep-alive sessions opened by any thread of this process.
+
+    Call it once the workers are done: a worker requesting again afterwards
+    gets a new session.
+    """
+    pid = os.getpid()
+    with _open_sessions_lock:
+        sessions = [
+            session
+            for session, session_pid in _open_sessions.items()
+            if session_pid == pid
+        ]
+        for session in sessions:
+            del _open_sessions[session]
+    for session in sessions:
+        session.close()
+
+
 # pylint: disable=too-many-arguments
 def execute_request(
     scan_task, url, org_id=None, host_id=None, query_params=None, options=None
@@ -111,26 +196,21 @@ def execute_request(
     :returns: The response object
     :throws: Timeout
     """
-    if options:
-        ssl_verify = options.get("ssl_cert_verify")
-        host = options.get("host")
-        port = options.get("port")
-        user = options.get("user")
-        password = options.get("password")
-    else:
-        ssl_verify = True
-        source_options = scan_task.source.options
-        if source_options:
-            ssl_verify = source_options.ssl_cert_verify
-        host, port, user, password = get_connect_data(scan_task)
+    if not options:
+        options = request_options(scan_task)
+    ssl_verify = options.get("ssl_cert_verify")
+    host = options.get("host")
+    port = options.get("port")
+    user = options.get("user")
+    password = options.get("password")
     url = construct_url(url, host, port, org_id, host_id)
 
     connect_timeout = settings.QPC_SSH_CONNECT_TIMEOUT
     inspect_timeout = settings.QPC_SSH_INSPECT_TIMEOUT
 
-    response = requests.get(
+    session = get_session(host, port, user, password, ssl_verify)
+    response = session.get(
         url,
-        auth=(user, password),
         timeout=(connect_timeout, inspect_timeout),
         params=query_params,
         verify=ssl_verify,
@@ -0,0 +1,160 @@
+"""Celery tasks for running scan jobs on distributed workers.
+
+A ScanJob is split into one celery task per ScanTask. Connect/inspect tasks of
+the same source are chained, chains of different sources run in parallel on
+any available worker and the fingerprint task runs once all chains finished.
+
+Workers don't share memory with the scan manager, so pause/cancel requests are
+exchanged through the ScanJob.interrupt database field (see DatabaseInterrupt).
+The request stays there until the job is queued again, so every chain sees it;
+tasks acknowledge it by changing the job status instead.
+"""
+
+from __future__ import annotations
+
+import logging
+from time import monotonic
+
+from celery import chain, chord, shared_task
+
+from api.models import ScanJob, ScanTask
+from fingerprinter.runner import FingerprintTaskRunner
+from scanner.job import SyncScanJobRunner, get_task_runner_class, run_task_runner
+from scanner.network.multiplexing import close_ssh_connections
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseInterrupt:
+    """Interrupt signal stored in ScanJob.interrupt.
+
+    Mimics the "value" attribute of the multiprocessing.Value used by the scan
+    manager, so it can be handed to task runners unchanged. Reads are cached for
+    refresh_interval seconds because ansible callbacks poll it constantly.
+
+    Source chains of a job run on several workers at once, so an
+    acknowledgement (JOB_TERMINATE_ACK) is only kept by the instance it was set
+    on: writing it to the database would hide the pause/cancel request from
+    the chains that haven't seen it yet.
+    """
+
+    refresh_interval = 1
+
+    def __init__(self, scan_job_id: int):
+        """Create an interrupt bound to a ScanJob."""
+        self.scan_job_id = scan_job_id
+        self._value = None
+        self._last_refresh = None
+        self._acknowledged = False
+
+    @property
+    def value(self) -> int:
+        """Return the current interrupt value."""
+        if self._acknowledged:
+            return ScanJob.JOB_TERMINATE_ACK
+        now = monotonic()
+        if self._last_refresh is None or (
+            now - self._last_refresh >= self.refresh_interval
+        ):
+            self._value = (
+                ScanJob.objects.filter(id=self.scan_job_id)
+                .values_list("interrupt", flat=True)
+                .first()
+            )
+            self._last_refresh = now
+        return self._value
+
+    @value.setter
+    def value(self, new_value: int):
+        """Persist a new interrupt value."""
+        if new_value == ScanJob.JOB_TERMINATE_ACK:
+            self._acknowledged = True
+            return
+        self._acknowledged = False
+        ScanJob.objects.filter(id=self.scan_job_id).update(interrupt=new_value)
+        self._value = new_value
+        self._last_refresh = monotonic()
+
+
+@shared_task
+def run_scan_job(scan_job_id: int) -> str | None:
+    """Start a ScanJob and dispatch each of its ScanTasks to the workers.
+
+    :returns: the job status if it could not start, None otherwise.
+    """
+    scan_job = ScanJob.objects.get(id=scan_job_id)
+    job_runner = SyncScanJobRunner(scan_job, DatabaseInterrupt(scan_job_id))
+    if job_status := job_runner.start_job():
+        return job_status
+
+    incomplete_scan_tasks = scan_job.tasks.filter(
+        status__in=[ScanTask.RUNNING, ScanTask.PENDING]
+    ).order_by("sequence_number")
+    chains: dict[int, list[int]] = {}
+    for scan_task in incomplete_scan_tasks.exclude(
+        scan_type=ScanTask.SCAN_TYPE_FINGERPRINT
+    ):
+        chains.setdefault(scan_task.source_id, []).append(scan_task.id)
+    scan_job.log_message(
+        f"Job has {incomplete_scan_tasks.count():d} remaining tasks"
+        f" in {len(chains):d} source chains"
+    )
+
+    finish = finish_scan_job.si(scan_job_id)
+    if not chains:
+        finish.delay()
+        return None
+    header = [
+        chain(*(run_scan_task.si(scan_task_id) for scan_task_id in scan_task_ids))
+        for scan_task_ids in chains.values()
+    ]
+    chord(header)(finish)
+    return None
+
+
+@shared_task
+def run_scan_task(scan_task_id: int) -> str:
+    """Run a single connect or inspect ScanTask."""
+    scan_task = ScanTask.objects.select_related("job").get(id=scan_task_id)
+    scan_job = scan_task.job
+    interrupt = DatabaseInterrupt(scan_job.id)
+    job_runner = SyncScanJobRunner(scan_job, interrupt)
+    if scan_job.status != ScanTask.RUNNING:
+        # job was interrupted or failed while this task was waiting
+        return scan_job.status
+    if interrupt_status := job_runner.check_manager_interrupt():
+        return interrupt_status
+
+    runner_class = get_task_runner_class(scan_task)
+    runner = runner_class(scan_job, scan_task)
+    try:
+        return run_task_runner(runner, interrupt)
+    finally:
+        # the next task of the chain may run on another worker, don't leave
+        # ssh masters running here until ControlPersist expires
+        close_ssh_connections(scan_job.id, scan_task.source_id)
+
+
+@shared_task
+def finish_scan_job(scan_job_id: int) -> str:
+    """Run the fingerprint task and set the final ScanJob status."""
+    scan_job = ScanJob.objects.get(id=scan_job_id)
+    job_runner = SyncScanJobRunner(scan_job, DatabaseInterrupt(scan_job_id))
+    if scan_job.status != ScanTask.RUNNING:
+        return scan_job.status
+    if interrupt_status := job_runner.check_manager_interrupt():
+        return interrupt_status
+
+    failed_tasks = list(
+        scan_job.tasks.filter(status=ScanTask.FAILED)
+        .exclude(scan_type=ScanTask.SCAN_TYPE_FINGERPRINT)
+        .order_by("sequence_number")
+    )
+    fingerprint_task = scan_job.tasks.filter(
+        scan_type=ScanTask.SCAN_TYPE_FINGERPRINT,
+        status__in=[ScanTask.RUNNING, ScanTask.PENDING],
+    ).first()
+    fingerprint_task_runner = None
+    if fingerprint_task:
+        fingerprint_task_runner = FingerprintTaskRunner(scan_job, fingerprint_task)
+    return job_runner.finish_job(failed_tasks, fingerprint_task_runner)
@@ -1,4 +1,9 @@
 """API models for import organization."""
 
-from scanner.vcenter.connect import ConnectTaskRunner
-from scanner.vcenter.inspect import InspectTaskRunner
+from scanner.get_scanner import lazy_attributes
+
+__getattr__ = lazy_attributes(
+    __name__,
+    ConnectTaskRunner="scanner.vcenter.connect",
+    InspectTaskRunner="scanner.vcenter.inspect",
+)
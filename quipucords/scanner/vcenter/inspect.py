@@ -2,16 +2,19 @@
 import logging
 from datetime import datetime
 
+from django.conf import settings
 from django.db import transaction
 from pyVmomi import vim, vmodl  # pylint: disable=no-name-in-module
 
-from api.models import RawFact, ScanTask, SystemInspectionResult
+from api.models import ScanTask, SystemInspectionResult
 from scanner.runner import ScanTaskRunner
 from scanner.vcenter.utils import (
     ClusterRawFacts,
     HostRawFacts,
     VcenterRawFacts,
     raw_facts_template,
+    retrieve_properties,
+    retrieve_property_pages,
     vcenter_connect,
 )
 
@@ -192,45 +195,44 @@ class InspectTaskRunner(ScanTaskRunner):
 
         logger.debug("system %s facts=%s", vm_name, facts)
 
-        sys_result = SystemInspectionResult(
+        SystemInspectionResult.objects.create_with_facts(
+            {key: val for key, val in facts.items() if val is not None},
             name=vm_name,
             status=SystemInspectionResult.SUCCESS,
             source=self.scan_task.source,
             task_inspection_result=self.scan_task.inspection_result,
         )
-        sys_result.save()
-
-        for key, val in facts.items():
-            if val is not None:
-                stored_fact = RawFact(
-                    name=key, value=val, system_inspection_result=sys_result
-                )
-                stored_fact.save()
 
         self.scan_task.increment_stats(vm_name, increment_sys_scanned=True)
 
     def retrieve_properties(self, content):
         """Retrieve properties from all VirtualMachines.
 
+        The topology (datacenters, folders, clusters and hosts) is retrieved
+        first. VMs are then retrieved in pages of QPC_VCENTER_PAGE_SIZE, each
+        saved before the next one is requested.
+
         :param content: ServiceInstanceContent from the vCenter connection
         """
-        spec_set = self._filter_set(content.rootFolder)
-        options = vmodl.query.PropertyCollector.RetrieveOptions()
+        _, _, host_dict = self.retrieve_topology(content)
 
-        result = content.propertyCollector.RetrievePropertiesEx(
-            specSet=spec_set, options=options
-        )
+        vm_filter_set = self._filter_set(content.rootFolder, self._vm_property_set())
+        for objects in retrieve_property_pages(
+            content, vm_filter_set, max_objects=settings.QPC_VCENTER_PAGE_SIZE
+        ):
+            with transaction.atomic():
+                for object_content in objects:
+                    if isinstance(object_content.obj, vim.VirtualMachine):
+                        self.parse_vm_props(object_content.propSet, host_dict)
 
-        objects = []
+    def retrieve_topology(self, content):
+        """Retrieve the datacenters, folders, clusters and hosts.
 
-        while result is not None:
-            token = result.token
-            objects.extend(result.objects)
-
-            if token is None:
-                break
-
-            result = content.propertyCollector.ContinueRetrievePropertiesEx(token)
+        :param content: ServiceInstanceContent from the vCenter connection
+        :returns: tuple of dictionaries of (parent, cluster, host) properties
+        """
+        filter_set = self._filter_set(content.rootFolder, self._topology_property_set())
+        objects = retrieve_properties(content, filter_set)
 
         parents_dict = {}
         for object_content in objects:
@@ -254,11 +256,7 @@ class InspectTaskRunner(ScanTaskRunner):
                 props = object_content.propSet
                 host_dict[str(obj)] = self.parse_host_props(props, cluster_dict)
 
-        for object_content in objects:
-            obj = object_content.obj
-            if isinstance(obj, vim.VirtualMachine):
-                props = object_content.propSet
-                self.parse_vm_props(props, host_dict)
+        return parents_dict, cluster_dict, host_dict
 
     def _init_stats(self):
         """Initialize the scan_task stats."""
@@ -269,8 +267,8 @@ class InspectTaskRunner(ScanTaskRunner):
             sys_count=connect_scan_task.systems_count,
         )
 
-    def _property_set(self):
-        """Define set of properties for _filter_set."""
+    def _topology_property_set(self):
+        """Define set of topology properties for _filter_set."""
         cluster_property_spec = vmodl.query.PropertyCollector.PropertySpec(
             all=False,
             type=vim.ComputeResource,
@@ -302,6 +300,17 @@ class InspectTaskRunner(ScanTaskRunner):
             ],
         )
 
+        property_set = [
+            cluster_property_spec,
+            dc_property_spec,
+            folder_property_spec,
+            host_property_spec,
+        ]
+
+        return property_set
+
+    def _vm_property_set(self):
+        """Define set of VirtualMachine properties for _filter_set."""
         vm_property_spec = vmodl.query.PropertyCollector.PropertySpec(
             all=False,
             type=vim.VirtualMachine,
@@ -319,20 +328,13 @@ class InspectTaskRunner(ScanTaskRunner):
             ],
         )
 
-        property_set = [
-            cluster_property_spec,
-            dc_property_spec,
-            folder_property_spec,
-            host_property_spec,
-            vm_property_spec,
-        ]
-
-        return property_set
+        return [vm_property_spec]
 
-    def _filter_set(self, root_folder):
+    def _filter_set(self, root_folder, property_set):
         """Create a filter set for the retrieve properties function.
 
         :param root_folder: root folder of the vcenter hierarchy
+        :param property_set: the properties to retrieve
         """
         # Create traversal set
         folder_to_child_entity = vmodl.query.PropertyCollector.TraversalSpec(
@@ -383,7 +385,7 @@ class InspectTaskRunner(ScanTaskRunner):
         # Create filter set
         filter_spec = [
             vmodl.query.PropertyCollector.FilterSpec(
-                objectSet=object_set, propSet=self._property_set()
+                objectSet=object_set, propSet=property_set
             )
         ]
 
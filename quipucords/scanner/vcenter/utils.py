@@ -54,13 +54,16 @@ def vcenter_connect(scan_task):
     return vcenter
 
 
-def retrieve_properties(content, filter_spec_set, max_objects=None):
-    """Retrieve properties from a vCenter in an efficient manner.
+def retrieve_property_pages(content, filter_spec_set, max_objects=None):
+    """Retrieve properties from a vCenter one page at a time.
+
+    Only the page being read is kept in memory. If the caller stops reading,
+    the retrieval is cancelled on the vCenter.
 
     :param content: Service content from vcenter.RetrieveContent() call
     :param max_objects: An optional maximum number of objects to return in
                         in a single page
-    :returns: Array of Object Content
+    :returns: Generator of arrays of Object Content
     """
     options = vmodl.query.PropertyCollector.RetrieveOptions(maxObjects=max_objects)
 
@@ -69,18 +72,33 @@ def retrieve_properties(content, filter_spec_set, max_objects=None):
         content.propertyCollector.ContinueRetrievePropertiesEx
     )
 
-    objects = []
-
     result = retrieve_properties_ex(specSet=filter_spec_set, options=options)
     while result is not None:
-        objects.extend(result.objects)
-
         token = result.token
+        try:
+            yield result.objects
+        except GeneratorExit:
+            if token is not None:
+                content.propertyCollector.CancelRetrievePropertiesEx(token)
+            raise
+
         if token is None:
             break
 
         result = continue_retrieve_properties_ex(token)
 
+
+def retrieve_properties(content, filter_spec_set, max_objects=None):
+    """Retrieve properties from a vCenter in an efficient manner.
+
+    :param content: Service content from vcenter.RetrieveContent() call
+    :param max_objects: An optional maximum number of objects to return in
+                        in a single page
+    :returns: Array of Object Content
+    """
+    objects = []
+    for page in retrieve_property_pages(content, filter_spec_set, max_objects):
+        objects.extend(page)
     return objects
 
 
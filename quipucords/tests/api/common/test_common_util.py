@@ -1,5 +1,6 @@
 """Test the common util."""
 
+import hashlib
 import io
 import json
 import tarfile
@@ -12,6 +13,8 @@ from api.common.common_report import (
     create_tar_buffer,
     encode_content,
     extract_tar_gz,
+    iter_json,
+    iter_tar_gz,
 )
 
 
@@ -119,6 +122,55 @@ class CommonUtilTest(TestCase):
                 extracted_content = json.loads(file.read().decode())
                 self.assertIn(extracted_content, files_data.values())
 
+    def test_iter_tar_gz(self):
+        """Test iter_tar_gz streams the same archive as create_tar_buffer."""
+        files_data = {
+            "report/test0.csv": "a,b\r\n" * 1000,
+            "report/test1.json": encode_content({"id": 1, "é": None}, "json"),
+            "report/empty": b"",
+        }
+        chunks = list(
+            iter_tar_gz(
+                [(name, [content]) for name, content in files_data.items()],
+                sha256sum_name="report/SHA256SUM",
+                spool_size=10,
+                chunk_size=100,
+            )
+        )
+        self.assertGreater(len(chunks), 1)
+        with tarfile.open(fileobj=io.BytesIO(b"".join(chunks))) as tar:
+            self.assertEqual(tar.getnames(), [*files_data, "report/SHA256SUM"])
+            contents = {name: tar.extractfile(name).read() for name in tar.getnames()}
+        for name, content in files_data.items():
+            if isinstance(content, str):
+                content = content.encode()
+            self.assertEqual(contents[name], content)
+        self.assertEqual(
+            contents["report/SHA256SUM"].decode(),
+            "".join(
+                f"{hashlib.sha256(contents[name]).hexdigest()}  {name[7:]}\n"
+                for name in files_data
+            ),
+        )
+
+    def test_iter_json(self):
+        """Test iter_json encodes iterators like lists."""
+        data = {"id": None, "list": [1], "dict": {"a": None}, "é": "\u2028"}
+        streamed = {
+            **data,
+            "sources": iter([{"name": "a", "facts": iter([{"b": 1}, None])}]),
+            "empty": iter([]),
+        }
+        expected = {
+            **data,
+            "sources": [{"name": "a", "facts": [{"b": 1}, None]}],
+            "empty": [],
+        }
+        self.assertEqual(
+            b"".join(iter_json(streamed)), encode_content(expected, "json")
+        )
+        self.assertEqual(b"".join(iter_json(data)), encode_content(data, "json"))
+
     def test_bad_param_type_create_tar_buffer(self):
         """Test passing in a non-list into create_tar_buffer."""
         json_list = [
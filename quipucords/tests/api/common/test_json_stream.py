@@ -0,0 +1,94 @@
+"""Test the incremental JSON reader."""
+
+import json
+from io import BytesIO
+
+import pytest
+from rest_framework.exceptions import ParseError
+
+from api.common.json_stream import JSONStreamReader
+
+DOCUMENT = {
+    "number": 1234567890,
+    "float": -1.5e10,
+    "literals": [True, False, None],
+    "text": 'açaí ☃ \\"quoted\\"',
+    "nested": {"list": [{"a": 1}, {"b": [2, 3]}], "empty": {}},
+    "empty_list": [],
+}
+
+
+def read_document(reader):
+    """Rebuild a top level object walking it member by member."""
+    result = {}
+    for key in reader.iter_object():
+        if reader.peek() == "[":
+            result[key] = list(reader.iter_array())
+        else:
+            result[key] = reader.read_value()
+    reader.close()
+    return result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 2**16])
+def test_read_document(chunk_size):
+    """Check documents are read correctly whatever the chunk boundaries."""
+    data = json.dumps(DOCUMENT, ensure_ascii=False, indent=2).encode("utf-8")
+    reader = JSONStreamReader(BytesIO(data), chunk_size=chunk_size)
+    assert read_document(reader) == DOCUMENT
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 5, 9, 2**16])
+def test_number_at_chunk_end(chunk_size):
+    """Check numbers split across chunks are not truncated."""
+    stream = BytesIO(b"[1234, -1.5e10, 5678]")
+    reader = JSONStreamReader(stream, chunk_size=chunk_size)
+    assert list(reader.iter_array()) == [1234, -1.5e10, 5678]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 5])
+def test_escape_at_chunk_end(chunk_size):
+    """Check escapes and literals split across chunks are decoded."""
+    data = json.dumps(DOCUMENT, ensure_ascii=True).encode("utf-8")
+    reader = JSONStreamReader(BytesIO(data), chunk_size=chunk_size)
+    assert read_document(reader) == DOCUMENT
+
+
+def test_iter_array_is_lazy():
+    """Check array items are decoded before the whole stream is read."""
+    stream = BytesIO(b'[{"a": 1}, ' + b" " * 2**20 + b"2]")
+    reader = JSONStreamReader(stream, chunk_size=16)
+    items = reader.iter_array()
+    assert next(items) == {"a": 1}
+    assert stream.tell() < 2**20
+    assert next(items) == 2
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"{",
+        b'{"a": 1',
+        b'{"a" 1}',
+        b'{"a": 1,}',
+        b"{1: 2}",
+        b'{"a": tru}',
+        b'{"a": 1} extra',
+        b'{"a": "\xff"}',
+    ],
+)
+def test_invalid_json(data):
+    """Check malformed documents raise ParseError."""
+    reader = JSONStreamReader(BytesIO(data), chunk_size=2)
+    with pytest.raises(ParseError):
+        read_document(reader)
+
+
+def test_invalid_json_fails_fast():
+    """Check invalid values raise without reading the rest of the stream."""
+    stream = BytesIO(b'[{"a": 1 2}, ' + b" " * 2**20 + b"2]")
+    reader = JSONStreamReader(stream, chunk_size=16)
+    with pytest.raises(ParseError):
+        list(reader.iter_array())
+    assert stream.tell() < 2**20
@@ -0,0 +1,65 @@
+"""Test the on disk report cache."""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from api.common import report_cache
+from api.models import DeploymentsReport, DetailsReport
+
+
+@pytest.fixture
+def report():
+    """Return an object looking like a report."""
+    return SimpleNamespace(id=1, report_platform_id=uuid.uuid4())
+
+
+def test_iter_cached(report, report_cache_dir):
+    """Check content is generated once and then read from the cache."""
+    chunks = ["a,b\r\n", "ç,d\r\n"]
+    assert list(report_cache.iter_cached(report, "test.csv", lambda: chunks)) == chunks
+    assert list(report_cache_dir.iterdir()) == [
+        report_cache_dir / f"{report.report_platform_id}-test.csv.gz"
+    ]
+
+    def _fail():
+        raise AssertionError("content should be cached")
+
+    assert (
+        "".join(report_cache.iter_cached(report, "test.csv", _fail)) == "a,b\r\nç,d\r\n"
+    )
+
+    report_cache.clear(report)
+    assert not list(report_cache_dir.iterdir())
+
+
+def test_partial_content_is_not_cached(report, report_cache_dir):
+    """Check content isn't cached if the consumer stops early."""
+    chunks = report_cache.iter_cached(report, "test.csv", lambda: ["a", "b"])
+    assert next(chunks) == "a"
+    chunks.close()
+    assert not list(report_cache_dir.iterdir())
+
+    def _generate():
+        yield "a"
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        list(report_cache.iter_cached(report, "test.csv", _generate))
+    assert not list(report_cache_dir.iterdir())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("model", [DetailsReport, DeploymentsReport])
+def test_deleted_report_cache_is_cleared(model, report_cache_dir):
+    """Check the cached content of a report is removed with the report."""
+    report = model.objects.create(report_version="1.0.0")
+    other_report = model.objects.create(report_version="1.0.0")
+    for cached_report in (report, other_report):
+        list(report_cache.iter_cached(cached_report, "test.csv", lambda: ["a"]))
+
+    model.objects.filter(pk=report.pk).delete()
+    assert list(report_cache_dir.iterdir()) == [
+        report_cache_dir / f"{other_report.report_platform_id}-test.csv.gz"
+    ]
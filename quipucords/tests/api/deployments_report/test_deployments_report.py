@@ -13,11 +13,12 @@ from api.common.common_report import create_report_version
 from api.common.report_json_gzip_renderer import ReportJsonGzipRenderer
 from api.deployments_report.csv_renderer import DeploymentCSVRenderer
 from api.deployments_report.util import sanitize_row
-from api.models import Credential, ServerInformation, Source
+from api.models import Credential, ScanJob, ScanTask, ServerInformation, Source
 from constants import DataSources
 from tests.api.details_report.test_details_report import MockRequest
 from tests.mixins import LoggedUserMixin
 from tests.utils import patch_mask_value
+from tests.utils.details_report import fingerprint_uploaded_report
 
 EXPECTED_NUMBER_OF_FINGERPRINTS = 38
 
@@ -62,16 +63,7 @@ class DeploymentReportTest(LoggedUserMixin, TestCase):
             print("Failure cause: ")
             print(response.json())
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        return response.json()
-
-    def create_details_report_expect_400(self, data):
-        """Create a source, return the response as a dict."""
-        response = self.create_details_report(data)
-        if response.status_code != status.HTTP_400_BAD_REQUEST:
-            print("Failure cause: ")
-            print(response.json())
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        return response.json()
+        return fingerprint_uploaded_report(response)
 
     def generate_fingerprints(self, os_name="RHEL", os_versions=None):
         """Create a DetailsReport for test."""
@@ -198,7 +190,12 @@ class DeploymentReportTest(LoggedUserMixin, TestCase):
             "cpu_core_count": "cat",
         }
         facts.append(fact_json)
-        self.create_details_report_expect_400(fc_json)
+        response = self.create_details_report(fc_json)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # fingerprinting fails in the background job
+        fingerprint_uploaded_report(response)
+        scan_job = ScanJob.objects.get(id=response.json()["id"])
+        self.assertEqual(scan_job.status, ScanTask.FAILED)
 
         # Query API
         response = self.client.get(url)
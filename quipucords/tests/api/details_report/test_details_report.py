@@ -9,6 +9,7 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 
+from api.common import report_cache
 from api.common.common_report import create_report_version
 from api.common.report_json_gzip_renderer import ReportJsonGzipRenderer
 from api.details_report.csv_renderer import DetailsCSVRenderer
@@ -16,6 +17,7 @@ from api.models import Credential, DetailsReport, ServerInformation, Source
 from constants import DataSources
 from tests.mixins import LoggedUserMixin
 from tests.utils import patch_mask_value
+from tests.utils.details_report import fingerprint_uploaded_report
 
 
 class MockRequest:
@@ -69,7 +71,7 @@ class DetailReportTest(LoggedUserMixin, TestCase):
             print("Failure cause: ")
             print(response.json())
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        return response.json()
+        return fingerprint_uploaded_report(response)
 
     def retrieve_expect_200(self, identifier, query_param=""):
         """Create a source, return the response as a dict."""
@@ -168,6 +170,40 @@ class DetailReportTest(LoggedUserMixin, TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_details_csv_is_streamed(self):
+        """Get details as a streamed csv, which is cached for later requests."""
+        request_json = {
+            "report_type": "details",
+            "sources": [
+                {
+                    "server_id": self.server_id,
+                    "report_version": create_report_version(),
+                    "source_name": self.net_source.name,
+                    "source_type": self.net_source.source_type,
+                    "facts": [{"uname_hostname": "foo"}, {"vm.name": "bar"}],
+                }
+            ],
+        }
+        response_json = self.create_expect_201(request_json)
+        url = f"/api/v1/reports/{response_json['report_id']}/details/"
+        expected = DetailsCSVRenderer().render(
+            copy.deepcopy(response_json),
+            renderer_context=self.mock_renderer_context,
+        )
+        details_report = DetailsReport.objects.get(report_id=response_json["report_id"])
+        report_cache.clear(details_report)
+
+        for _ in range(2):
+            response = self.client.get(url, HTTP_ACCEPT="text/csv")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.streaming)
+            self.assertEqual(b"".join(response.streaming_content).decode(), expected)
+
+        # a cleared cache is filled again
+        report_cache.clear(details_report)
+        response = self.client.get(url, HTTP_ACCEPT="text/csv")
+        self.assertEqual(b"".join(response.streaming_content).decode(), expected)
+
     ##############################################################
     # Test CSV Renderer
     ##############################################################
@@ -234,8 +270,7 @@ class DetailReportTest(LoggedUserMixin, TestCase):
 
         # Clear cache
         details_report = DetailsReport.objects.get(report_id=response_json["report_id"])
-        details_report.cached_csv = None
-        details_report.save()
+        report_cache.clear(details_report)
 
         # Test with masked data
         test_json["sources"][0]["facts"] = [
@@ -272,13 +307,11 @@ class DetailReportTest(LoggedUserMixin, TestCase):
 
         # Clear cache
         details_report = DetailsReport.objects.get(report_id=response_json["report_id"])
-        details_report.cached_csv = None
-        details_report.save()
+        report_cache.clear(details_report)
 
         # Clear cache
         details_report = DetailsReport.objects.get(report_id=response_json["report_id"])
-        details_report.cached_csv = None
-        details_report.save()
+        report_cache.clear(details_report)
 
         # Remove sources
         test_json = copy.deepcopy(response_json)
@@ -295,8 +328,7 @@ class DetailReportTest(LoggedUserMixin, TestCase):
 
         # Clear cache
         details_report = DetailsReport.objects.get(id=response_json["report_id"])
-        details_report.cached_csv = None
-        details_report.save()
+        report_cache.clear(details_report)
 
         # Remove sources
         test_json = copy.deepcopy(response_json)
@@ -313,8 +345,7 @@ class DetailReportTest(LoggedUserMixin, TestCase):
 
         # Clear cache
         details_report = DetailsReport.objects.get(report_id=response_json["report_id"])
-        details_report.cached_csv = None
-        details_report.save()
+        report_cache.clear(details_report)
 
         # Remove facts
         test_json = copy.deepcopy(response_json)
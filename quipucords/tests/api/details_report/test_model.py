@@ -0,0 +1,103 @@
+"""Test the DetailsReport models."""
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from api.models import DetailsReport, DetailsReportFacts
+
+
+def source(name, fact_count):
+    """Return a source dict with fact_count systems."""
+    return {
+        "server_id": "<ID>",
+        "report_version": "1.0",
+        "source_name": name,
+        "source_type": "network",
+        "facts": [{"name": f"{name}-{number}"} for number in range(fact_count)],
+    }
+
+
+@pytest.mark.django_db
+def test_sources_are_stored_in_chunks(settings):
+    """Check each source keeps its facts in chunks of the configured size."""
+    settings.QPC_DETAILS_REPORT_CHUNK_SIZE = 2
+    sources = [source("a", 5), source("b", 1)]
+    details_report = DetailsReport.objects.create(report_version="1.0", sources=sources)
+
+    details_report = DetailsReport.objects.get(id=details_report.id)
+    assert details_report.source_count == 2
+    assert details_report.sources == sources
+    assert [
+        len(facts)
+        for facts in DetailsReportFacts.objects.filter(
+            report_source__details_report=details_report
+        )
+        .order_by("id")
+        .values_list("facts", flat=True)
+    ] == [2, 2, 1, 1]
+
+
+@pytest.mark.django_db
+def test_iter_sources(settings, django_assert_num_queries):
+    """Check iter_sources fetches facts one chunk at a time."""
+    settings.QPC_DETAILS_REPORT_CHUNK_SIZE = 2
+    details_report = DetailsReport.objects.create(
+        report_version="1.0", sources=[source("a", 4)]
+    )
+    report_source = next(details_report.iter_sources())
+    assert report_source["source_name"] == "a"
+    facts = report_source["facts"]
+    with django_assert_num_queries(1):
+        assert next(facts) == {"name": "a-0"}
+        assert next(facts) == {"name": "a-1"}
+    assert list(facts) == [{"name": "a-2"}, {"name": "a-3"}]
+
+
+@pytest.mark.django_db
+def test_assign_sources_replaces_them():
+    """Check assigning sources to a saved report replaces the old ones."""
+    details_report = DetailsReport.objects.create(
+        report_version="1.0", sources=[source("a", 1), source("b", 1)]
+    )
+    details_report.sources = [source("c", 3)]
+    details_report.save()
+    details_report.refresh_from_db()
+    assert details_report.sources == [source("c", 3)]
+    assert DetailsReportFacts.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migrate_sources_to_chunks():
+    """Check existing reports are split in chunks and joined back."""
+    old_state = ("api", "0033_scanjob_interrupt")
+    new_state = ("api", "0035_remove_detailsreport_sources")
+    sources = [source("a", 250), source("b", 0)]
+
+    executor = MigrationExecutor(connection)
+    executor.migrate([old_state])
+    old_apps = executor.loader.project_state([old_state]).apps
+    report_id = (
+        old_apps.get_model("api", "DetailsReport")
+        .objects.create(report_version="1.0", sources=sources)
+        .id
+    )
+
+    executor = MigrationExecutor(connection)
+    executor.migrate([new_state])
+    new_apps = executor.loader.project_state([new_state]).apps
+    chunks = new_apps.get_model("api", "DetailsReportFacts").objects.filter(
+        report_source__details_report_id=report_id
+    )
+    assert [len(chunk.facts) for chunk in chunks.order_by("id")] == [100, 100, 50]
+
+    executor = MigrationExecutor(connection)
+    executor.migrate([old_state])
+    old_apps = executor.loader.project_state([old_state]).apps
+    details_report = old_apps.get_model("api", "DetailsReport").objects.get(
+        id=report_id
+    )
+    assert details_report.sources == sources
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
@@ -1,6 +1,7 @@
 """Test the fact API."""
 
 import json
+from unittest.mock import patch
 
 from django.test import TestCase
 from django.urls import reverse
@@ -8,9 +9,17 @@ from rest_framework import status
 
 from api import messages
 from api.common.common_report import create_report_version
-from api.models import Credential, DetailsReport, ServerInformation, Source
+from api.models import (
+    Credential,
+    DetailsReport,
+    ScanJob,
+    ScanTask,
+    ServerInformation,
+    Source,
+)
 from constants import DataSources
 from tests.mixins import LoggedUserMixin
+from tests.utils.details_report import fingerprint_uploaded_report
 
 
 class DetailsReportTest(LoggedUserMixin, TestCase):
@@ -62,7 +71,7 @@ class DetailsReportTest(LoggedUserMixin, TestCase):
             print("Failure cause: ")
             print(response.json())
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        return response.json()
+        return fingerprint_uploaded_report(response)
 
     ################################################################
     # Test Model Create
@@ -86,6 +95,86 @@ class DetailsReportTest(LoggedUserMixin, TestCase):
         self.assertEqual(response_json["sources"], request_json["sources"])
         self.assertEqual(DetailsReport.objects.count(), 1)
 
+    def test_create_starts_fingerprint_job(self):
+        """Check fingerprinting is left to the scan manager."""
+        request_json = {
+            "sources": [
+                {
+                    "server_id": self.server_id,
+                    "report_version": create_report_version(),
+                    "source_name": self.net_source.name,
+                    "source_type": self.net_source.source_type,
+                    "facts": [{"key": "value"}],
+                }
+            ],
+            "report_type": "details",
+        }
+        response = self.create(request_json)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response_json = response.json()
+        self.assertEqual(response_json["scan_type"], ScanTask.SCAN_TYPE_FINGERPRINT)
+        self.assertEqual(response_json["status"], ScanTask.CREATED)
+        scan_job = ScanJob.objects.get(id=response_json["id"])
+        self.assertEqual(scan_job.details_report.sources, request_json["sources"])
+        self.assertIsNone(scan_job.details_report.deployment_report)
+
+        fingerprint_uploaded_report(response)
+        scan_job.refresh_from_db()
+        self.assertEqual(scan_job.status, ScanTask.COMPLETED)
+
+    def test_create_saves_sources_as_parsed(self):
+        """Check each source is saved before the next one is parsed."""
+        sources = [
+            {
+                "server_id": self.server_id,
+                "report_version": create_report_version(),
+                "source_name": self.net_source.name,
+                "source_type": self.net_source.source_type,
+                "facts": [{"key": f"value{index}"}],
+            }
+            for index in range(3)
+        ]
+        saved_counts = []
+        original_add_source = DetailsReport.add_source
+
+        def add_source(details_report, source):
+            saved_counts.append(details_report.report_sources.count())
+            return original_add_source(details_report, source)
+
+        with patch.object(DetailsReport, "add_source", add_source):
+            response = self.create({"report_type": "details", "sources": sources})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(saved_counts, [0, 1, 2])
+        scan_job = ScanJob.objects.get(id=response.json()["id"])
+        self.assertEqual(scan_job.details_report.sources, sources)
+
+    def test_invalid_source_saves_nothing(self):
+        """Check sources saved before an invalid one are rolled back."""
+        valid_source = {
+            "server_id": self.server_id,
+            "report_version": create_report_version(),
+            "source_name": self.net_source.name,
+            "source_type": self.net_source.source_type,
+            "facts": [{"key": "value"}],
+        }
+        request_json = {
+            "report_type": "details",
+            "sources": [valid_source, {"foo": "abc"}],
+        }
+        response_json = self.create_expect_400(request_json)
+        self.assertEqual(response_json["valid_sources"], [valid_source])
+        self.assertEqual(len(response_json["invalid_sources"]), 1)
+        self.assertEqual(DetailsReport.objects.count(), 0)
+        self.assertEqual(ScanJob.objects.count(), 0)
+
+    def test_invalid_json(self):
+        """Test malformed request body."""
+        response = self.client.post(
+            reverse("reports-list"), '{"report_type": "details",', "application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ScanJob.objects.count(), 0)
+
     def test_empty_request_body(self):
         """Test empty request body."""
         request_json = {}
@@ -0,0 +1,70 @@
+"""Test SystemInspectionResult persistence helpers."""
+
+import pytest
+
+from api.models import (
+    JobInspectionResult,
+    RawFact,
+    SystemInspectionResult,
+    TaskInspectionResult,
+)
+from tests.utils.facts import random_name, random_value
+
+
+@pytest.fixture
+def facts():
+    """Return a dict of random facts."""
+    return {random_name(): random_value() for _ in range(150)}
+
+
+@pytest.fixture
+def task_inspection_result(db):
+    """Return a TaskInspectionResult instance."""
+    return TaskInspectionResult.objects.create(
+        job_inspection_result=JobInspectionResult.objects.create()
+    )
+
+
+def test_create_with_facts(facts, task_inspection_result):
+    """Check system and facts are persisted together."""
+    sys_result = SystemInspectionResult.objects.create_with_facts(
+        facts,
+        name="some-host",
+        status=SystemInspectionResult.SUCCESS,
+        task_inspection_result=task_inspection_result,
+    )
+    sys_result.refresh_from_db()
+    assert sys_result.name == "some-host"
+    assert sys_result.status == SystemInspectionResult.SUCCESS
+    assert {fact.name: fact.value for fact in sys_result.facts.all()} == facts
+
+
+def test_create_with_facts_batches_inserts(
+    facts, task_inspection_result, settings, django_assert_num_queries
+):
+    """Check RawFacts are inserted in batches of QPC_RAW_FACT_BATCH_SIZE."""
+    settings.QPC_RAW_FACT_BATCH_SIZE = 50
+    # savepoint + system insert + 3 fact batches + savepoint release
+    with django_assert_num_queries(6):
+        SystemInspectionResult.objects.create_with_facts(
+            facts,
+            name="some-host",
+            status=SystemInspectionResult.SUCCESS,
+            task_inspection_result=task_inspection_result,
+        )
+    assert RawFact.objects.count() == len(facts)
+
+
+def test_create_with_facts_is_atomic(facts, task_inspection_result, mocker):
+    """Check a failure while saving facts doesn't leave a dangling system."""
+    mocker.patch.object(
+        RawFact.objects, "bulk_create", side_effect=RuntimeError("boom")
+    )
+    with pytest.raises(RuntimeError):
+        SystemInspectionResult.objects.create_with_facts(
+            facts,
+            name="some-host",
+            status=SystemInspectionResult.SUCCESS,
+            task_inspection_result=task_inspection_result,
+        )
+    assert not SystemInspectionResult.objects.exists()
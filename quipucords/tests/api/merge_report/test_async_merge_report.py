@@ -10,10 +10,18 @@ from rest_framework import status
 
 from api import messages
 from api.common.common_report import create_report_version
-from api.models import Credential, ScanTask, ServerInformation, Source
+from api.models import (
+    Credential,
+    DetailsReport,
+    ScanJob,
+    ScanTask,
+    ServerInformation,
+    Source,
+)
 from constants import DataSources
 from tests.mixins import LoggedUserMixin
 from tests.scanner.test_util import create_scan_job
+from tests.utils.details_report import fingerprint_uploaded_report
 
 
 def dummy_start():
@@ -105,6 +113,48 @@ class AsyncMergeReports(LoggedUserMixin, TestCase):
         get_response = self.client.get(url)
         self.assertEqual(get_response.status_code, status.HTTP_200_OK)
 
+    @patch("api.merge_report.view.start_scan", side_effect=dummy_start)
+    def test_create_saves_sources(self, start_scan):
+        """Check uploaded sources are saved in the fingerprinted report."""
+        # pylint: disable=unused-argument
+        sources = [
+            {
+                "server_id": self.server_id,
+                "report_version": "1.0.0.abc",
+                "source_name": self.net_source.name,
+                "source_type": self.net_source.source_type,
+                "facts": [{"key": f"value{index}"}],
+            }
+            for index in range(2)
+        ]
+        request_json = {"report_type": "details", "sources": sources}
+
+        response_json = self.merge_details_from_source_expect_201(request_json)
+
+        details_report = ScanJob.objects.get(pk=response_json["id"]).details_report
+        self.assertEqual(details_report.report_version, "1.0.0.abc")
+        self.assertEqual(details_report.sources, sources)
+
+    def test_invalid_source_saves_nothing(self):
+        """Check sources saved before an invalid one are rolled back."""
+        request_json = {
+            "report_type": "details",
+            "sources": [
+                {
+                    "server_id": self.server_id,
+                    "report_version": create_report_version(),
+                    "source_name": self.net_source.name,
+                    "source_type": self.net_source.source_type,
+                    "facts": [{"key": "value"}],
+                },
+                {"foo": "abc"},
+            ],
+        }
+        response_json = self.merge_details_from_source_expect_400(request_json)
+        self.assertEqual(len(response_json["valid_sources"]), 1)
+        self.assertEqual(len(response_json["invalid_sources"]), 1)
+        self.assertFalse(DetailsReport.objects.exists())
+
     def test_404_if_not_fingerprint_job(self):
         """Test report job status only returns merge jobs."""
         source = Source(
@@ -427,7 +477,7 @@ class AsyncMergeReports(LoggedUserMixin, TestCase):
         response = self.client.post(url, json.dumps(request_json), "application/json")
         if response.status_code != status.HTTP_201_CREATED:
             print(response.json())
-        response_json = response.json()
+        response_json = fingerprint_uploaded_report(response)
         self.assertEqual(response_json["sources"], sources1)
         report1_id = response_json["report_id"]
 
@@ -435,7 +485,7 @@ class AsyncMergeReports(LoggedUserMixin, TestCase):
         response = self.client.post(url, json.dumps(request_json), "application/json")
         if response.status_code != status.HTTP_201_CREATED:
             print(response.json())
-        response_json = response.json()
+        response_json = fingerprint_uploaded_report(response)
         self.assertEqual(response_json["sources"], sources2)
         report2_id = response_json["report_id"]
 
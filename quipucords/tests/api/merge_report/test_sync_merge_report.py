@@ -12,6 +12,7 @@ from api.common.common_report import create_report_version
 from api.models import Credential, ServerInformation, Source
 from constants import DataSources
 from tests.mixins import LoggedUserMixin
+from tests.utils.details_report import fingerprint_uploaded_report
 
 
 class SyncMergeReports(LoggedUserMixin, TestCase):
@@ -51,7 +52,7 @@ class SyncMergeReports(LoggedUserMixin, TestCase):
             print("Failure cause: ")
             print(response.json())
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        return response.json()
+        return fingerprint_uploaded_report(response)
 
     ##############################################################
     # Test Report Merge
@@ -164,7 +165,7 @@ class SyncMergeReports(LoggedUserMixin, TestCase):
         response = self.client.post(url, json.dumps(request_json), "application/json")
         if response.status_code != status.HTTP_201_CREATED:
             print(response.json())
-        response_json = response.json()
+        response_json = fingerprint_uploaded_report(response)
         self.assertEqual(response_json["sources"], sources1)
         report1_id = response_json["report_id"]
 
@@ -172,7 +173,7 @@ class SyncMergeReports(LoggedUserMixin, TestCase):
         response = self.client.post(url, json.dumps(request_json), "application/json")
         if response.status_code != status.HTTP_201_CREATED:
             print(response.json())
-        response_json = response.json()
+        response_json = fingerprint_uploaded_report(response)
         self.assertEqual(response_json["sources"], sources2)
         report2_id = response_json["report_id"]
 
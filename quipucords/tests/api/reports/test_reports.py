@@ -5,20 +5,21 @@ import hashlib
 import json
 import sys
 import tarfile
+from io import BytesIO
 
 from django.core import management
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.serializers import ValidationError
 
+from api import messages
 from api.common.common_report import create_report_version
 from api.models import Credential, ServerInformation, Source
-from api.reports.reports_gzip_renderer import ReportsGzipRenderer
+from api.reports.reports_gzip_renderer import ReportsGzipRenderer, stream_reports_tar_gz
 from constants import DataSources
-from tests.api.details_report.test_details_report import MockRequest
 from tests.mixins import LoggedUserMixin
 from tests.utils import patch_mask_value
+from tests.utils.details_report import fingerprint_uploaded_report
 
 
 class ReportsTest(LoggedUserMixin, TestCase):
@@ -49,8 +50,6 @@ class ReportsTest(LoggedUserMixin, TestCase):
         self.report_version = create_report_version()
         self.details_json = None
         self.deployments_json = None
-        self.mock_req = MockRequest()
-        self.mock_renderer_context = {"request": self.mock_req}
 
     def tearDown(self):
         """Create test case tearDown."""
@@ -67,7 +66,7 @@ class ReportsTest(LoggedUserMixin, TestCase):
             print("Failure cause: ")
             print(response.json())
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        details_json = response.json()
+        details_json = fingerprint_uploaded_report(response)
         self.details_json = details_json
         return details_json
 
@@ -146,6 +145,15 @@ class ReportsTest(LoggedUserMixin, TestCase):
         reports_dict["deployments_json"] = self.deployments_json
         return reports_dict
 
+    def retrieve_expect_200_reports(self, query_params=""):
+        """Get the reports bundle of report 1 as a file object."""
+        response = self.client.get(
+            "/api/v1/reports/1/" + query_params,
+            HTTP_ACCEPT=ReportsGzipRenderer.media_type,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return BytesIO(b"".join(response.streaming_content))
+
     # pylint: disable=too-many-locals, too-many-branches
     def test_reports_gzip_renderer(self):
         """Get a tar.gz return for report_id via API."""
@@ -174,11 +182,7 @@ class ReportsTest(LoggedUserMixin, TestCase):
             )
         )
 
-        renderer = ReportsGzipRenderer()
-        tar_gz_result = renderer.render(
-            reports_dict, renderer_context=self.mock_renderer_context
-        )
-        self.assertNotEqual(tar_gz_result, None)
+        tar_gz_result = self.retrieve_expect_200_reports()
         with tarfile.open(fileobj=tar_gz_result) as tarball:
             self.check_tarball(deployments_csv, details_csv, tarball)
 
@@ -251,38 +255,60 @@ class ReportsTest(LoggedUserMixin, TestCase):
                 self.server_id,
             )
         )
-        renderer = ReportsGzipRenderer()
-        mock_req = MockRequest(mask_rep=True)
-        mock_renderer_context = {"request": mock_req}
-        tar_gz_result = renderer.render(
-            reports_dict, renderer_context=mock_renderer_context
-        )
-        self.assertNotEqual(tar_gz_result, None)
+        tar_gz_result = self.retrieve_expect_200_reports("?mask=True")
         with tarfile.open(fileobj=tar_gz_result) as tarball:
             self.check_tarball(deployments_csv, details_csv, tarball)
 
     def test_reports_gzip_renderer_masked_bad_req(self):
         """Get a tar.gz return for report_id via API with a bad query param."""
-        reports_dict = self.create_reports_dict(query_params="?mask=True")
-        renderer = ReportsGzipRenderer()
-        mock_req = MockRequest(mask_rep="foo")
-        mock_renderer_context = {"request": mock_req}
-        with self.assertRaises(ValidationError):
-            tar_gz_result = renderer.render(
-                reports_dict, renderer_context=mock_renderer_context
-            )
-            self.assertEqual(tar_gz_result, None)
+        self.create_reports_dict(query_params="?mask=True")
+        response = self.client.get(
+            "/api/v1/reports/1/?mask=foo", HTTP_ACCEPT=ReportsGzipRenderer.media_type
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.streaming)
+
+    def test_reports_are_streamed(self):
+        """Get the reports bundle streamed by the API."""
+        self.create_reports_dict()
+        response = self.client.get(
+            "/api/v1/reports/1/", HTTP_ACCEPT=ReportsGzipRenderer.media_type
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = BytesIO(b"".join(response.streaming_content))
+        with tarfile.open(fileobj=content) as tarball:
+            self.assertEqual(len(tarball.getnames()), 5)
+        self.check_sha256sum(content)
+
+    def test_reports_stream_error_is_logged(self):
+        """Errors while streaming the bundle are logged and raised."""
+
+        def broken_json():
+            yield "{"
+            raise OSError("no space left on device")
+
+        stream = stream_reports_tar_gz(
+            1,
+            details_json=broken_json(),
+            deployments_json=["{}"],
+            details_csv=[""],
+            deployments_csv=[""],
+        )
+        with self.assertLogs(
+            "api.reports.reports_gzip_renderer", level="ERROR"
+        ) as logs, self.assertRaises(OSError):
+            b"".join(stream)
+        self.assertIn(messages.REPORTS_TAR_ERROR, logs.output[0])
 
     def test_sha256sum(self):
         """Ensure SHA256SUM hashes are correct."""
-        reports_dict = self.create_reports_dict()
-        renderer = ReportsGzipRenderer()
-        mock_req = MockRequest(mask_rep=True)
-        mock_renderer_context = {"request": mock_req}
-        tar_gz_result = renderer.render(
-            reports_dict, renderer_context=mock_renderer_context
-        )
-        self.assertNotEqual(tar_gz_result, None)
+        self.create_reports_dict()
+        self.check_sha256sum(self.retrieve_expect_200_reports("?mask=True"))
+
+    def check_sha256sum(self, tar_gz_result):
+        """Check the SHA256SUM of a reports bundle."""
+        tar_gz_result.seek(0)
         tar = tarfile.open(fileobj=tar_gz_result)  # pylint: disable=consider-using-with
         files = tar.getmembers()
         # ignore folder name
@@ -403,6 +403,7 @@ class ScanTest(LoggedUserMixin, TestCase):
                 "jboss_ws": True,
             },
             "max_concurrency": self.concurrency,
+            "max_concurrent_sources": ScanOptions.get_default_concurrent_sources(),
             "enabled_extended_product_search": {
                 "jboss_eap": False,
                 "jboss_fuse": False,
@@ -481,6 +482,7 @@ class ScanTest(LoggedUserMixin, TestCase):
         response_json = response.json()
         options = {
             "max_concurrency": self.concurrency,
+            "max_concurrent_sources": ScanOptions.get_default_concurrent_sources(),
             "enabled_extended_product_search": {
                 "jboss_eap": False,
                 "jboss_fuse": False,
@@ -527,6 +529,7 @@ class ScanTest(LoggedUserMixin, TestCase):
         response_json = response.json()
         options = {
             "max_concurrency": self.concurrency,
+            "max_concurrent_sources": ScanOptions.get_default_concurrent_sources(),
             "enabled_extended_product_search": {
                 "jboss_eap": False,
                 "jboss_fuse": False,
@@ -551,6 +554,7 @@ class ScanTest(LoggedUserMixin, TestCase):
         response_json = response.json()
         options = {
             "max_concurrency": 40,
+            "max_concurrent_sources": ScanOptions.get_default_concurrent_sources(),
             "enabled_extended_product_search": {
                 "jboss_eap": False,
                 "jboss_fuse": False,
@@ -564,6 +568,21 @@ class ScanTest(LoggedUserMixin, TestCase):
         self.assertEqual(response_json.get("options"), options)
         self.assertEqual(response_json.get("scan_type"), ScanTask.SCAN_TYPE_CONNECT)
 
+    def test_partial_update_max_concurrent_sources(self):
+        """Test partial update of the number of concurrent sources."""
+        data_discovery = {"name": "test", "sources": [self.source.id]}
+        initial = self.create_expect_201(data_discovery)
+        url = reverse("scan-detail", args=(initial["id"],))
+        data = {"options": {"max_concurrent_sources": 4}}
+        response = self.client.patch(
+            url, json.dumps(data), content_type="application/json", format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json().get("options"),
+            {"max_concurrency": self.concurrency, "max_concurrent_sources": 4},
+        )
+
     def test_expand_scan(self):
         """Test view expand_scan."""
         scan_job, scan_task = create_scan_job(
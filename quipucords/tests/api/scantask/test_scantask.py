@@ -1,13 +1,15 @@
 """Test the API application."""
 
+import threading
 from datetime import datetime
 from unittest.mock import patch
 
 from django.core import management
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from api import messages
 from api.models import Credential, Scan, ScanJob, ScanTask, Source
+from api.scantask.stats import ScanTaskStatsBuffer
 from api.serializers import ScanTaskSerializer
 
 
@@ -223,6 +225,62 @@ class ScanTaskTest(TestCase):
         self.assertEqual(2, task_instance_a.systems_count)
         self.assertEqual(2, task_instance_b.systems_count)
 
+    @override_settings(QPC_SCAN_STATS_FLUSH_COUNT=3, QPC_SCAN_STATS_FLUSH_INTERVAL=3600)
+    def test_scantask_buffered_stats(self):
+        """Test stats increments are saved in batches."""
+        task = ScanTask.objects.create(
+            job=self.scan_job,
+            source=self.source,
+            scan_type=ScanTask.SCAN_TYPE_CONNECT,
+            status=ScanTask.PENDING,
+        )
+        saved_task = ScanTask.objects.get(id=task.id)
+        with patch.object(task, "log_message") as log_message:
+            with task.buffered_stats():
+                task.increment_stats("foo", increment_sys_scanned=True)
+                task.increment_stats("bar", increment_sys_failed=True)
+                saved_task.refresh_from_db()
+                self.assertEqual(0, saved_task.systems_scanned)
+                task.increment_stats("baz", increment_sys_unreachable=2)
+                saved_task.refresh_from_db()
+                self.assertEqual(1, saved_task.systems_scanned)
+                self.assertEqual(1, saved_task.systems_failed)
+                self.assertEqual(2, saved_task.systems_unreachable)
+                self.assertEqual(1, log_message.call_count)
+
+                task.increment_stats("foo", increment_sys_scanned=True)
+                # absolute updates include the buffered increments
+                task.update_stats("counted", sys_count=10)
+                self.assertEqual(2, task.systems_scanned)
+                task.increment_stats("foo", increment_sys_scanned=True)
+        saved_task.refresh_from_db()
+        self.assertEqual(10, saved_task.systems_count)
+        self.assertEqual(3, saved_task.systems_scanned)
+        self.assertEqual(3, task.systems_scanned)
+        first_log = log_message.call_args_list[0].args[0]
+        self.assertTrue(first_log.startswith("PROCESSING baz (+2 more)."))
+
+    def test_scantask_buffered_stats_timer(self):
+        """Test buffered stats are saved after the flush interval."""
+        task = ScanTask.objects.create(
+            job=self.scan_job,
+            source=self.source,
+            scan_type=ScanTask.SCAN_TYPE_CONNECT,
+            status=ScanTask.PENDING,
+        )
+        saved = threading.Event()
+        stats_buffer = ScanTaskStatsBuffer(task, 100, 0.01)
+        with patch.object(
+            task, "save_stats", side_effect=lambda *_: saved.set()
+        ) as save_stats:
+            stats_buffer.start()
+            # counters are updated in memory before they are saved
+            stats_buffer.add("foo", {"systems_scanned": 1})
+            self.assertEqual(1, task.systems_scanned)
+            self.assertTrue(saved.wait(5))
+            stats_buffer.stop()
+        self.assertEqual({"systems_scanned": 1}, save_stats.call_args_list[0].args[0])
+
     def test_scantask_reset_stats(self):
         """Test scan task reset stat feature."""
         task = ScanTask.objects.create(
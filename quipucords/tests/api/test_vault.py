@@ -1,5 +1,7 @@
 """Test the API application."""
 
+from unittest import mock
+
 import yaml
 from django.test import TestCase
 
@@ -21,6 +23,35 @@ class VaultTest(TestCase):
         decrypted = vault.decrypt_data_as_unicode(encrypted)
         self.assertEqual(raw, decrypted)
 
+    def test_vault_is_reused(self):
+        """Test a single Vault is created for SECRET_KEY."""
+        vault.encrypt_data_as_unicode("data")
+        with mock.patch.object(vault, "Vault") as vault_class:
+            encrypted = vault.encrypt_data_as_unicode("data")
+            vault.decrypt_data_as_unicode(encrypted)
+        vault_class.assert_not_called()
+
+    def test_decrypted_data_cache(self):
+        """Test data is decrypted once while decrypted_data_cache is active."""
+        encrypted = vault.encrypt_data_as_unicode("password")
+        other_encrypted = vault.encrypt_data_as_unicode("password")
+        self.assertNotEqual(encrypted, other_encrypted)
+        with mock.patch.object(
+            vault.Vault, "load", autospec=True, side_effect=vault.Vault.load
+        ) as load:
+            with vault.decrypted_data_cache():
+                for _ in range(3):
+                    self.assertEqual(
+                        vault.decrypt_data_as_unicode(encrypted), "password"
+                    )
+                with vault.decrypted_data_cache():
+                    vault.decrypt_data_as_unicode(encrypted)
+                vault.decrypt_data_as_unicode(other_encrypted)
+                self.assertEqual(load.call_count, 2)
+            # the cache is gone once the context exits
+            vault.decrypt_data_as_unicode(encrypted)
+            self.assertEqual(load.call_count, 3)
+
     def test_dump_yaml(self):
         """Test the writing of dictionary data to a yaml file encrypted."""
         data = {
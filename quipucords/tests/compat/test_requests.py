@@ -49,3 +49,24 @@ def test_automatic_retry():
     qpc_resp = session.get("http://some.url/")
     assert qpc_resp.ok
     assert qpc_resp.json() == {"message": "ok"}
+
+
+@httpretty.activate
+def test_retry_returns_last_response():
+    """Test the last response is returned if retries are not raised."""
+    httpretty.register_uri(
+        httpretty.GET,
+        "http://some.url/",
+        responses=[httpretty.Response("SERVICE UNAVAILABLE", status=503)] * 3,
+    )
+    session = Session(max_retries=2, backoff_factor=0.001, raise_on_status=False)
+    response = session.get("http://some.url/")
+    assert response.status_code == 503
+    assert len(httpretty.latest_requests()) == 3
+
+
+def test_pool_maxsize():
+    """Test keep-alive pool size of the session adapters."""
+    session = Session(max_retries=0, pool_maxsize=7)
+    adapter = session.get_adapter("https://some.url/")
+    assert adapter._pool_maxsize == 7  # pylint: disable=protected-access
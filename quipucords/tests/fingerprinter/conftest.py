@@ -0,0 +1,27 @@
+"""Common fixtures for fingerprinter tests."""
+
+import pytest
+
+from api.models import ScanJob, ScanTask
+from fingerprinter.runner import FingerprintTaskRunner
+
+
+@pytest.fixture
+def task_runner(mocker):
+    """Return a FingerprintTaskRunner with mocked job and task."""
+    return FingerprintTaskRunner(
+        scan_job=mocker.MagicMock(spec=ScanJob),
+        scan_task=mocker.MagicMock(spec=ScanTask),
+    )
+
+
+def fingerprint(source_type, **facts):
+    """Return a minimal fingerprint for source_type with the given facts."""
+    return {
+        **facts,
+        "metadata": {
+            fact_name: {"source_type": source_type, "has_sudo": True}
+            for fact_name in facts
+        },
+        "sources": {source_type: {"source_type": source_type}},
+    }
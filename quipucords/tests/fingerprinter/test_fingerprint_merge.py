@@ -0,0 +1,171 @@
+"""Test FingerprintTaskRunner fingerprint deduplication and merging."""
+
+import logging
+import time
+import tracemalloc
+
+import pytest
+
+from constants import DataSources
+from fingerprinter.runner import (
+    NETWORK_IDENTIFICATION_KEYS,
+    NETWORK_SATELLITE_MERGE_KEYS,
+    NETWORK_VCENTER_MERGE_KEYS,
+    SATELLITE_IDENTIFICATION_KEYS,
+    VCENTER_IDENTIFICATION_KEYS,
+)
+from tests.fingerprinter.conftest import fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def test_remove_duplicates_across_keys(task_runner):
+    """Check duplicates are grouped transitively across all id keys."""
+    first = fingerprint(DataSources.NETWORK, subscription_manager_id="1", name="a")
+    second = fingerprint(
+        DataSources.NETWORK, subscription_manager_id="1", bios_uuid="x", name="b"
+    )
+    third = fingerprint(DataSources.NETWORK, bios_uuid="x", cpu_count=2)
+    other = fingerprint(DataSources.NETWORK, bios_uuid="y")
+    result = task_runner._remove_duplicate_fingerprints(
+        NETWORK_IDENTIFICATION_KEYS, [first, second, third, other]
+    )
+    assert result == [first, other]
+    # merged in place, earlier fingerprints have precedence
+    assert first["name"] == "a"
+    assert first["bios_uuid"] == "x"
+    assert first["cpu_count"] == 2
+
+
+def test_merge_candidate_matching_several_bases(task_runner):
+    """Check a candidate is merged only into the first base it matches."""
+    base_a = fingerprint(DataSources.NETWORK, mac_addresses=["1"])
+    base_b = fingerprint(DataSources.NETWORK, mac_addresses=["2"])
+    candidate = fingerprint(
+        DataSources.SATELLITE, mac_addresses=["1", "2"], cpu_count=4
+    )
+    number_merged, result = task_runner._merge_fingerprints_from_source_types(
+        NETWORK_SATELLITE_MERGE_KEYS, [base_a, base_b], [candidate]
+    )
+    assert number_merged == 1
+    assert result == [base_a, base_b]
+    assert base_a["cpu_count"] == 4
+    assert "cpu_count" not in base_b
+
+
+def test_merge_keeps_bases_with_duplicate_values(task_runner):
+    """Check base fingerprints sharing every key value are not dropped."""
+    base_a = fingerprint(DataSources.NETWORK, mac_addresses=["1"])
+    base_b = fingerprint(DataSources.NETWORK, mac_addresses=["1"])
+    candidate = fingerprint(DataSources.VCENTER, mac_addresses=["1"])
+    number_merged, result = task_runner._merge_fingerprints_from_source_types(
+        NETWORK_VCENTER_MERGE_KEYS, [base_a, base_b], [candidate]
+    )
+    assert number_merged == 1
+    assert result == [base_a, base_b]
+    assert DataSources.VCENTER in base_a["sources"]
+
+
+def test_merge_uses_values_merged_by_previous_keys(task_runner):
+    """Check facts merged for one key are used to match the next keys."""
+    base = fingerprint(DataSources.NETWORK, subscription_manager_id="1")
+    by_id = fingerprint(
+        DataSources.SATELLITE, subscription_manager_id="1", mac_addresses=["a"]
+    )
+    by_mac = fingerprint(DataSources.SATELLITE, mac_addresses=["a"], cpu_count=1)
+    number_merged, result = task_runner._merge_fingerprints_from_source_types(
+        NETWORK_SATELLITE_MERGE_KEYS, [base], [by_id, by_mac]
+    )
+    assert number_merged == 2
+    assert result == [base]
+    assert base["cpu_count"] == 1
+
+
+def synthetic_fingerprints(system_count):
+    """Return network, satellite and vcenter fingerprints for system_count hosts.
+
+    Every system is seen by network and vcenter, half of them by satellite, and
+    one in ten network fingerprints is scanned twice.
+    """
+    network, satellite, vcenter = [], [], []
+    for number in range(system_count):
+        facts = {
+            "name": f"host-{number}",
+            "bios_uuid": f"uuid-{number}",
+            "subscription_manager_id": f"sm-{number}",
+            "mac_addresses": [f"mac-{number}-0", f"mac-{number}-1"],
+            "cpu_count": number % 16,
+            "os_release": "Red Hat Enterprise Linux 9",
+            "products": [{"name": "JBoss EAP", "presence": "absent"}],
+            "entitlements": [],
+        }
+        network.append(fingerprint(DataSources.NETWORK, **facts))
+        if number % 10 == 0:
+            network.append(fingerprint(DataSources.NETWORK, **facts))
+        if number % 2 == 0:
+            satellite.append(
+                fingerprint(
+                    DataSources.SATELLITE,
+                    subscription_manager_id=f"sm-{number}",
+                    mac_addresses=[f"mac-{number}-0"],
+                    entitlements=[{"name": "RHEL"}],
+                )
+            )
+        vcenter.append(
+            fingerprint(
+                DataSources.VCENTER,
+                vm_uuid=f"uuid-{number}",
+                mac_addresses=[f"mac-{number}-1"],
+                vm_state="powered on",
+                cpu_count=number % 16,
+                infrastructure_type="virtualized",
+            )
+        )
+    return network, satellite, vcenter
+
+
+def deduplicate_and_merge(task_runner, network, satellite, vcenter):
+    """Run the same deduplication and merge steps as _process_sources."""
+    network = task_runner._remove_duplicate_fingerprints(
+        NETWORK_IDENTIFICATION_KEYS, network
+    )
+    satellite = task_runner._remove_duplicate_fingerprints(
+        SATELLITE_IDENTIFICATION_KEYS, satellite
+    )
+    vcenter = task_runner._remove_duplicate_fingerprints(
+        VCENTER_IDENTIFICATION_KEYS, vcenter
+    )
+    _, combined = task_runner._merge_fingerprints_from_source_types(
+        NETWORK_SATELLITE_MERGE_KEYS, network, satellite
+    )
+    _, combined = task_runner._merge_fingerprints_from_source_types(
+        NETWORK_VCENTER_MERGE_KEYS,
+        combined,
+        vcenter,
+        reverse_priority_keys={"cpu_count", "infrastructure_type"},
+    )
+    return combined
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("system_count", [10_000, 50_000, 100_000])
+def test_merge_benchmark(task_runner, system_count, record_property):
+    """Measure deduplication/merge time and peak memory for many systems."""
+    fingerprints = synthetic_fingerprints(system_count)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    combined = deduplicate_and_merge(task_runner, *fingerprints)
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    record_property("elapsed_seconds", elapsed)
+    record_property("peak_memory_bytes", peak_memory)
+    logger.warning(
+        "Merged %d systems in %.2fs, peak memory %.1f MiB",
+        system_count,
+        elapsed,
+        peak_memory / 2**20,
+    )
+    assert len(combined) == system_count
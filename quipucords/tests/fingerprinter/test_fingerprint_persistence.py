@@ -0,0 +1,124 @@
+"""Test FingerprintTaskRunner fingerprint persistence."""
+
+import pytest
+from django.db import DataError
+
+from api.common import report_cache
+from api.deployments_report.serializer import (
+    SystemFingerprintListSerializer,
+    SystemFingerprintSerializer,
+)
+from api.models import DeploymentsReport, DetailsReport, ScanTask, SystemFingerprint
+from constants import DataSources
+from tests.fingerprinter.conftest import fingerprint
+
+
+@pytest.fixture
+def deployment_report(db):
+    """Return a saved DeploymentsReport."""
+    return DeploymentsReport.objects.create(report_version="1.0")
+
+
+def host_fingerprint(number, **facts):
+    """Return a fingerprint ready to be saved, with a product and an entitlement."""
+    host = fingerprint(DataSources.NETWORK, name=f"host-{number}", **facts)
+    host["sources"] = list(host["sources"].values())
+    host["products"] = [{"name": "JBoss EAP", "presence": "absent", "metadata": {}}]
+    host["entitlements"] = [{"name": "RHEL", "metadata": {}}]
+    return host
+
+
+def test_save_fingerprints(task_runner, deployment_report, settings):
+    """Check fingerprints and related rows are created in bulk."""
+    settings.QPC_FINGERPRINT_BATCH_SIZE = 100
+    fingerprints = [host_fingerprint(number) for number in range(50)]
+    saved_fingerprints, number_invalid = task_runner._save_fingerprints(
+        deployment_report, fingerprints
+    )
+    assert number_invalid == 0
+    assert saved_fingerprints == fingerprints
+    assert {fp["id"] for fp in saved_fingerprints} == set(
+        SystemFingerprint.objects.values_list("id", flat=True)
+    )
+    fingerprint_model = SystemFingerprint.objects.get(name="host-0")
+    assert fingerprint_model.deployment_report == deployment_report
+    assert fingerprint_model.products.get().name == "JBoss EAP"
+    assert fingerprint_model.entitlements.get().name == "RHEL"
+
+
+def test_save_fingerprints_queries(
+    task_runner, deployment_report, settings, django_assert_max_num_queries
+):
+    """Check the number of queries doesn't grow with the number of fingerprints."""
+    settings.QPC_FINGERPRINT_BATCH_SIZE = 500
+    fingerprints = [host_fingerprint(number) for number in range(200)]
+    # a handful of INSERTs per table (sqlite caps the number of query params)
+    # instead of several queries per fingerprint
+    with django_assert_max_num_queries(20):
+        task_runner._save_fingerprints(deployment_report, fingerprints)
+    assert SystemFingerprint.objects.count() == 200
+
+
+def test_save_fingerprints_invalid(task_runner, deployment_report):
+    """Check invalid fingerprints are reported without losing valid ones."""
+    fingerprints = [
+        host_fingerprint(0),
+        host_fingerprint(1, cpu_count=-1),
+        host_fingerprint(2),
+    ]
+    saved_fingerprints, number_invalid = task_runner._save_fingerprints(
+        deployment_report, fingerprints
+    )
+    assert number_invalid == 1
+    assert [fp["name"] for fp in saved_fingerprints] == ["host-0", "host-2"]
+    assert set(SystemFingerprint.objects.values_list("name", flat=True)) == {
+        "host-0",
+        "host-2",
+    }
+    error_messages = [
+        call.args[0] for call in task_runner.scan_task.log_message.call_args_list
+    ]
+    assert any("cpu_count" in message for message in error_messages)
+
+
+def test_save_fingerprints_data_error(task_runner, deployment_report, mocker):
+    """Check a fingerprint the database rejects doesn't fail the whole batch."""
+    mocker.patch.object(
+        SystemFingerprintListSerializer, "create", side_effect=DataError
+    )
+    create = SystemFingerprintSerializer.create
+
+    def _create(serializer, validated_data):
+        if validated_data["name"] == "host-1":
+            raise DataError("value too long")
+        return create(serializer, validated_data)
+
+    mocker.patch.object(
+        SystemFingerprintSerializer, "create", side_effect=_create, autospec=True
+    )
+    saved_fingerprints, number_invalid = task_runner._save_fingerprints(
+        deployment_report, [host_fingerprint(number) for number in range(3)]
+    )
+    assert number_invalid == 1
+    assert [fp["name"] for fp in saved_fingerprints] == ["host-0", "host-2"]
+    assert SystemFingerprint.objects.count() == 2
+
+
+def test_fingerprint_again_clears_report_cache(
+    task_runner, deployment_report, mocker, report_cache_dir
+):
+    """Check reports rendered before fingerprinting again are removed."""
+    details_report = DetailsReport.objects.create(
+        report_version="1.0", deployment_report=deployment_report
+    )
+    for report in (details_report, deployment_report):
+        list(report_cache.iter_cached(report, "test.csv", lambda: ["a"]))
+    task_runner.scan_task.details_report = details_report
+    mocker.patch.object(
+        task_runner,
+        "_process_details_report",
+        return_value=(None, ScanTask.COMPLETED),
+    )
+    task_runner.execute_task(None)
+    assert details_report.deployment_report != deployment_report
+    assert not list(report_cache_dir.iterdir())
@@ -12,18 +12,18 @@ logger = logging.getLogger(__file__)
 
 
 @pytest.fixture
-def details_report(mocker):
-    """Details report patched to contain all possible source types."""
-    report = mocker.MagicMock(spec=DetailsReport)
-    report.sources = [
-        {
-            "source_type": source_type,
-            "source_name": source_type,
-            "server_id": "<ID>",
-        }
-        for source_type in DataSources.values
-    ]
-    return report
+def details_report():
+    """Unsaved details report containing all possible source types."""
+    return DetailsReport(
+        sources=[
+            {
+                "source_type": source_type,
+                "source_name": source_type,
+                "server_id": "<ID>",
+            }
+            for source_type in DataSources.values
+        ]
+    )
 
 
 @pytest.fixture
@@ -13,7 +13,6 @@ from api.models import DeploymentsReport, DetailsReport, ServerInformation, Sour
 from constants import DataSources
 from fingerprinter.constants import ENTITLEMENTS_KEY, META_DATA_KEY, PRODUCTS_KEY
 from fingerprinter.runner import (
-    FINGERPRINT_GLOBAL_ID_KEY,
     NETWORK_SATELLITE_MERGE_KEYS,
     NETWORK_VCENTER_MERGE_KEYS,
     FingerprintTaskRunner,
@@ -1023,37 +1022,26 @@ class EngineTest(TestCase):
 
         self.assertEqual(len(no_key_found), 1)
         self.assertEqual(no_key_found[0]["id"], 3)
-        self.assertIsNotNone(no_key_found[0].get(FINGERPRINT_GLOBAL_ID_KEY))
         self.assertEqual(len(index.keys()), 4)
         self.assertIsNotNone(index.get("1234"))
         self.assertIsNotNone(index.get("2345"))
         self.assertIsNotNone(index.get("9876"))
         self.assertIsNotNone(index.get("8765"))
 
-        # deplicate but leave unique key
-        leave_key_list = list(index.values())
+        # each fingerprint is indexed once per mac address
         unique_list = self.fp_task_runner._remove_duplicate_fingerprints(
-            [FINGERPRINT_GLOBAL_ID_KEY], leave_key_list
+            ["mac_addresses"], list(index.values())
         )
         self.assertEqual(len(unique_list), 2)
-        self.assertIsNotNone(unique_list[0].get(FINGERPRINT_GLOBAL_ID_KEY))
 
         # same test, but add value that doesn't have key
         leave_key_list = list(index.values())
         leave_key_list.append({"id": 3, "os_release": "RHEL 6"})
         unique_list = self.fp_task_runner._remove_duplicate_fingerprints(
-            [FINGERPRINT_GLOBAL_ID_KEY], leave_key_list
+            ["mac_addresses"], leave_key_list
         )
         self.assertEqual(len(unique_list), 3)
 
-        # now pass flag to strip id key
-        remove_key_list = list(index.values())
-        unique_list = self.fp_task_runner._remove_duplicate_fingerprints(
-            [FINGERPRINT_GLOBAL_ID_KEY], remove_key_list, True
-        )
-        self.assertEqual(len(unique_list), 2)
-        self.assertIsNone(unique_list[0].get(FINGERPRINT_GLOBAL_ID_KEY))
-
     def test_create_index_for_fingerprints(self):
         """Test create index for fingerprints."""
         fingerprints = [
@@ -1061,24 +1049,15 @@ class EngineTest(TestCase):
             {"id": 2, "os_release": "RHEL 7", "bios_uuid": "2345"},
             {"id": 3, "os_release": "RHEL 6"},
         ]
-
-        # Test that unique id not in objects
-        index, no_key_found = self.fp_task_runner._create_index_for_fingerprints(
-            "bios_uuid", fingerprints, False
-        )
-        self.assertIsNone(no_key_found[0].get(FINGERPRINT_GLOBAL_ID_KEY))
-
-        # Tests with unique id in objects
         index, no_key_found = self.fp_task_runner._create_index_for_fingerprints(
             "bios_uuid", fingerprints
         )
 
         self.assertEqual(len(no_key_found), 1)
         self.assertEqual(no_key_found[0]["id"], 3)
-        self.assertIsNotNone(no_key_found[0].get(FINGERPRINT_GLOBAL_ID_KEY))
         self.assertEqual(len(index.keys()), 2)
-        self.assertIsNotNone(index.get("1234"))
-        self.assertIsNotNone(index.get("2345"))
+        self.assertIs(index.get("1234"), fingerprints[0])
+        self.assertIs(index.get("2345"), fingerprints[1])
 
     def test_merge_fingerprint(self):
         """Test merging a vcenter and network fingerprint."""
@@ -1430,7 +1409,11 @@ class EngineTest(TestCase):
             return_value=[fact_collection],
         ):
             with patch(
-                "fingerprinter.runner.SystemFingerprintSerializer.save",
+                "api.deployments_report.serializer.SystemFingerprintListSerializer"
+                ".create",
+                side_effect=DataError,
+            ), patch(
+                "fingerprinter.runner.SystemFingerprintSerializer.create",
                 side_effect=DataError,
             ):
                 status_message, status = self.fp_task_runner._process_details_report(
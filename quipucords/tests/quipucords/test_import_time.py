@@ -0,0 +1,85 @@
+"""Test the modules imported when the server starts."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+
+# what gunicorn workers and management commands import
+BOOT_SCRIPT = """
+import django
+django.setup()
+import quipucords.urls
+import scanner.manager
+"""
+
+# libraries only needed once a scan of some source type runs
+SCAN_LIBRARIES = {
+    "ansible",
+    "ansible_runner",
+    "kubernetes",
+    "openshift",
+    "pyVim",
+    "pyVmomi",
+}
+SCANNERS = ["ansible", "network", "openshift", "satellite", "vcenter"]
+
+
+def import_times(script):
+    """Run script with -X importtime.
+
+    :returns: dict mapping each imported module to its cumulative import
+        time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        check=True,
+        cwd=settings.BASE_DIR,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "quipucords.settings"},
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture(scope="module")
+def boot_import_times():
+    """Return the import times of the modules loaded at server startup."""
+    return import_times(BOOT_SCRIPT)
+
+
+def test_boot_imports_no_scan_libraries(boot_import_times):
+    """Test ansible, pyVmomi and the openshift client are imported lazily."""
+    assert "api.models" in boot_import_times
+    scan_libraries = {
+        module: time
+        for module, time in boot_import_times.items()
+        if module.split(".")[0] in SCAN_LIBRARIES
+    }
+    assert not scan_libraries
+
+
+@pytest.mark.parametrize("scanner", SCANNERS)
+def test_boot_imports_no_scanner_runners(boot_import_times, scanner):
+    """Test scanner task runners are imported when a scan runs."""
+    assert f"scanner.{scanner}.connect" not in boot_import_times
+    assert f"scanner.{scanner}.inspect" not in boot_import_times
+
+
+@pytest.mark.parametrize("scanner", SCANNERS)
+def test_scanner_runners_import(scanner):
+    """Test the task runners of scanner packages can be imported."""
+    times = import_times(
+        "import django; django.setup();"
+        f" from scanner.{scanner} import ConnectTaskRunner, InspectTaskRunner"
+    )
+    assert f"scanner.{scanner}.connect" in times
@@ -0,0 +1,98 @@
+"""Test the single session collector of network inspection."""
+
+import importlib.util
+import subprocess
+
+import pytest
+
+from api.models import ScanOptions
+from scanner.network import collector
+
+
+@pytest.fixture
+def qpc_collect():
+    """Load the qpc_collect action plugin module."""
+    path = collector.RUNNER_PATH / "action_plugins/qpc_collect.py"
+    spec = importlib.util.spec_from_file_location("qpc_collect", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def extra_vars():
+    """Return the default extra vars of an inspect run."""
+    return dict(
+        ScanOptions.get_default_extra_vars(),
+        search_directories="/opt /app",
+    )
+
+
+@pytest.mark.parametrize(
+    "condition,expected",
+    [
+        (None, True),
+        ("user_has_sudo", True),
+        ("user_has_sudo and internal_have_locate", True),
+        ("user_has_sudo and jboss_eap", True),
+        ("user_has_sudo and jboss_eap_ext", False),
+        ("not user_has_sudo", False),
+        (["internal_have_rpm", "jboss_ws"], True),
+        (["internal_have_rpm", "jboss_ws_ext"], False),
+        ("jws_home is defined and jboss_ws", False),
+        ("internal_have_locate_cmd.get('rc') == 0", False),
+        ('etc_release_name == ""', False),
+    ],
+)
+def test_should_collect(condition, expected, extra_vars):
+    """Check only commands known to run are collected."""
+    assert collector.should_collect(condition, extra_vars) is expected
+
+
+def test_render_command(extra_vars):
+    """Check extra vars are rendered and facts are not."""
+    assert (
+        collector.render_command("find {{search_directories}} -xdev", extra_vars)
+        == "find /opt /app -xdev"
+    )
+    assert collector.render_command("ls -1 '{{ item }}'", extra_vars) is None
+    assert collector.render_command("cat {{ a | b }}", extra_vars) is None
+    assert collector.render_command("uname -a", extra_vars) == "uname -a"
+
+
+def test_collector_commands(extra_vars):
+    """Check which commands of the inspect roles are collected."""
+    commands, become_commands = collector.collector_commands(extra_vars)
+    assert "uname -s" in commands
+    assert "last -25" in become_commands
+    assert not any("{{" in command for command in commands + become_commands)
+    # extended product search is disabled by default
+    assert not any("find /opt /app" in command for command in become_commands)
+
+    extra_vars[ScanOptions.JBOSS_EAP_EXT] = True
+    _, become_commands = collector.collector_commands(extra_vars)
+    assert any("find /opt /app" in command for command in become_commands)
+
+
+def test_collect_script(qpc_collect):
+    """Check the output of each command is split from the script output."""
+    commands = [
+        "echo one; echo two",
+        "printf no-newline",
+        "echo error >&2; exit 3",
+        "true # a comment",
+        "",
+    ]
+    boundary = "__qpc_test"
+    script = qpc_collect.build_script(commands, boundary)
+    output = subprocess.run(
+        ["/bin/sh", "-c", script], capture_output=True, check=True, text=True
+    ).stdout
+    collected = qpc_collect.parse_output(output, commands, boundary)
+    assert collected["echo one; echo two"]["stdout_lines"] == ["one", "two"]
+    assert collected["echo one; echo two"]["rc"] == 0
+    assert collected["printf no-newline"]["stdout"] == "no-newline"
+    assert collected["echo error >&2; exit 3"]["stdout"] == "error\n"
+    assert collected["echo error >&2; exit 3"]["rc"] == 3
+    assert collected["true # a comment"]["stdout"] == ""
+    assert collected[""]["rc"] == 0
@@ -0,0 +1,97 @@
+"""Test the HostSet used by network scans."""
+
+from itertools import islice
+
+import pytest
+
+from scanner.network.host_set import HostSet
+from scanner.network.utils import expand_hostpattern, iter_inventories
+
+
+def expanded_hosts(patterns, exclude_patterns=()):
+    """Expand patterns the way HostSet is expected to represent them."""
+    hosts = {host for pattern in patterns for host in expand_hostpattern(pattern)}
+    excluded = {
+        host for pattern in exclude_patterns for host in expand_hostpattern(pattern)
+    }
+    return hosts - excluded
+
+
+@pytest.mark.parametrize(
+    "patterns,exclude_patterns",
+    [
+        (["1.2.3.4"], []),
+        (["1.2.3.4", "1.2.3.5"], ["1.2.3.5", "1.2.3.6"]),
+        (["1.2.3.[0:255]", "1.2.4.[0:255]"], ["1.2.3.[10:20]", "1.2.4.255"]),
+        (["10.0.[0:3].[0:255]"], ["10.0.[1:2].[0:255]", "10.0.0.[0:127]"]),
+        (["192.168.[0:10:3].[1:2]"], ["192.168.3.1"]),
+        (["1.2.3.[254:255]", "1.2.4.[0:1]"], []),
+        (["host[1:3].example.com", "1.2.3.4"], ["host2.example.com"]),
+        (["1.2.3.04", "1.2.3.[01:03]"], ["1.2.3.2"]),
+    ],
+)
+def test_from_patterns(patterns, exclude_patterns):
+    """Check a HostSet has the same hosts as the expanded patterns."""
+    expected = expanded_hosts(patterns, exclude_patterns)
+    host_set = HostSet.from_patterns(patterns, exclude_patterns)
+    assert len(host_set) == len(expected)
+    assert sorted(host_set) == sorted(expected)
+    for host in expected:
+        assert host in host_set
+
+
+def test_large_range_is_compact():
+    """Check a /8 range is counted and iterated without expanding it."""
+    host_set = HostSet.from_patterns(["10.[0:255].[0:255].[0:255]"], ["10.0.0.[0:255]"])
+    assert len(host_set) == 2**24 - 256
+    assert len(host_set._intervals) == 1  # pylint: disable=protected-access
+    assert list(islice(host_set, 2)) == ["10.0.1.0", "10.0.1.1"]
+    assert "10.0.0.1" not in host_set
+    assert "10.255.255.255" in host_set
+
+
+def test_remove():
+    """Check hosts can be removed one by one."""
+    host_set = HostSet.from_patterns(["1.2.3.[1:5]", "host"])
+    copy = host_set.copy()
+    host_set.remove("1.2.3.3")
+    host_set.remove("1.2.3.1")
+    host_set.remove("host")
+    host_set.discard("1.2.3.1")
+    with pytest.raises(KeyError):
+        host_set.remove("1.2.3.3")
+    with pytest.raises(KeyError):
+        host_set.remove("other")
+    assert list(host_set) == ["1.2.3.2", "1.2.3.4", "1.2.3.5"]
+    assert len(host_set) == 3
+    assert len(copy) == 6
+    for host in host_set:
+        host_set.remove(host)
+    assert not host_set
+
+
+def test_iter_inventories():
+    """Check inventories are built as groups are needed."""
+    host_set = HostSet.from_patterns(["10.0.[0:255].[0:255]"])
+    inventories = iter_inventories(host_set, 22, 2)
+    group_name, inventory = next(inventories)
+    assert group_name == "group_0"
+    assert inventory == {
+        "all": {
+            "children": {
+                "group_0": {
+                    "hosts": {
+                        "10.0.0.0": {"ansible_host": "10.0.0.0"},
+                        "10.0.0.1": {"ansible_host": "10.0.0.1"},
+                    }
+                }
+            },
+            "vars": {"ansible_port": 22},
+        }
+    }
+    group_name, inventory = next(inventories)
+    assert group_name == "group_1"
+    assert list(inventory["all"]["children"]["group_1"]["hosts"]) == [
+        "10.0.0.2",
+        "10.0.0.3",
+    ]
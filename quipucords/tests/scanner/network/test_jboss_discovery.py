@@ -0,0 +1,152 @@
+"""Test the shared file discovery of the jboss inspect roles."""
+
+import importlib.util
+import subprocess
+
+import pytest
+import yaml
+
+from scanner.network import collector
+
+
+@pytest.fixture
+def discovery():
+    """Load the discovery filter plugin module."""
+    path = collector.RUNNER_PATH / "filter_plugins/discovery.py"
+    spec = importlib.util.spec_from_file_location("discovery", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def search_tree(tmp_path):
+    """Create a directory tree holding jboss product files."""
+    for path in [
+        "eap/jboss-modules.jar",
+        "eap/.installation/patches/jboss-modules.jar",
+        "eap5/bin/run.jar",
+        "brms/kie-server.war/WEB-INF/lib/kie-api-7.5.jar",
+        "brms/drools-core-7.5.jar",
+        "fuse/lib/karaf.jar",
+        "fuse/system/activemq-client-5.11.0.redhat-630187.jar",
+        "fuse/system/camel-core-2.17.0.redhat-630187.jar",
+        "unrelated/karaf.jar.bak",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    (tmp_path / "jws-5.7").mkdir()
+    (tmp_path / "karaf.jar").mkdir()
+    return tmp_path
+
+
+def _run(command):
+    """Run a shell command and return its output lines."""
+    return subprocess.run(
+        ["/bin/bash", "-c", command], capture_output=True, check=False, text=True
+    ).stdout.splitlines()
+
+
+def _discovery_command(task_name, search_directories):
+    """Get the command of a jboss_discovery task."""
+    tasks_path = collector.RUNNER_PATH / "roles/jboss_discovery/tasks/main.yml"
+    for task in yaml.safe_load(tasks_path.read_text()):
+        if task["name"] == task_name:
+            return collector.render_command(
+                task["raw"], {"search_directories": search_directories}
+            )
+    raise AssertionError(f"no task {task_name}")
+
+
+@pytest.mark.parametrize(
+    "name,file_type",
+    [
+        ("jboss-modules.jar", None),
+        ("jboss-modules.jar", "f"),
+        ("run.jar", None),
+        ("kie*.war", None),
+        ("kie-api*", None),
+        ("drools-core*", None),
+        ("karaf.jar", "f"),
+        ("*activemq-*redhat*.jar", "f"),
+        ("*camel-core*redhat*.jar", "f"),
+        ("*[0-9].[0-9]", "d"),
+    ],
+)
+def test_qpc_find(discovery, search_tree, name, file_type):
+    """Check paths from the shared walk match a find of their own."""
+    command = _discovery_command(
+        "find jboss product files in search directories", str(search_tree)
+    )
+    result = {"rc": 0, "stdout_lines": _run(command)}
+    own_find = discovery.qpc_find(None, str(search_tree), name, file_type)
+    shared_find = discovery.qpc_find(result, str(search_tree), name, file_type)
+    assert own_find.startswith("find ")
+    assert shared_find != own_find
+    assert _run(shared_find) == _run(own_find)
+    assert _run(shared_find)
+
+
+def test_qpc_find_without_matches(discovery):
+    """Check no paths are printed if nothing matches."""
+    result = {"rc": 1, "stdout_lines": ["f /opt/other.jar"]}
+    assert discovery.qpc_find(result, "/opt", "run.jar") == "true"
+
+
+def test_qpc_find_skipped(discovery):
+    """Check the roles walk the directories if discovery was skipped."""
+    result = {"skipped": True, "changed": False}
+    assert (
+        discovery.qpc_find(result, "/opt /app", "kie*.war", "f")
+        == "find /opt /app -xdev -type f -name 'kie*.war' 2>/dev/null"
+    )
+    assert (
+        discovery.qpc_find(result, "/opt", "*[0-9].[0-9]", "d", xdev=False)
+        == "find /opt -type d -name '*[0-9].[0-9]' 2>/dev/null"
+    )
+
+
+def test_qpc_find_too_many_matches(discovery):
+    """Check the roles walk the directories if the matches don't fit a command."""
+    paths = [f"/opt/deployment-{index:06d}/jboss-modules.jar" for index in range(5000)]
+    result = {"rc": 0, "stdout_lines": [f"f {path}" for path in paths]}
+    assert (
+        discovery.qpc_find(result, "/opt", "jboss-modules.jar", "f")
+        == "find /opt -xdev -type f -name jboss-modules.jar 2>/dev/null"
+    )
+    result = {"rc": 0, "stdout_lines": paths}
+    assert (
+        discovery.qpc_locate(result, "jboss-modules.jar") == "locate jboss-modules.jar"
+    )
+
+
+def test_qpc_locate(discovery):
+    """Check paths are matched like locate matches them."""
+    result = {
+        "rc": 0,
+        "stdout_lines": [
+            "/opt/eap/jboss-modules.jar",
+            "/opt/brms/business-central.war",
+            "/opt/business-central-docs/index.html",
+            "/opt/brms/kie-server.war",
+            "/opt/brms/kie-server.war/WEB-INF/lib/kie-api-7.5.jar",
+            "/opt/tomcat9/bin/startup.sh",
+        ],
+    }
+    assert _run(discovery.qpc_locate(result, "jboss-modules.jar")) == [
+        "/opt/eap/jboss-modules.jar"
+    ]
+    assert _run(discovery.qpc_locate(result, "business-central", basename=True)) == [
+        "/opt/brms/business-central.war"
+    ]
+    assert _run(discovery.qpc_locate(result, "kie-server*", basename=True)) == [
+        "/opt/brms/kie-server.war"
+    ]
+    assert _run(discovery.qpc_locate(result, "kie-api*", basename=True)) == [
+        "/opt/brms/kie-server.war/WEB-INF/lib/kie-api-7.5.jar"
+    ]
+    # a glob must match the whole path
+    assert discovery.qpc_locate(result, "tomcat?/bin/startup.sh") == "true"
+    assert discovery.qpc_locate(None, "kie-api*", basename=True) == (
+        "locate --basename 'kie-api*'"
+    )
@@ -0,0 +1,68 @@
+"""Test the ssh connection sharing of network scan jobs."""
+
+from unittest import mock
+
+from scanner.network import multiplexing
+
+
+def test_ssh_multiplexing_vars(settings, ssh_control_path_dir):
+    """Check each source of a job gets its own socket directory."""
+    settings.QPC_SSH_CONTROL_PERSIST = 300
+    ansible_vars = multiplexing.ssh_multiplexing_vars(12, 1)
+    socket_dir = ssh_control_path_dir / "job-12" / "source-1"
+    assert ansible_vars == {
+        "ansible_ssh_args": "-C -o ControlMaster=auto -o ControlPersist=300s",
+        "ansible_control_path_dir": str(socket_dir),
+    }
+    assert socket_dir.is_dir()
+    other_job_vars = multiplexing.ssh_multiplexing_vars(13, 1)
+    assert other_job_vars["ansible_control_path_dir"] != str(socket_dir)
+    other_source_vars = multiplexing.ssh_multiplexing_vars(12, 2)
+    assert other_source_vars["ansible_control_path_dir"] != str(socket_dir)
+
+
+def test_ssh_multiplexing_disabled(settings, ssh_control_path_dir):
+    """Check nothing is set up when multiplexing is disabled."""
+    settings.QPC_SSH_MULTIPLEXING = False
+    assert multiplexing.ssh_multiplexing_vars(12, 1) == {}
+    assert not ssh_control_path_dir.exists()
+
+
+@mock.patch("scanner.network.multiplexing.subprocess.run")
+def test_close_ssh_connections(mock_run, ssh_control_path_dir):
+    """Check masters are stopped and the socket directory is removed."""
+    socket_dir = ssh_control_path_dir / "job-12"
+    (socket_dir / "source-1").mkdir(parents=True)
+    (socket_dir / "source-1" / "abc").touch()
+    other_job_dir = ssh_control_path_dir / "job-13"
+    other_job_dir.mkdir()
+
+    multiplexing.close_ssh_connections(12)
+
+    mock_run.assert_called_once()
+    socket_path = socket_dir / "source-1" / "abc"
+    assert f"ControlPath={socket_path}" in mock_run.call_args.args[0]
+    assert not socket_dir.exists()
+    assert other_job_dir.exists()
+
+
+@mock.patch("scanner.network.multiplexing.subprocess.run")
+def test_close_ssh_connections_of_source(mock_run, ssh_control_path_dir):
+    """Check only the masters of the given source are stopped."""
+    socket_dir = ssh_control_path_dir / "job-12"
+    for source_id in (1, 2):
+        (socket_dir / f"source-{source_id}").mkdir(parents=True)
+        (socket_dir / f"source-{source_id}" / "abc").touch()
+
+    multiplexing.close_ssh_connections(12, 1)
+
+    mock_run.assert_called_once()
+    assert not (socket_dir / "source-1").exists()
+    assert (socket_dir / "source-2" / "abc").exists()
+
+
+@mock.patch("scanner.network.multiplexing.subprocess.run")
+def test_close_ssh_connections_without_sockets(mock_run):
+    """Check jobs that never connected are ignored."""
+    multiplexing.close_ssh_connections(12)
+    mock_run.assert_not_called()
@@ -6,15 +6,16 @@ from unittest.mock import Mock, patch
 
 from ansible_runner.exceptions import AnsibleRunnerException
 from django.forms import model_to_dict
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from api.connresult.model import SystemConnectionResult
 from api.models import Credential, ScanJob, ScanOptions, ScanTask, Source, SourceOptions
 from api.serializers import SourceSerializer
 from scanner.network import ConnectTaskRunner
-from scanner.network.connect import ConnectResultStore, _connect, construct_inventory
+from scanner.network.connect import ConnectResultStore, _connect
 from scanner.network.exceptions import NetworkCancelException, NetworkPauseException
-from scanner.network.utils import _construct_vars
+from scanner.network.host_set import HostSet
+from scanner.network.utils import _construct_vars, iter_inventories
 from tests.scanner.test_util import create_scan_job
 
 
@@ -146,7 +147,7 @@ class NetworkConnectTaskRunnerTest(TestCase):
         """Test ConnectResultStore."""
         result_store = ConnectResultStore(self.scan_task)
 
-        self.assertEqual(result_store.remaining_hosts(), ["1.2.3.4"])
+        self.assertEqual(list(result_store.remaining_hosts()), ["1.2.3.4"])
         self.assertEqual(result_store.scan_task.systems_count, 1)
         self.assertEqual(result_store.scan_task.systems_scanned, 0)
         self.assertEqual(result_store.scan_task.systems_failed, 0)
@@ -155,11 +156,27 @@ class NetworkConnectTaskRunnerTest(TestCase):
             "1.2.3.4", self.source, self.cred, SystemConnectionResult.UNREACHABLE
         )
 
-        self.assertEqual(result_store.remaining_hosts(), [])
+        self.assertEqual(list(result_store.remaining_hosts()), [])
         self.assertEqual(result_store.scan_task.systems_count, 1)
         self.assertEqual(result_store.scan_task.systems_scanned, 0)
         self.assertEqual(result_store.scan_task.systems_unreachable, 1)
 
+    def test_result_store_unreachable(self):
+        """Test recording unreachable hosts at once."""
+        result_store = ConnectResultStore(self.scan_task3)
+        result_store.record_unreachable(["1.2.3.4", "1.2.3.6"], self.source3)
+
+        self.assertEqual(list(result_store.remaining_hosts()), ["1.2.3.5"])
+        self.assertEqual(result_store.scan_task.systems_count, 3)
+        self.assertEqual(result_store.scan_task.systems_unreachable, 2)
+        results = self.scan_task3.connection_result.systems.all()
+        self.assertEqual(
+            sorted(result.name for result in results), ["1.2.3.4", "1.2.3.6"]
+        )
+        for result in results:
+            self.assertEqual(result.status, SystemConnectionResult.UNREACHABLE)
+            self.assertIsNone(result.credential)
+
     def test_connect_inventory(self):
         """Test construct ansible inventory dictionary."""
         serializer = SourceSerializer(self.source)
@@ -168,12 +185,11 @@ class NetworkConnectTaskRunnerTest(TestCase):
         exclude_hosts = source["exclude_hosts"]
         connection_port = source["port"]
         cred = model_to_dict(self.cred)
-        _, inventory_dict = construct_inventory(
-            hosts=hosts,
+        [(_, inventory_dict)] = iter_inventories(
+            HostSet.from_patterns(hosts, exclude_hosts),
+            connection_port,
+            1,
             credential=cred,
-            connection_port=connection_port,
-            concurrency_count=1,
-            exclude_hosts=exclude_hosts,
         )
         # pylint: disable=line-too-long
         expected = {
@@ -216,12 +232,11 @@ class NetworkConnectTaskRunnerTest(TestCase):
             _connect(
                 Value("i", ScanJob.JOB_RUN),
                 self.scan_task,
-                hosts,
+                HostSet.from_patterns(hosts, exclude_hosts),
                 Mock(),
                 self.cred,
                 connection_port,
                 self.concurrency,
-                exclude_hosts,
             )
             mock_run.assert_called()
             mock_ssh_pass.assert_called()
@@ -238,12 +253,11 @@ class NetworkConnectTaskRunnerTest(TestCase):
         _connect(
             Value("i", ScanJob.JOB_RUN),
             self.scan_task,
-            hosts,
+            HostSet.from_patterns(hosts, exclude_hosts),
             Mock(),
             self.cred,
             connection_port,
             self.concurrency,
-            exclude_hosts,
         )
         mock_run.assert_called()
 
@@ -259,12 +273,11 @@ class NetworkConnectTaskRunnerTest(TestCase):
         _connect(
             Value("i", ScanJob.JOB_RUN),
             self.scan_task,
-            hosts,
+            HostSet.from_patterns(hosts, exclude_hosts),
             Mock(),
             self.cred,
             connection_port,
             self.concurrency,
-            exclude_hosts,
         )
         mock_run.assert_called()
 
@@ -280,12 +293,11 @@ class NetworkConnectTaskRunnerTest(TestCase):
         _connect(
             Value("i", ScanJob.JOB_RUN),
             self.scan_task,
-            hosts,
+            HostSet.from_patterns(hosts, exclude_hosts),
             Mock(),
             self.cred,
             connection_port,
             self.concurrency,
-            exclude_hosts,
         )
         mock_run.assert_called()
 
@@ -347,11 +359,8 @@ class NetworkConnectTaskRunnerTest(TestCase):
         hosts = source["hosts"]
         connection_port = source["port"]
         cred = model_to_dict(self.cred)
-        _, inventory_dict = construct_inventory(
-            hosts=hosts,
-            credential=cred,
-            connection_port=connection_port,
-            concurrency_count=1,
+        [(_, inventory_dict)] = iter_inventories(
+            hosts, connection_port, 1, credential=cred
         )
         expected = {
             "all": {
@@ -591,6 +600,56 @@ class NetworkConnectTaskRunnerTest(TestCase):
         _, scan_result = scanner.run(Value("i", ScanJob.JOB_RUN))
         self.assertEqual(scan_result, ScanTask.FAILED)
 
+    @override_settings(QPC_CONNECT_PROBE_ENABLED=True)
+    @patch("scanner.network.connect.find_unreachable_hosts")
+    @patch("scanner.network.connect._connect")
+    def test_connect_probe(self, mock_connect, mock_probe):
+        """Test unreachable hosts aren't tried with credentials."""
+        mock_probe.return_value = ["1.2.3.4", "1.2.3.6"]
+        mock_connect.return_value = None, ScanTask.COMPLETED
+        scanner = ConnectTaskRunner(self.scan_job3, self.scan_task3)
+        result_store = ConnectResultStore(self.scan_task3)
+        _, result = scanner.run_with_result_store(
+            Value("i", ScanJob.JOB_RUN), result_store
+        )
+        self.assertEqual(result, ScanTask.COMPLETED)
+        self.assertEqual(list(mock_probe.call_args.args[0]), self.source3.hosts)
+        self.assertEqual(list(mock_connect.call_args.args[2]), ["1.2.3.5"])
+        self.assertEqual(self.scan_task3.systems_unreachable, 2)
+
+    @override_settings(
+        QPC_NETWORK_SLIDING_WINDOW=True, QPC_NETWORK_SLIDING_WINDOW_GROUP_SIZE=1
+    )
+    @patch("ansible_runner.run")
+    def test_connect_sliding_window(self, mock_run):
+        """Test each host gets its own ansible run in sliding window mode."""
+        mock_run.return_value.status = "successful"
+        scanner = ConnectTaskRunner(self.scan_job3, self.scan_task3)
+        result_store = MockResultStore(self.source3.hosts)
+        _, result = scanner.run_with_result_store(
+            Value("i", ScanJob.JOB_RUN), result_store
+        )
+        self.assertEqual(result, ScanTask.COMPLETED)
+        self.assertEqual(mock_run.call_count, 3)
+        for call in mock_run.mock_calls:
+            self.assertIn("--forks=1", call.kwargs["cmdline"])
+
+    @patch("ansible_runner.run")
+    def test_connect_ssh_multiplexing(self, mock_run):
+        """Test connect runs share the ssh connections of the job."""
+        mock_run.return_value.status = "successful"
+        scanner = ConnectTaskRunner(self.scan_job, self.scan_task)
+        scanner.run_with_result_store(
+            Value("i", ScanJob.JOB_RUN), MockResultStore(["1.2.3.4"])
+        )
+        extravars = mock_run.call_args.kwargs["extravars"]
+        self.assertIn("ControlMaster=auto", extravars["ansible_ssh_args"])
+        self.assertTrue(
+            extravars["ansible_control_path_dir"].endswith(
+                f"job-{self.scan_job.id}/source-{self.scan_task.source_id}"
+            )
+        )
+
     @patch("ansible_runner.run")
     def test_empty_hosts(self, mock_run):
         """Test running a connect scan with mocked connection."""
@@ -7,7 +7,7 @@ import pytest
 import requests_mock
 from ansible_runner.exceptions import AnsibleRunnerException
 from django.forms import model_to_dict
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from api.models import (
@@ -19,12 +19,13 @@ from api.models import (
     Source,
     SourceOptions,
     SystemConnectionResult,
+    SystemInspectionResult,
 )
 from api.serializers import SourceSerializer
 from scanner.network import InspectTaskRunner
 from scanner.network.exceptions import NetworkCancelException, NetworkPauseException
-from scanner.network.inspect import construct_inventory
 from scanner.network.inspect_callback import InspectResultCallback
+from scanner.network.utils import iter_inventories
 from tests.scanner.test_util import create_scan_job
 
 ANSIBLE_FACTS = "ansible_facts"
@@ -97,8 +98,8 @@ class NetworkInspectScannerTest(TestCase):
         serializer = SourceSerializer(self.source)
         source = serializer.data
         connection_port = source["port"]
-        inventory_dict = construct_inventory(self.host_list, connection_port, 50)
-        expected = {
+        inventories = dict(iter_inventories(self.host_list, connection_port, 50))
+        expected_inventory = {
             "all": {
                 "children": {
                     "group_0": {
@@ -115,68 +116,61 @@ class NetworkInspectScannerTest(TestCase):
             }
         }
 
-        self.assertEqual(inventory_dict[1], expected)
+        self.assertEqual(inventories, {"group_0": expected_inventory})
 
     def test_scan_inventory_grouping(self):
         """Test construct ansible inventory dictionary."""
         serializer = SourceSerializer(self.source)
         source = serializer.data
         connection_port = source["port"]
-        inventory_dict = construct_inventory(
-            [
-                ("1.2.3.1", self.cred_data),
-                ("1.2.3.2", self.cred_data),
-                ("1.2.3.3", self.cred_data),
-                ("1.2.3.4", self.cred_data),
-            ],
-            connection_port,
-            1,
+        inventories = dict(
+            iter_inventories(
+                [
+                    ("1.2.3.1", self.cred_data),
+                    ("1.2.3.2", self.cred_data),
+                    ("1.2.3.3", self.cred_data),
+                    ("1.2.3.4", self.cred_data),
+                ],
+                connection_port,
+                1,
+            )
         )
         expected = {
-            "all": {
-                "children": {
-                    "group_0": {
-                        "hosts": {
-                            "1.2.3.1": {
-                                "ansible_user": "username",
-                                "ansible_ssh_pass": "password",
-                                "ansible_host": "1.2.3.1",
-                            }
-                        }
-                    },
-                    "group_1": {
-                        "hosts": {
-                            "1.2.3.2": {
-                                "ansible_user": "username",
-                                "ansible_ssh_pass": "password",
-                                "ansible_host": "1.2.3.2",
-                            }
-                        }
-                    },
-                    "group_2": {
-                        "hosts": {
-                            "1.2.3.3": {
-                                "ansible_user": "username",
-                                "ansible_ssh_pass": "password",
-                                "ansible_host": "1.2.3.3",
-                            }
-                        }
-                    },
-                    "group_3": {
-                        "hosts": {
-                            "1.2.3.4": {
-                                "ansible_user": "username",
-                                "ansible_ssh_pass": "password",
-                                "ansible_host": "1.2.3.4",
+            f"group_{index}": {
+                "all": {
+                    "children": {
+                        f"group_{index}": {
+                            "hosts": {
+                                host: {
+                                    "ansible_user": "username",
+                                    "ansible_ssh_pass": "password",
+                                    "ansible_host": host,
+                                }
                             }
                         }
                     },
-                },
-                "vars": {"ansible_port": 22},
+                    "vars": {"ansible_port": 22},
+                }
             }
+            for index, host in enumerate(["1.2.3.1", "1.2.3.2", "1.2.3.3", "1.2.3.4"])
         }
 
-        self.assertEqual(inventory_dict[1], expected)
+        self.assertEqual(inventories, expected)
+
+    def test_scan_inventory_decrypts_credentials_once(self):
+        """Test credentials shared by hosts are decrypted once per task."""
+        hosts = [(f"1.2.3.{number}", self.cred_data) for number in range(10)]
+
+        def _iter_inventories(*args, **kwargs):
+            list(iter_inventories(hosts, 22, 1))
+            return "", ScanTask.COMPLETED
+
+        scanner = InspectTaskRunner(self.scan_job, self.scan_task)
+        with patch.object(
+            scanner, "execute_task", side_effect=_iter_inventories
+        ), patch("api.vault.Vault.load", return_value=b"password") as load:
+            scanner.run(Value("i", ScanJob.JOB_RUN))
+        load.assert_called_once()
 
     @patch("ansible_runner.run")
     def test_inspect_scan_failure(self, mock_run):
@@ -329,6 +323,20 @@ class NetworkInspectScannerTest(TestCase):
                 Value("i", ScanJob.JOB_TERMINATE_PAUSE), self.host_list
             )
 
+    @override_settings(QPC_NETWORK_INSPECT_ENGINE="collector")
+    @patch("ansible_runner.run")
+    def test_collector_engine(self, mock_run):
+        """Test the collector engine runs its playbook with the commands."""
+        mock_run.return_value.status = "successful"
+        scanner = InspectTaskRunner(self.scan_job, self.scan_task)
+        scanner._inspect_scan(Value("i", ScanJob.JOB_RUN), self.host_list)
+        run_kwargs = mock_run.call_args.kwargs
+        self.assertTrue(run_kwargs["playbook"].endswith("inspect_collector.yml"))
+        self.assertIn("uname -s", run_kwargs["extravars"]["qpc_collector_commands"])
+        self.assertIn(
+            "last -25", run_kwargs["extravars"]["qpc_collector_become_commands"]
+        )
+
     @patch("ansible_runner.run")
     @patch("scanner.network.inspect.settings.ANSIBLE_LOG_LEVEL", "1")
     def test_modifying_log_level(self, mock_run):
@@ -340,3 +348,53 @@ class NetworkInspectScannerTest(TestCase):
         calls = mock_run.mock_calls
         # Check to see if the parameter was passed into the runner.run()
         self.assertIn("verbosity=1", str(calls[0]))
+
+
+def _task_event(event, host, facts=None):
+    """Build an ansible runner task event for a host."""
+    return {
+        "event": event,
+        "event_data": {
+            "host": host,
+            "role": "test_role",
+            "task": "test task",
+            "task_action": "set_fact",
+            "res": {"ansible_facts": facts or {}},
+        },
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(QPC_INSPECT_EVENT_WORKERS=2, QPC_INSPECT_RESULT_BATCH_SIZE=2)
+def test_callback_event_workers():
+    """Test task events are processed and saved by the event workers."""
+    source = Source.objects.create(name="source1", port=22, hosts=["1.2.3.0/29"])
+    _, scan_task = create_scan_job(source, ScanTask.SCAN_TYPE_INSPECT)
+    callback = InspectResultCallback(scan_task, Value("i", ScanJob.JOB_RUN))
+    hosts = [f"1.2.3.{number}" for number in range(5)]
+    for host in hosts:
+        callback.event_callback(_task_event("runner_on_ok", host, {"fact": host}))
+        callback.event_callback(_task_event("runner_on_ok", host, {"host_done": 1}))
+    callback.event_callback(_task_event("runner_on_unreachable", "1.2.3.6"))
+    callback.flush()
+
+    systems = scan_task.inspection_result.systems
+    assert {system.name for system in systems.all()} == set(hosts) | {"1.2.3.6"}
+    for system in systems.filter(status=SystemInspectionResult.SUCCESS):
+        assert system.facts.get(name="fact").value == system.name
+    scan_task.refresh_from_db()
+    assert scan_task.systems_scanned == 5
+    assert scan_task.systems_unreachable == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(QPC_INSPECT_EVENT_WORKERS=1)
+def test_callback_event_worker_error(mocker):
+    """Test processing errors stop the playbook run."""
+    source = Source.objects.create(name="source1", port=22, hosts=["1.2.3.4"])
+    _, scan_task = create_scan_job(source, ScanTask.SCAN_TYPE_INSPECT)
+    callback = InspectResultCallback(scan_task, Value("i", ScanJob.JOB_RUN))
+    mocker.patch.object(callback, "task_on_ok", side_effect=ValueError("bad fact"))
+    callback.event_callback(_task_event("runner_on_ok", "1.2.3.4", {"fact": 1}))
+    with pytest.raises(AnsibleRunnerException):
+        callback.flush()
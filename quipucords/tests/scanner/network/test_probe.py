@@ -0,0 +1,83 @@
+"""Test the reachability probe used by network connect scans."""
+
+import asyncio
+import errno
+import resource
+import socket
+
+import pytest
+
+from scanner.network.probe import find_unreachable_hosts, max_probe_concurrency
+
+
+@pytest.fixture
+def listening_port():
+    """Return a local port accepting connections."""
+    with socket.socket() as server:
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        yield server.getsockname()[1]
+
+
+@pytest.fixture
+def closed_port():
+    """Return a local port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_reachable_host(listening_port):
+    """Check hosts accepting connections aren't reported."""
+    unreachable = find_unreachable_hosts(
+        ["127.0.0.1"], listening_port, timeout=5, concurrency=10
+    )
+    assert unreachable == []
+
+
+def test_unreachable_hosts(closed_port):
+    """Check hosts refusing connections are reported."""
+    hosts = ["127.0.0.1", "127.0.0.2", "127.0.0.3"]
+    unreachable = find_unreachable_hosts(hosts, closed_port, timeout=5, concurrency=2)
+    assert sorted(unreachable) == hosts
+
+
+def test_unresolvable_host(listening_port):
+    """Check hosts whose names can't be resolved are reported."""
+    unreachable = find_unreachable_hosts(
+        ["host.invalid"], listening_port, timeout=5, concurrency=1
+    )
+    assert unreachable == ["host.invalid"]
+
+
+def test_stop(closed_port):
+    """Check hosts not probed before stopping aren't reported."""
+    unreachable = find_unreachable_hosts(
+        ["127.0.0.1", "127.0.0.2"],
+        closed_port,
+        timeout=5,
+        concurrency=1,
+        should_stop=lambda: True,
+    )
+    assert unreachable == []
+
+
+def test_out_of_files_host_is_not_reported(mocker, closed_port):
+    """Check hosts that couldn't be probed for lack of files aren't reported."""
+    mocker.patch.object(
+        asyncio,
+        "open_connection",
+        side_effect=OSError(errno.EMFILE, "Too many open files"),
+    )
+    unreachable = find_unreachable_hosts(
+        ["127.0.0.1"], closed_port, timeout=5, concurrency=1
+    )
+    assert unreachable == []
+
+
+def test_max_probe_concurrency(mocker):
+    """Check concurrency is capped by the open files limit."""
+    mocker.patch.object(resource, "getrlimit", return_value=(1024, 4096))
+    assert max_probe_concurrency(1000) == 512
+    assert max_probe_concurrency(10) == 10
+    assert max_probe_concurrency(0) == 1
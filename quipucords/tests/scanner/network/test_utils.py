@@ -1,10 +1,17 @@
 """Test the network scanner utility functions."""
 
 
+import threading
 import unittest
+from multiprocessing import Value
 from unittest import mock
 
+import pytest
+
+from api import vault
+from api.models import ScanJob, ScanTask
 from scanner.network import utils
+from scanner.network.exceptions import NetworkCancelException
 
 
 class TestConstructVars(unittest.TestCase):
@@ -76,3 +83,109 @@ def test_raw_facts_template():
     assert template[fact] is None
     template[fact] = 1
     assert utils.raw_facts_template()[fact] is None
+
+
+@pytest.mark.parametrize(
+    "sliding_window,group_size,forks,expected",
+    [
+        (False, 1, 50, (50, 1)),
+        (True, 1, 50, (1, 50)),
+        (True, 5, 50, (5, 10)),
+        (True, 8, 50, (8, 7)),
+        (True, 100, 50, (50, 1)),
+    ],
+)
+def test_get_run_layout(settings, sliding_window, group_size, forks, expected):
+    """Check how hosts are split between ansible runs."""
+    settings.QPC_NETWORK_SLIDING_WINDOW = sliding_window
+    settings.QPC_NETWORK_SLIDING_WINDOW_GROUP_SIZE = group_size
+    assert utils.get_run_layout(forks) == expected
+
+
+@pytest.mark.parametrize("slots", [1, 3])
+def test_run_inventories(slots):
+    """Check every inventory is run once."""
+    inventories = [(f"group_{index}", {"index": index}) for index in range(10)]
+    run_inventory = mock.Mock(return_value=(None, ScanTask.COMPLETED))
+    result = utils.run_inventories(
+        inventories, run_inventory, slots, Value("i", ScanJob.JOB_RUN)
+    )
+    assert result == (None, ScanTask.COMPLETED)
+    assert sorted(call.args for call in run_inventory.call_args_list) == [
+        (index, group_name, inventory)
+        for index, (group_name, inventory) in enumerate(inventories)
+    ]
+
+
+def test_run_inventories_sliding_window():
+    """Check a slow inventory doesn't hold the others back."""
+    release_slow = threading.Event()
+    fast_done = []
+
+    def run_inventory(index, group_name, inventory):
+        if index == 0:
+            assert release_slow.wait(timeout=5)
+        else:
+            fast_done.append(group_name)
+            if len(fast_done) == 5:
+                release_slow.set()
+        return None, ScanTask.COMPLETED
+
+    inventories = [(f"group_{index}", {}) for index in range(6)]
+    result = utils.run_inventories(
+        inventories, run_inventory, 2, Value("i", ScanJob.JOB_RUN)
+    )
+    assert result == (None, ScanTask.COMPLETED)
+    assert len(fast_done) == 5
+
+
+@pytest.mark.parametrize("slots", [1, 3])
+def test_run_inventories_stop(slots):
+    """Check no inventory is started after one stops execution."""
+    inventories = [(f"group_{index}", {}) for index in range(10)]
+    run_inventory = mock.Mock(return_value=("paused", ScanTask.PAUSED))
+    result = utils.run_inventories(
+        inventories, run_inventory, slots, Value("i", ScanJob.JOB_RUN)
+    )
+    assert result == ("paused", ScanTask.PAUSED)
+    assert run_inventory.call_count <= slots
+
+
+@pytest.mark.parametrize("slots", [1, 3])
+def test_run_inventories_interrupt(slots):
+    """Check interrupts are raised in the calling thread."""
+    inventories = [(f"group_{index}", {}) for index in range(10)]
+    run_inventory = mock.Mock(return_value=(None, ScanTask.COMPLETED))
+    with pytest.raises(NetworkCancelException):
+        utils.run_inventories(
+            inventories,
+            run_inventory,
+            slots,
+            Value("i", ScanJob.JOB_TERMINATE_CANCEL),
+        )
+    run_inventory.assert_not_called()
+
+
+def test_run_inventories_decrypted_data_cache(settings):
+    """Check sliding window runs share the decrypted data of the caller."""
+    settings.QPC_NETWORK_SLIDING_WINDOW = True
+    settings.QPC_NETWORK_SLIDING_WINDOW_GROUP_SIZE = 1
+    credential = {
+        "username": "username",
+        "password": vault.encrypt_data_as_unicode("password"),
+    }
+    hosts = [(f"1.2.3.{index}", credential) for index in range(10)]
+    group_size, slots = utils.get_run_layout(5)
+    run_inventory = mock.Mock(return_value=(None, ScanTask.COMPLETED))
+    with mock.patch.object(
+        vault.Vault, "load", autospec=True, side_effect=vault.Vault.load
+    ) as load, vault.decrypted_data_cache():
+        result = utils.run_inventories(
+            utils.iter_inventories(hosts, 22, group_size),
+            run_inventory,
+            slots,
+            Value("i", ScanJob.JOB_RUN),
+        )
+    assert result == (None, ScanTask.COMPLETED)
+    assert run_inventory.call_count == len(hosts)
+    assert load.call_count == 1
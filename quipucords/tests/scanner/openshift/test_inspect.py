@@ -182,3 +182,34 @@ def test_inspect_with_failure(  # pylint: disable=too-many-arguments
     assert scan_task.systems_scanned == 0
     assert scan_task.systems_failed == 2
     assert scan_task.systems_unreachable == 0
+
+
+@pytest.mark.django_db
+def test_inspect_run_with_buffered_stats(  # pylint: disable=too-many-arguments
+    mocker,
+    settings,
+    scan_task: ScanTask,
+    project,
+    cluster,
+    node_ok,
+    node_err,
+    workload,
+):
+    """Test the status picked by run() reads the stats not saved yet."""
+    settings.QPC_SCAN_STATS_FLUSH_COUNT = 100
+    settings.QPC_SCAN_STATS_FLUSH_INTERVAL = 3600
+    mocker.patch.object(OpenShiftApi, "retrieve_projects", return_value=[project])
+    mocker.patch.object(OpenShiftApi, "retrieve_cluster", return_value=cluster)
+    mocker.patch.object(
+        OpenShiftApi, "retrieve_nodes", return_value=[node_ok, node_err]
+    )
+    mocker.patch.object(OpenShiftApi, "retrieve_workloads", return_value=[workload])
+
+    runner = InspectTaskRunner(scan_task=scan_task, scan_job=scan_task.job)
+    message, status = runner.run(mocker.Mock())
+    assert message == InspectTaskRunner.PARTIAL_SUCCESS_MESSAGE
+    assert status == ScanTask.COMPLETED
+    saved_task = ScanTask.objects.get(id=scan_task.id)
+    assert saved_task.systems_count == 3
+    assert saved_task.systems_scanned == 2
+    assert saved_task.systems_failed == 1
@@ -17,7 +17,12 @@ from api.models import (
 )
 from constants import DataSources
 from scanner.satellite.api import SatelliteException
-from scanner.satellite.five import SatelliteFive, request_host_details
+from scanner.satellite.five import (
+    SatelliteFive,
+    WorkerSessions,
+    request_host_details,
+    request_host_details_in_session,
+)
 from tests.scanner.test_util import create_scan_job
 
 
@@ -235,6 +240,61 @@ class SatelliteFiveTest(TestCase):
             result[fact.name] = fact.value
         self.assertEqual(result, expected)
 
+    @patch("xmlrpc.client.ServerProxy")
+    def test_host_details_in_session(self, mock_serverproxy):
+        """Test hosts of a worker share one session and one multicall each."""
+        client = mock_serverproxy.return_value
+        client.auth.login.return_value = "key"
+        details = ["uuid", {"arch": "x86"}, {}, "kernel", ["ent1"], [], "datetime"]
+        client.system.multicall.return_value = [[value] for value in details]
+        sessions = WorkerSessions(
+            {"host": "1.2.3.4", "port": 443, "user": "user", "password": "pass"}
+        )
+        for host_id in (1, 2):
+            raw_result = request_host_details_in_session(
+                host_id=host_id,
+                host_name="sys",
+                last_checkin="",
+                scan_task=self.scan_task,
+                request_options={},
+                logging_options=None,
+                sessions=sessions,
+            )
+            self.assertEqual(raw_result["system_inspection_result"], "success")
+            self.assertEqual(raw_result["cpu"], {"arch": "x86"})
+            self.assertEqual(raw_result["registration_date"], "datetime")
+        sessions.logout()
+        client.auth.login.assert_called_once_with("user", "pass")
+        client.auth.logout.assert_called_once_with("key")
+        self.assertEqual(client.system.multicall.call_count, 2)
+        client.system.get_uuid.assert_not_called()
+
+    @patch("xmlrpc.client.ServerProxy")
+    def test_host_details_in_session_without_multicall(self, mock_serverproxy):
+        """Test calls are sent one by one if system.multicall is unsupported."""
+        client = mock_serverproxy.return_value
+        client.auth.login.return_value = "key"
+        client.system.multicall.side_effect = xmlrpc.client.Fault(
+            faultCode=-1, faultString="multicall not found"
+        )
+        client.system.get_uuid.return_value = "uuid"
+        sessions = WorkerSessions(
+            {"host": "1.2.3.4", "port": 443, "user": "user", "password": "pass"}
+        )
+        raw_result = request_host_details_in_session(
+            host_id=1,
+            host_name="sys",
+            last_checkin="",
+            scan_task=self.scan_task,
+            request_options={},
+            logging_options=None,
+            sessions=sessions,
+        )
+        self.assertEqual(raw_result["system_inspection_result"], "success")
+        self.assertEqual(raw_result["uuid"], "uuid")
+        self.assertFalse(sessions.multicall)
+        client.auth.login.assert_called_once_with("user", "pass")
+
     def test_prepare_host_s5(self):
         """Test the prepare host method for satellite 5."""
         expected = [
@@ -370,25 +430,23 @@ class SatelliteFiveTest(TestCase):
             self.api.hosts_facts(Value("i", ScanJob.JOB_RUN))
 
     @patch(
-        "multiprocessing.pool.Pool.starmap",
-        return_value=[
-            {
-                "host_name": "sys10",
-                "last_checkin": "",
-                "host_id": 1,
-                "cpu": {},
-                "uuid": 1,
-                "system_details": {},
-                "kernel": "",
-                "subs": [],
-                "network_devices": [],
-                "registration_date": "",
-                "system_inspection_result": SystemInspectionResult.SUCCESS,
-            }
-        ],
+        "scanner.satellite.five.request_host_details",
+        return_value={
+            "host_name": "sys10",
+            "last_checkin": "",
+            "host_id": 1,
+            "cpu": {},
+            "uuid": 1,
+            "system_details": {},
+            "kernel": "",
+            "subs": [],
+            "network_devices": [],
+            "registration_date": "",
+            "system_inspection_result": SystemInspectionResult.SUCCESS,
+        },
     )
     @patch("xmlrpc.client.ServerProxy")
-    def test_hosts_facts(self, mock_serverproxy, mock_pool):
+    def test_hosts_facts(self, mock_serverproxy, mock_request_host_details):
         """Test the hosts_facts method."""
         # pylint: disable=unused-argument
         systems = [{"id": 1, "name": "sys1"}]
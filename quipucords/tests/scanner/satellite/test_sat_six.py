@@ -1,9 +1,11 @@
 """Test the satellite six interface."""
+import threading
+from itertools import chain
 from multiprocessing import Value
-from unittest.mock import ANY, patch
+from unittest.mock import ANY, call, patch
 
 import requests_mock
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from faker import Faker
 
 from api.models import (
@@ -26,6 +28,7 @@ from scanner.satellite.six import (
     host_subscriptions,
     process_results,
     request_host_details,
+    request_results,
 )
 from scanner.satellite.utils import construct_url
 from tests.scanner.test_util import create_scan_job
@@ -95,6 +98,33 @@ class SatelliteSixV1Test(TestCase):
             self.assertEqual(orgs, [1, 7, 8])
             self.assertEqual(orgs, orgs2)
 
+    def test_request_results_pages_in_parallel(self):
+        """Test pages after the first one are requested concurrently, in order."""
+        orgs_url = "https://{sat_host}:{port}/katello/api/v2/organizations"
+        url = construct_url(orgs_url, "1.2.3.4")
+        with requests_mock.Mocker() as mocker:
+            for page in range(1, 4):
+                results = [{"id": page * 10 + i} for i in range(2 if page < 3 else 1)]
+                mocker.get(
+                    f"{url}?page={page}",
+                    json={"results": results, "per_page": 2, "total": 5},
+                )
+            results = list(
+                request_results(self.scan_task, orgs_url, per_page=5, max_concurrency=4)
+            )
+            self.assertEqual(
+                results, [{"id": 10}, {"id": 11}, {"id": 20}, {"id": 21}, {"id": 30}]
+            )
+            # the page size the server uses replaces the requested one
+            self.assertEqual(mocker.request_history[0].qs["per_page"], ["5"])
+            self.assertEqual(
+                sorted(request.qs["page"][0] for request in mocker.request_history),
+                ["1", "2", "3"],
+            )
+            self.assertTrue(
+                all(req.qs["per_page"] == ["2"] for req in mocker.request_history[1:])
+            )
+
     def test_get_orgs_with_err(self):
         """Test the method to get orgs with err."""
         orgs_url = "https://{sat_host}:{port}/katello/api/v2/organizations"
@@ -458,24 +488,22 @@ class SatelliteSixV1Test(TestCase):
             with self.assertRaises(SatelliteException):
                 self.api.hosts_facts(Value("i", ScanJob.JOB_RUN))
 
-    @patch(
-        "multiprocessing.pool.Pool.starmap",
-        return_value=[
-            {
-                "unique_name": "sys_1",
-                "system_inspection_result": "failed",
-                "host_fields_response": {},
-                "host_subscriptions_response": {},
-            }
-        ],
-    )
-    def test_hosts_facts(self, mock_pool):
+    def test_hosts_facts(self):
         """Test the method hosts."""
         hosts_url = (
             "https://{sat_host}:{port}/katello/api/v2/organizations/{org_id}/systems"
         )
+        failed_result = {
+            "unique_name": "sys_1",
+            "system_inspection_result": "failed",
+            "host_fields_response": {},
+            "host_subscriptions_response": {},
+        }
         with patch.object(SatelliteSixV1, "get_orgs", return_value=[1]):
-            with patch("scanner.satellite.six.request_host_details", return_value={}):
+            with patch(
+                "scanner.satellite.six.request_host_details",
+                return_value=failed_result,
+            ):
                 with requests_mock.Mocker() as mocker:
                     url = construct_url(url=hosts_url, sat_host="1.2.3.4", org_id=1)
                     jsonresult = {
@@ -535,26 +563,51 @@ class SatelliteSixV1Test(TestCase):
         ) as mock_request_host_details, patch(
             "scanner.satellite.utils.validate_task_stats", return_value=True
         ), patch(
-            "multiprocessing.pool.Pool.starmap"
-        ) as mock_pool_starmap, requests_mock.Mocker() as mocker:
-            # pylint: disable=unnecessary-lambda
-            mock_prepare_host.side_effect = lambda x: list(x)
-            # pylint: enable=unnecessary-lambda
+            "scanner.satellite.six.process_results"
+        ), requests_mock.Mocker() as mocker:
+            mock_prepare_host.side_effect = lambda chunk: [(host,) for host in chunk]
             mocker.get(url_org_a, status_code=200, json=jsonresults[0])
             mocker.get(url_org_b, status_code=200, json=jsonresults[1])
 
             self.api.hosts_facts(Value("i", ScanJob.JOB_RUN))
 
-            # This assertion warrants some explanation...
-            # For this test, we want to see if prepare_host was given a list of de-duped
-            # hosts, but it's difficult to assert equality with the generator that would
-            # normally be passed into it. So, we patch prepare_host's behavior to simply
-            # return its input cast to a list, which should match our expected list.
-            # Since the output of prepare_host goes immediately into Pool.starmap, we
-            # check that Pool.starmap is called with what we expect is the unique list.
-            mock_pool_starmap.assert_called_with(
-                mock_request_host_details, unique_hosts
+            # prepare_host is patched to pass each host on as is, so every
+            # unique host must have been requested exactly once
+            self.assertEqual(mock_request_host_details.call_count, len(unique_hosts))
+            mock_request_host_details.assert_has_calls(
+                [call(host) for host in unique_hosts], any_order=True
+            )
+
+    def test_hosts_facts_keeps_requests_in_flight(self):
+        """Test a slow host doesn't hold back requests for the other hosts."""
+        self.api.max_concurrency = 2
+        hosts = [{"id": host_id, "name": "sys"} for host_id in range(1, 6)]
+        slow_host_released = threading.Event()
+        requested = []
+
+        def request(host):
+            requested.append(host["id"])
+            if host["id"] == 1:
+                # only returns once all other hosts were requested
+                slow_host_released.wait(timeout=5)
+            elif len(requested) == len(hosts):
+                slow_host_released.set()
+            return host["id"]
+
+        processed = []
+        with patch.object(
+            SatelliteSixV1,
+            "prepare_host",
+            side_effect=lambda chunk: [(host,) for host in chunk],
+        ), override_settings(QPC_SATELLITE_RESULT_BATCH_SIZE=2):
+            self.api._process_hosts_concurrently(  # pylint: disable=protected-access
+                hosts,
+                request,
+                lambda results: processed.append(results),
+                Value("i", ScanJob.JOB_RUN),
             )
+        self.assertTrue(slow_host_released.is_set())
+        self.assertEqual(sorted(chain.from_iterable(processed)), [1, 2, 3, 4, 5])
 
 
 # pylint: disable=too-many-instance-attributes
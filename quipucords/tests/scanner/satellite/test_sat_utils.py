@@ -1,5 +1,6 @@
 """Test the satellite utils."""
 import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import ANY, patch
 
 import requests_mock
@@ -15,12 +16,14 @@ from scanner.satellite.api import (
 )
 from scanner.satellite.utils import (
     _status5,
+    close_sessions,
     construct_url,
     data_map,
     execute_request,
     get_connect_data,
     get_credential,
     get_sat5_client,
+    get_session,
     status,
     validate_task_stats,
 )
@@ -96,6 +99,45 @@ class SatelliteUtilsTest(TestCase):
             self.assertEqual(response.status_code, 200)
             self.assertEqual(response.json(), jsonresult)
 
+    def test_execute_request_reuses_session(self):
+        """Test requests of a worker share one keep-alive session."""
+        status_url = "https://{sat_host}:{port}/api/status"
+        options = {
+            "host": "1.2.3.4",
+            "port": "443",
+            "user": "username",
+            "password": "password",
+            "ssl_cert_verify": False,
+        }
+        session = get_session("1.2.3.4", "443", "username", "password", False)
+        with requests_mock.Mocker() as mocker:
+            mocker.get(construct_url(status_url, "1.2.3.4"), json={})
+            execute_request(self.scan_task, status_url, options=options)
+            execute_request(self.scan_task, status_url, options=options)
+            self.assertEqual(mocker.call_count, 2)
+            self.assertIn("Authorization", mocker.last_request.headers)
+            self.assertFalse(mocker.last_request.verify)
+        self.assertIs(
+            get_session("1.2.3.4", "443", "username", "password", False), session
+        )
+        self.assertIsNot(
+            get_session("1.2.3.4", "443", "username", "password", True), session
+        )
+        close_sessions()
+        self.assertIsNot(
+            get_session("1.2.3.4", "443", "username", "password", False), session
+        )
+
+    def test_close_sessions_of_worker_threads(self):
+        """Test sessions opened by worker threads are closed too."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            session = executor.submit(
+                get_session, "1.2.3.4", "443", "username", "password"
+            ).result()
+        with patch.object(session, "close") as mock_close:
+            close_sessions()
+        mock_close.assert_called_once_with()
+
     @patch(
         "scanner.satellite.utils._status6",
         return_value=(200, SATELLITE_VERSION_6, SATELLITE_VERSION_6),
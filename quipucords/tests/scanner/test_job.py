@@ -0,0 +1,152 @@
+"""Test the scan job runner."""
+
+import threading
+from unittest import mock
+
+import pytest
+
+from api.models import ScanJob, ScanOptions, ScanTask
+from scanner import job
+from scanner.job import SyncScanJobRunner, group_task_runners_by_source
+
+
+def fake_runner(source_id, sequence_number):
+    """Return a minimal stand-in for a ScanTaskRunner."""
+    runner = mock.Mock()
+    runner.scan_task.source_id = source_id
+    runner.scan_task.sequence_number = sequence_number
+    return runner
+
+
+@pytest.fixture
+def task_runners():
+    """Return connect and inspect runners for two sources."""
+    return [
+        fake_runner(source_id=10, sequence_number=1),
+        fake_runner(source_id=20, sequence_number=2),
+        fake_runner(source_id=10, sequence_number=3),
+        fake_runner(source_id=20, sequence_number=4),
+    ]
+
+
+@pytest.fixture
+def scan_job(db):
+    """Return a pending connect ScanJob allowing two concurrent sources."""
+    return ScanJob.objects.create(
+        scan_type=ScanTask.SCAN_TYPE_CONNECT,
+        status=ScanTask.PENDING,
+        options=ScanOptions.objects.create(max_concurrent_sources=2),
+    )
+
+
+@pytest.fixture
+def job_runner(scan_job, task_runners, mocker):
+    """Return a SyncScanJobRunner for scan_job using the fake task runners."""
+    mocker.patch.object(
+        job, "get_task_runners_for_job", return_value=(task_runners, None)
+    )
+    runner = SyncScanJobRunner(scan_job)
+    runner.interrupt_check_interval = 0.01
+    return runner
+
+
+def test_group_task_runners_by_source(task_runners):
+    """Check each source gets its own chain, keeping the task order."""
+    chains = group_task_runners_by_source(task_runners)
+    assert chains == [
+        [task_runners[0], task_runners[2]],
+        [task_runners[1], task_runners[3]],
+    ]
+
+
+def test_run_chains_concurrently(job_runner, task_runners, mocker):
+    """Check both sources are scanned at the same time."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _run_task_runner(runner, interrupt):
+        # fails with BrokenBarrierError if the other chain isn't running as well
+        barrier.wait()
+        return ScanTask.COMPLETED
+
+    run_task_runner = mocker.patch.object(
+        job, "run_task_runner", side_effect=_run_task_runner
+    )
+    assert job_runner.run() == ScanTask.COMPLETED
+    assert run_task_runner.call_count == len(task_runners)
+    job_runner.scan_job.refresh_from_db()
+    assert job_runner.scan_job.status == ScanTask.COMPLETED
+
+
+def test_run_chains_sequentially(job_runner, task_runners, mocker):
+    """Check tasks run one after another when concurrency is not allowed."""
+    job_runner.scan_job.options.max_concurrent_sources = 1
+    run_task_runner = mocker.patch.object(
+        job, "run_task_runner", return_value=ScanTask.COMPLETED
+    )
+    assert job_runner.run() == ScanTask.COMPLETED
+    assert [call.args[0] for call in run_task_runner.call_args_list] == task_runners
+
+
+def test_run_chains_concurrently_aggregates_failures(job_runner, task_runners, mocker):
+    """Check failed tasks from all chains are reported."""
+    failing_runners = {task_runners[1], task_runners[2]}
+
+    def _run_task_runner(runner, interrupt):
+        if runner in failing_runners:
+            return ScanTask.FAILED
+        return ScanTask.COMPLETED
+
+    mocker.patch.object(job, "run_task_runner", side_effect=_run_task_runner)
+    assert job_runner.run() == ScanTask.FAILED
+    job_runner.scan_job.refresh_from_db()
+    assert job_runner.scan_job.status == ScanTask.FAILED
+    assert job_runner.scan_job.status_message == "The following tasks failed: 2, 3"
+
+
+@pytest.mark.parametrize(
+    "interrupt_value,expected_status",
+    (
+        (ScanJob.JOB_TERMINATE_CANCEL, ScanTask.CANCELED),
+        (ScanJob.JOB_TERMINATE_PAUSE, ScanTask.PAUSED),
+    ),
+)
+def test_run_chains_concurrently_relays_interrupt(
+    job_runner, mocker, interrupt_value, expected_status
+):
+    """Check a pause/cancel request reaches every running chain."""
+    started = threading.Barrier(2, timeout=5)
+    interrupted_chains = []
+
+    def _run_task_runner(runner, interrupt):
+        started.wait()
+        if runner.scan_task.source_id == 10:
+            # mimic the manager receiving a pause/cancel request
+            job_runner.manager_interrupt.value = interrupt_value
+        while interrupt.value == ScanJob.JOB_RUN:
+            threading.Event().wait(0.01)
+        interrupted_chains.append(interrupt.value)
+        interrupt.value = ScanJob.JOB_TERMINATE_ACK
+        return expected_status
+
+    run_task_runner = mocker.patch.object(
+        job, "run_task_runner", side_effect=_run_task_runner
+    )
+    assert job_runner.run() == expected_status
+    assert interrupted_chains == [interrupt_value, interrupt_value]
+    # inspect tasks are never started after an interrupt
+    assert run_task_runner.call_count == 2
+    assert job_runner.manager_interrupt.value == ScanJob.JOB_TERMINATE_ACK
+    job_runner.scan_job.refresh_from_db()
+    assert job_runner.scan_job.status == expected_status
+
+
+@pytest.mark.parametrize(
+    "task_status", [ScanTask.COMPLETED, ScanTask.PAUSED, ScanTask.CANCELED]
+)
+def test_run_closes_ssh_connections(job_runner, mocker, task_status):
+    """Check shared ssh connections are closed however the tasks end."""
+    job_runner.scan_job.options.max_concurrent_sources = 1
+    mocker.patch.object(job, "run_task_runner", return_value=task_status)
+    close_ssh_connections = mocker.patch.object(job, "close_ssh_connections")
+    job_runner.run()
+    close_ssh_connections.assert_called_once_with(job_runner.scan_job.id)
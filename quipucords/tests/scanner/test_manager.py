@@ -0,0 +1,137 @@
+"""Test the scan manager."""
+
+import logging
+from multiprocessing import Value
+from unittest import mock
+
+import pytest
+
+from api.models import ScanJob, ScanTask
+from scanner import manager
+from scanner.job import ProcessBasedScanJobRunner
+
+
+@pytest.fixture
+def scan_manager():
+    """
+    Override conftest.scan_manager pytest fixture to do nothing in this test module.
+
+    conftest.scan_manager replaces scanner.manager.Manager, which is exactly what
+    is being tested here.
+    """
+
+
+def fake_job_runner(job_id, scan_type=ScanTask.SCAN_TYPE_INSPECT):
+    """Return a stand-in for ProcessBasedScanJobRunner."""
+    job_runner = mock.Mock(spec=ProcessBasedScanJobRunner)
+    job_runner.identifier = job_id
+    job_runner.scan_job = mock.Mock()
+    job_runner.scan_job.id = job_id
+    job_runner.scan_job.scan_type = scan_type
+    job_runner.scan_job.status = ScanTask.PENDING
+    job_runner.manager_interrupt = Value("i", ScanJob.JOB_RUN)
+    job_runner.is_alive.return_value = True
+    return job_runner
+
+
+@pytest.fixture
+def scan_manager_with_slots():
+    """Return a Manager with two worker slots."""
+    return manager.Manager(worker_slots=2)
+
+
+def test_worker_slots_default(settings):
+    """Check the number of slots comes from settings by default."""
+    settings.QPC_SCAN_MANAGER_WORKER_SLOTS = 3
+    assert manager.Manager().job_slots == [None, None, None]
+
+
+def test_work_fills_free_slots(scan_manager_with_slots):
+    """Check jobs are started until every slot is busy."""
+    job_runners = [fake_job_runner(job_id) for job_id in (1, 2, 3)]
+    for job_runner in job_runners:
+        scan_manager_with_slots.put(job_runner)
+
+    scan_manager_with_slots.work()
+
+    assert scan_manager_with_slots.job_slots == job_runners[:2]
+    assert scan_manager_with_slots.scan_queue == [job_runners[2]]
+    job_runners[0].start.assert_called_once()
+    job_runners[1].start.assert_called_once()
+    job_runners[2].start.assert_not_called()
+
+
+def test_fingerprint_jobs_jump_ahead(scan_manager_with_slots):
+    """Check fingerprint-only jobs start before queued scans."""
+    scan_manager_with_slots.job_slots[0] = fake_job_runner(1)
+    scan = fake_job_runner(2)
+    merge = fake_job_runner(3, scan_type=ScanTask.SCAN_TYPE_FINGERPRINT)
+    scan_manager_with_slots.put(scan)
+    scan_manager_with_slots.put(merge)
+
+    scan_manager_with_slots.work()
+
+    assert scan_manager_with_slots.job_slots[1] is merge
+    assert scan_manager_with_slots.scan_queue == [scan]
+
+
+def test_kill_running_job(scan_manager_with_slots):
+    """Check kill interrupts only the runner of the given job."""
+    first, second = fake_job_runner(1), fake_job_runner(2)
+    scan_manager_with_slots.job_slots = [first, second]
+
+    scan_manager_with_slots.kill(mock.Mock(id=2), "cancel")
+
+    assert first.manager_interrupt.value == ScanJob.JOB_RUN
+    assert second.manager_interrupt.value == ScanJob.JOB_TERMINATE_CANCEL
+    assert scan_manager_with_slots.termination_elapsed_time == {2: 0}
+
+
+def test_kill_queued_job(scan_manager_with_slots):
+    """Check kill removes a job that is still waiting for a slot."""
+    queued = fake_job_runner(1)
+    scan_manager_with_slots.put(queued)
+
+    assert scan_manager_with_slots.kill(mock.Mock(id=1), "pause")
+    assert scan_manager_with_slots.scan_queue == []
+
+
+def test_terminated_job_frees_its_slot(scan_manager_with_slots):
+    """Check a terminated runner releases its slot once its process ends."""
+    first, second = fake_job_runner(1), fake_job_runner(2)
+    scan_manager_with_slots.job_slots = [first, second]
+    scan_manager_with_slots.kill(mock.Mock(id=1), "pause")
+
+    first.is_alive.return_value = False
+    scan_manager_with_slots.check_job_slots()
+
+    assert scan_manager_with_slots.job_slots == [None, second]
+    assert scan_manager_with_slots.termination_elapsed_time == {}
+
+
+@pytest.mark.django_db
+def test_finished_job_frees_its_slot(scan_manager_with_slots):
+    """Check a slot is released when its job finishes."""
+    scan_job = ScanJob.objects.create(status=ScanTask.COMPLETED)
+    finished, running = fake_job_runner(scan_job.id), fake_job_runner(scan_job.id + 1)
+    finished.is_alive.return_value = False
+    scan_manager_with_slots.job_slots = [finished, running]
+
+    scan_manager_with_slots.check_job_slots()
+
+    assert scan_manager_with_slots.job_slots == [None, running]
+
+
+def test_log_info_reports_each_slot(scan_manager_with_slots, caplog):
+    """Check the heartbeat message describes every slot."""
+    caplog.set_level(logging.INFO)
+    scan_manager_with_slots.job_slots[1] = fake_job_runner(5)
+    scan_manager_with_slots.put(fake_job_runner(6))
+    caplog.clear()
+
+    scan_manager_with_slots.log_info()
+
+    assert (
+        "slot 1: idle, slot 2: running scan job 5.  Scan queue length is 1."
+        " Queued jobs: [6]"
+    ) in caplog.text
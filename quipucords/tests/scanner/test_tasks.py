@@ -0,0 +1,208 @@
+"""Test the celery scan job tasks."""
+
+from unittest import mock
+
+import pytest
+
+from api.models import ScanJob, ScanOptions, ScanTask
+from quipucords import celery_app
+from scanner import manager, tasks
+from scanner.job import ScanJobRunner
+from scanner.tasks import DatabaseInterrupt
+from tests.factories import SourceFactory
+
+
+@pytest.fixture(autouse=True)
+def eager_celery():
+    """Run celery tasks locally and synchronously."""
+    # celery_app reads its settings with the CELERY_ namespace
+    previous = {
+        "CELERY_TASK_ALWAYS_EAGER": celery_app.conf.task_always_eager,
+        "CELERY_TASK_EAGER_PROPAGATES": celery_app.conf.task_eager_propagates,
+    }
+    celery_app.conf.update(
+        CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True
+    )
+    yield
+    celery_app.conf.update(previous)
+
+
+@pytest.fixture
+def scan_job(db):
+    """Return a pending connect ScanJob with two sources."""
+    scan_job = ScanJob.objects.create(
+        scan_type=ScanTask.SCAN_TYPE_CONNECT,
+        status=ScanTask.PENDING,
+        options=ScanOptions.objects.create(),
+    )
+    for sequence_number, source in enumerate(
+        [SourceFactory(), SourceFactory()], start=1
+    ):
+        ScanTask.objects.create(
+            job=scan_job,
+            source=source,
+            scan_type=ScanTask.SCAN_TYPE_CONNECT,
+            status=ScanTask.PENDING,
+            sequence_number=sequence_number,
+        )
+    return scan_job
+
+
+@pytest.fixture
+def run_task_runner(mocker):
+    """Replace the scan task runners with successful fakes."""
+    mocker.patch.object(tasks, "get_task_runner_class")
+    return mocker.patch.object(
+        tasks, "run_task_runner", return_value=ScanTask.COMPLETED
+    )
+
+
+def test_database_interrupt(scan_job):
+    """Check DatabaseInterrupt reads and writes ScanJob.interrupt."""
+    interrupt = DatabaseInterrupt(scan_job.id)
+    assert interrupt.value == ScanJob.JOB_RUN
+    interrupt.value = ScanJob.JOB_TERMINATE_PAUSE
+    scan_job.refresh_from_db()
+    assert scan_job.interrupt == ScanJob.JOB_TERMINATE_PAUSE
+    assert DatabaseInterrupt(scan_job.id).value == ScanJob.JOB_TERMINATE_PAUSE
+
+
+def test_database_interrupt_caches_reads(scan_job, django_assert_num_queries):
+    """Check repeated reads within refresh_interval don't hit the database."""
+    interrupt = DatabaseInterrupt(scan_job.id)
+    with django_assert_num_queries(1):
+        for _ in range(10):
+            assert interrupt.value == ScanJob.JOB_RUN
+
+
+def test_run_scan_job(scan_job, run_task_runner):
+    """Check every task of the job is run and the job completes."""
+    tasks.run_scan_job.delay(scan_job.id)
+    assert run_task_runner.call_count == 2
+    for call in run_task_runner.call_args_list:
+        assert isinstance(call.args[1], DatabaseInterrupt)
+    scan_job.refresh_from_db()
+    assert scan_job.status == ScanTask.COMPLETED
+
+
+def test_run_scan_task_closes_ssh_connections(scan_job, run_task_runner, mocker):
+    """Check every task stops the ssh masters it opened on its worker."""
+    close_ssh_connections = mocker.patch.object(tasks, "close_ssh_connections")
+    tasks.run_scan_job.delay(scan_job.id)
+    assert run_task_runner.call_count == 2
+    assert {call.args for call in close_ssh_connections.call_args_list} == {
+        (scan_job.id, scan_task.source_id) for scan_task in scan_job.tasks.all()
+    }
+
+
+def test_run_scan_job_failed_task(scan_job, run_task_runner):
+    """Check a failed task fails the job once all chains are done."""
+
+    def _fail_first_task(runner, interrupt):
+        scan_task = tasks.get_task_runner_class.return_value.call_args.args[1]
+        if scan_task.sequence_number == 1:
+            scan_task.status_fail("failed")
+            return ScanTask.FAILED
+        return ScanTask.COMPLETED
+
+    run_task_runner.side_effect = _fail_first_task
+    tasks.run_scan_job.delay(scan_job.id)
+    assert run_task_runner.call_count == 2
+    scan_job.refresh_from_db()
+    assert scan_job.status == ScanTask.FAILED
+
+
+@pytest.mark.parametrize(
+    "interrupt_value,expected_status",
+    (
+        (ScanJob.JOB_TERMINATE_CANCEL, ScanTask.CANCELED),
+        (ScanJob.JOB_TERMINATE_PAUSE, ScanTask.PAUSED),
+    ),
+)
+def test_run_scan_task_interrupted(
+    scan_job, run_task_runner, interrupt_value, expected_status
+):
+    """Check an interrupt stops the remaining tasks of the job."""
+
+    def _interrupt_job(runner, interrupt):
+        interrupt.value = interrupt_value
+        return ScanTask.COMPLETED
+
+    run_task_runner.side_effect = _interrupt_job
+    tasks.run_scan_job.delay(scan_job.id)
+    assert run_task_runner.call_count == 1
+    scan_job.refresh_from_db()
+    assert scan_job.status == expected_status
+    # the request is kept for the other chains of the job
+    assert scan_job.interrupt == interrupt_value
+
+
+@pytest.mark.parametrize(
+    "command,interrupt_value",
+    (
+        ("cancel", ScanJob.JOB_TERMINATE_CANCEL),
+        ("pause", ScanJob.JOB_TERMINATE_PAUSE),
+    ),
+)
+def test_interrupt_reaches_concurrent_chains(scan_job, command, interrupt_value):
+    """Check a chain acknowledging an interrupt doesn't hide it from the others."""
+    first_chain = DatabaseInterrupt(scan_job.id)
+    second_chain = DatabaseInterrupt(scan_job.id)
+    assert first_chain.value == ScanJob.JOB_RUN
+    assert second_chain.value == ScanJob.JOB_RUN
+
+    manager.CeleryManager().kill(scan_job, command)
+    first_chain.refresh_interval = second_chain.refresh_interval = 0
+    assert first_chain.value == interrupt_value
+    # the first chain's runner stops and acknowledges the request
+    first_chain.value = ScanJob.JOB_TERMINATE_ACK
+    assert first_chain.value == ScanJob.JOB_TERMINATE_ACK
+    assert second_chain.value == interrupt_value
+    scan_job.refresh_from_db()
+    assert scan_job.interrupt == interrupt_value
+
+
+def test_run_scan_task_after_interrupt(scan_job, run_task_runner):
+    """Check tasks queued after an acknowledged interrupt don't run."""
+    first_task, second_task = scan_job.tasks.order_by("sequence_number")
+    ScanJob.objects.filter(id=scan_job.id).update(
+        status=ScanTask.RUNNING, interrupt=ScanJob.JOB_TERMINATE_CANCEL
+    )
+    assert tasks.run_scan_task(first_task.id) == ScanTask.CANCELED
+    scan_job.refresh_from_db()
+    assert scan_job.status == ScanTask.CANCELED
+    assert tasks.run_scan_task(second_task.id) == ScanTask.CANCELED
+    run_task_runner.assert_not_called()
+
+
+def test_celery_manager_put(scan_job, mocker):
+    """Check CeleryManager clears old interrupts and sends the job to celery."""
+    run_scan_job = mocker.patch.object(tasks, "run_scan_job")
+    ScanJob.objects.filter(id=scan_job.id).update(interrupt=ScanJob.JOB_TERMINATE_ACK)
+    manager.CeleryManager().put(ScanJobRunner(scan_job))
+    run_scan_job.delay.assert_called_once_with(scan_job.id)
+    scan_job.refresh_from_db()
+    assert scan_job.interrupt == ScanJob.JOB_RUN
+
+
+@pytest.mark.parametrize(
+    "command,interrupt_value",
+    (
+        ("cancel", ScanJob.JOB_TERMINATE_CANCEL),
+        ("pause", ScanJob.JOB_TERMINATE_PAUSE),
+    ),
+)
+def test_celery_manager_kill(scan_job, command, interrupt_value):
+    """Check CeleryManager.kill flags the job for the workers."""
+    manager.CeleryManager().kill(scan_job, command)
+    scan_job.refresh_from_db()
+    assert scan_job.interrupt == interrupt_value
+
+
+def test_reinitialize_celery_manager(settings):
+    """Check the celery manager is picked when enabled."""
+    settings.QPC_DISABLE_THREADED_SCAN_MANAGER = False
+    settings.QPC_ENABLE_CELERY_SCAN_MANAGER = True
+    with mock.patch.object(manager, "SCAN_MANAGER"):
+        manager.reinitialize()
+        assert isinstance(manager.SCAN_MANAGER, manager.CeleryManager)
@@ -5,7 +5,11 @@ from unittest.mock import ANY, Mock, patch
 from django.test import TestCase
 
 from api.models import Credential, ScanTask, Source, SourceOptions
-from scanner.vcenter.utils import vcenter_connect
+from scanner.vcenter.utils import (
+    retrieve_properties,
+    retrieve_property_pages,
+    vcenter_connect,
+)
 from tests.scanner.test_util import create_scan_job
 
 
@@ -49,3 +53,31 @@ class VCenterUtilsTest(TestCase):
             mock_smart_connect.assert_called_once_with(
                 host=ANY, user=ANY, pwd=ANY, port=ANY
             )
+
+    def test_retrieve_property_pages(self):
+        """Test properties are retrieved one page at a time."""
+        content = Mock()
+        collector = content.propertyCollector
+        collector.RetrievePropertiesEx.return_value = Mock(token="1", objects=[1, 2])
+        collector.ContinueRetrievePropertiesEx.return_value = Mock(
+            token=None, objects=[3]
+        )
+        pages = retrieve_property_pages(content, ["spec"], max_objects=2)
+        self.assertEqual(next(pages), [1, 2])
+        collector.ContinueRetrievePropertiesEx.assert_not_called()
+        self.assertEqual(list(pages), [[3]])
+        collector.ContinueRetrievePropertiesEx.assert_called_once_with("1")
+        options = collector.RetrievePropertiesEx.call_args.kwargs["options"]
+        self.assertEqual(options.maxObjects, 2)
+        self.assertEqual(retrieve_properties(content, ["spec"]), [1, 2, 3])
+
+    def test_retrieve_property_pages_stopped(self):
+        """Test the retrieval is cancelled if pages stop being read."""
+        content = Mock()
+        collector = content.propertyCollector
+        collector.RetrievePropertiesEx.return_value = Mock(token="1", objects=[1, 2])
+        pages = retrieve_property_pages(content, ["spec"], max_objects=2)
+        next(pages)
+        pages.close()
+        collector.CancelRetrievePropertiesEx.assert_called_once_with("1")
+        collector.ContinueRetrievePropertiesEx.assert_not_called()
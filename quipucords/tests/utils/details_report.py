@@ -0,0 +1,22 @@
+"""Helpers for tests uploading details reports."""
+
+import json
+
+from rest_framework.renderers import JSONRenderer
+
+from api.models import ScanJob
+from api.serializers import DetailsReportSerializer
+from scanner import manager
+
+
+def fingerprint_uploaded_report(response):
+    """Run the fingerprint job started by POST /reports/ and return the report.
+
+    :param response: the response of the upload request
+    :returns: the details report as returned by the API, as a dict
+    """
+    scan_job_id = response.json()["id"]
+    manager.SCAN_MANAGER.work()
+    scan_job = ScanJob.objects.get(id=scan_job_id)
+    serializer = DetailsReportSerializer(scan_job.details_report)
+    return json.loads(JSONRenderer().render(serializer.data))